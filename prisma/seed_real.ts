@@ -1,6 +1,7 @@
 import { PrismaClient } from '@prisma/client'
 import { hashPassword } from '../src/lib/auth'; // Assicurati di avere una funzione di hashing sicura
 import * as fs from 'fs'
+import * as zlib from 'zlib'
 
 const prisma = new PrismaClient()
 
@@ -35,12 +36,39 @@ interface ExtractedData {
   student_scores: Record<string, Record<string, StudentLessonData>>
 }
 
+const GZIP_MAGIC = Buffer.from([0x1f, 0x8b])
+const ZSTD_MAGIC = Buffer.from([0x28, 0xb5, 0x2f, 0xfd])
+
+// Trova il file dei dati tra .json, .json.gz e .json.zst (il più recente se ce n'è più di uno)
+function resolveDataPath(basePath: string): string {
+  const candidates = [basePath, `${basePath}.gz`, `${basePath}.zst`].filter((path) => fs.existsSync(path))
+  if (candidates.length === 0) {
+    throw new Error(`Nessun file dati trovato per ${basePath}`)
+  }
+  return candidates.sort((a, b) => fs.statSync(b).mtimeMs - fs.statSync(a).mtimeMs)[0]
+}
+
+// Riconosce il formato dai primi byte del file e decomprime se necessario
+function decompressData(buffer: Buffer): Buffer {
+  if (buffer.subarray(0, 2).equals(GZIP_MAGIC)) {
+    return zlib.gunzipSync(buffer)
+  }
+  if (buffer.subarray(0, 4).equals(ZSTD_MAGIC)) {
+    const zstdDecompressSync = (zlib as unknown as { zstdDecompressSync?: (data: Buffer) => Buffer }).zstdDecompressSync
+    if (!zstdDecompressSync) {
+      throw new Error('Decompressione zstd non supportata da questa versione di Node: usa --compress=gzip')
+    }
+    return zstdDecompressSync(buffer)
+  }
+  return buffer
+}
+
 async function main() {
   console.log('🚀 Avvio del seed del database...')
 
-  // Leggi i dati estratti dal file JSON
-  const dataPath = './real/fantakombat_data.json'
-  const rawData = fs.readFileSync(dataPath, 'utf-8')
+  // Leggi i dati estratti dal file JSON (semplice, compatto o compresso gzip/zstd)
+  const dataPath = resolveDataPath('./real/fantakombat_data.json')
+  const rawData = decompressData(fs.readFileSync(dataPath)).toString('utf-8')
   const data: ExtractedData = JSON.parse(rawData)
 
   console.log(`📊 Dati caricati: ${data.students.length} studenti, ${data.lessons.length} lezioni, ${data.actions.length} azioni`)
@@ -0,0 +1,204 @@
+"""
+Compilatore delle regole delle azioni a partire dalla riga di intestazione di un foglio.
+
+L'intestazione di ogni foglio settimanale contiene già i punteggi delle azioni
+(es. 'Presenza (+1pt)', 'Punti extra settimana (+0,5pt dopo 1 settimana ...)').
+compile_sheet_plan la trasforma una sola volta in un piano colonna -> regola,
+memorizzato per firma dell'intestazione: i fogli con lo stesso layout riusano
+lo stesso piano senza regex né ricerche per cella.
+"""
+
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+from fixed_point import QUANTUM, to_units
+from scoring import calculate_points, score_block
+
+POINTS_PATTERN = re.compile(r'\(\s*([+-]?\d+(?:[.,]\d+)?)\s*pt', re.IGNORECASE)
+TIER_PATTERN = re.compile(r'\(\s*([+-]?\d+(?:[.,]\d+)?)\s*pt\s+dopo\s+(\d+)\s*settiman', re.IGNORECASE)
+STREAK_VALUE_PATTERN = re.compile(r'(\d+)')
+
+PARTICIPANT_HEADER = 'partecipante'
+TOTAL_HEADER = 'tot settimana'
+EXCLUDED_NAMES = ['Partecipante', 'TOTALE', 'Tot']
+
+SCORING_COUNT = 'count'
+SCORING_STREAK = 'streak'
+
+
+def parse_points(points_str):
+    """Converte '+0,5' / '-1' in float"""
+    return float(points_str.replace(',', '.'))
+
+
+def compile_column_rule(col_idx, header):
+    """
+    Compila la regola di una singola colonna.
+    Ritorna None se la colonna non è un'azione (nessun punteggio nell'intestazione).
+    """
+    tiers = TIER_PATTERN.findall(header)
+    if tiers:
+        tier_table = tuple(sorted((int(weeks), parse_points(points)) for points, weeks in tiers))
+        base_points = tier_table[0][1]
+        mode = SCORING_STREAK
+    else:
+        match = POINTS_PATTERN.search(header)
+        if not match:
+            return None
+        base_points = parse_points(match.group(1))
+        tier_table = ()
+        mode = SCORING_COUNT
+
+    return {
+        'col': col_idx,
+        'header': header,
+        'action': header.split('(')[0].strip(),
+        'points': base_points,
+        'mode': mode,
+        'tiers': tier_table,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def compile_sheet_plan(header):
+    """
+    Compila l'intestazione di un foglio (tupla di stringhe) nel piano di estrazione.
+
+    Il piano è un dizionario con:
+      - participant_col / total_col: indici delle colonne nome e 'Tot Settimana'
+      - columns: le regole delle colonne azione, nell'ordine del foglio
+      - action_cols, actions, points, units, rule_keys: gli stessi dati come sequenze parallele
+        (units = punti base in unità intere, vedi fixed_point.py)
+    Il risultato è condiviso tra tutti i fogli con la stessa firma: non va modificato.
+    """
+    participant_col = None
+    total_col = None
+    columns = []
+
+    for col_idx, raw_header in enumerate(header):
+        col_header = str(raw_header).strip()
+        lower_header = col_header.lower()
+
+        if PARTICIPANT_HEADER in lower_header:
+            participant_col = col_idx
+            continue
+        if TOTAL_HEADER in lower_header:
+            total_col = col_idx
+            continue
+
+        rule = compile_column_rule(col_idx, col_header)
+        if rule:
+            columns.append(rule)
+
+    # Le due colonne 'Punti extra settimana' hanno lo stesso nome: distinguile per segno
+    names = [rule['action'] for rule in columns]
+    for rule in columns:
+        if names.count(rule['action']) > 1:
+            rule['action'] = f"{rule['action']} ({'+' if rule['points'] > 0 else '-'})"
+
+    return {
+        'signature': header,
+        'participant_col': participant_col,
+        'total_col': total_col,
+        'columns': columns,
+        'by_col': {rule['col']: rule for rule in columns},
+        'points_by_header': {rule['header']: rule['points'] for rule in columns},
+        'action_cols': [rule['col'] for rule in columns],
+        'actions': [rule['action'] for rule in columns],
+        'points': np.array([rule['points'] for rule in columns], dtype=float),
+        'units': to_units([rule['points'] for rule in columns]),
+        'rule_keys': [(rule['mode'], rule['points'], rule['tiers']) for rule in columns],
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def is_plan_column(header):
+    """True se la colonna serve al piano (nome, azione o 'Tot Settimana'): usata come usecols in lettura"""
+    lower_header = str(header).strip().lower()
+    if PARTICIPANT_HEADER in lower_header or TOTAL_HEADER in lower_header:
+        return True
+    return POINTS_PATTERN.search(str(header)) is not None
+
+
+def plan_for_dataframe(df):
+    """Ritorna il piano (memorizzato) per le colonne di un DataFrame letto con header=0"""
+    return compile_sheet_plan(tuple(str(col) for col in df.columns))
+
+
+def streak_points(value, base_points, tiers):
+    """Punti di una cella 'Punti extra settimana' come 'v (2settimana)' o 'v(3set)'"""
+    value_str = str(value).strip().lower()
+    if not value_str or value_str == 'nan':
+        return 0.0
+    if 'v' not in value_str:
+        # Valore numerico inserito a mano
+        return calculate_points(value_str, base_points)
+
+    match = STREAK_VALUE_PATTERN.search(value_str)
+    weeks = int(match.group(1)) if match else 1
+    tier_points = dict(tiers)
+    if weeks in tier_points:
+        return tier_points[weeks]
+    # Oltre l'ultima soglia vale il punteggio massimo
+    return tier_points[max(tier_points)] if weeks > max(tier_points) else base_points * weeks
+
+
+def score_cell(value, rule_key):
+    """Scorer per score_block: rule_key è (modalità, punti base, tabella soglie)"""
+    mode, base_points, tiers = rule_key
+    if mode == SCORING_STREAK:
+        return streak_points(value, base_points, tiers)
+    return calculate_points(value, base_points)
+
+
+def score_sheet(df, plan=None, label=None):
+    """
+    Applica il piano a un foglio settimanale letto con header=0.
+    label (il nome del foglio) compare negli avvisi sui punteggi arrotondati.
+
+    Ritorna un dizionario con:
+      - students: nomi (puliti) delle righe valide
+      - rows: posizioni di quelle righe nel DataFrame
+      - values: blocco grezzo delle celle azione (righe valide x azioni)
+      - points: punti calcolati in unità intere (righe valide x azioni, vedi fixed_point.py)
+      - totals: valori della colonna 'Tot Settimana' (NaN se assente)
+    """
+    if plan is None:
+        plan = plan_for_dataframe(df)
+
+    n_actions = len(plan['columns'])
+    if plan['participant_col'] is None:
+        return {
+            'plan': plan,
+            'students': [],
+            'rows': np.array([], dtype=int),
+            'values': np.empty((0, n_actions), dtype=object),
+            'points': np.zeros((0, n_actions), dtype=np.int64),
+            'totals': np.array([], dtype=float),
+        }
+
+    names = df.iloc[:, plan['participant_col']]
+    is_name = names.map(lambda name: isinstance(name, str) and name.strip() not in EXCLUDED_NAMES + ['']).to_numpy(dtype=bool)
+    rows = np.flatnonzero(is_name)
+    students = [name.strip() for name in names.iloc[rows]]
+
+    values = df.iloc[rows, plan['action_cols']].to_numpy(dtype=object)
+    points = score_block(values, plan['rule_keys'], score_cell, quantum=QUANTUM,
+                         label=label, row_labels=students, column_labels=plan['actions'])
+
+    if plan['total_col'] is not None:
+        totals = pd.to_numeric(df.iloc[rows, plan['total_col']], errors='coerce').to_numpy(dtype=float)
+    else:
+        totals = np.full(len(rows), np.nan)
+
+    return {
+        'plan': plan,
+        'students': students,
+        'rows': rows,
+        'values': values,
+        'points': points,
+        'totals': totals,
+    }
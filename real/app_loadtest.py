@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Test di carico delle pagine classifica dell'app (src/routes/rankings e src/routes/leaderboard).
+
+Due fasi:
+  - seed: genera una stagione sintetica della dimensione voluta (studenti,
+    lezioni, punteggi) e la carica nel database dell'app con db_loader
+    (stesse tabelle e colonne di prisma/schema.prisma, ID deterministici,
+    blocchi con checkpoint). Crea anche una sessione per uno studente, così
+    le pagine protette rispondono come a un utente autenticato.
+  - run: invia richieste concorrenti a un'istanza locale dell'app (loadtest.py)
+    e riporta per ogni pagina throughput, p50/p95/p99 e istogramma delle latenze.
+    Ogni esecuzione viene aggiunta a uno storico NDJSON e confrontata con la
+    precedente a parità di dataset, pagina e concorrenza.
+
+Le pagine SvelteKit espongono i dati del load anche come <pagina>/__data.json:
+misurare quelle rotte esclude il rendering e isola le query.
+
+Esempi:
+    python app_loadtest.py seed --database postgresql://localhost/fantakombat_load --students 10000 --scores 100000
+    python app_loadtest.py run --base-url http://127.0.0.1:5173 --concurrency 16 --duration 20
+    python app_loadtest.py run --route /rankings/__data.json --route /leaderboard/__data.json
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from db_loader import (COURSE_START, DEFAULT_TEACHER_PASSWORD, TEACHER, build_rows, connect, deterministic_id,
+                       existing_user_ids, hash_password, load_checkpoint, load_rows, print_stats, student_email)
+from loadtest import histogram, percentiles, print_results, run_load
+
+DEFAULT_DATABASE = 'fantakombat_load.db'
+DEFAULT_STATE = 'app_loadtest_state.json'
+DEFAULT_HISTORY = 'app_loadtest_history.ndjson'
+DEFAULT_CHECKPOINT = 'app_loadtest.checkpoint.json'
+DEFAULT_ROUTES = ['/rankings', '/leaderboard']
+LESSONS_PER_WEEK = 3
+LESSON_DAYS = [0, 2, 4]  # lunedì, mercoledì, venerdì
+SESSION_DAYS = 30
+
+# Azioni della stagione sintetica (nomi e punti come nel file reale)
+SYNTHETIC_ACTIONS = [
+    {'name': 'Presenza', 'points': 1},
+    {'name': 'Assenza', 'points': -0.5},
+    {'name': 'Allenamento ottimale', 'points': 1},
+    {'name': 'Sacco con Angy', 'points': 0.5},
+    {'name': 'Footwork tutta la settimana', 'points': 0.5},
+    {'name': 'Jolly notaio', 'points': 1},
+    {'name': 'Ritardo Inizio Lezione', 'points': -0.5},
+    {'name': 'Imbruttire ad Angy', 'points': -0.5},
+    {'name': 'Non Urlo tutta la settimana', 'points': -0.5},
+    {'name': 'Allenamento Schifoso', 'points': -0.5},
+]
+
+SESSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY, userId TEXT NOT NULL REFERENCES users(id), expiresAt TEXT NOT NULL,
+    createdAt TEXT NOT NULL
+);
+"""
+
+
+def synthetic_dataset(n_students, n_scores, n_weeks, seed=0):
+    """
+    Stagione sintetica nel formato del seed letto da db_loader.build_rows.
+    I punteggi sono (studente, lezione, azione) estratti a caso; le ripetizioni
+    della stessa terna diventano un'unica azione con count > 1.
+    """
+    rng = np.random.default_rng(seed)
+    students = [f"Studente {idx:05d}" for idx in range(n_students)]
+
+    lessons = []
+    for week in range(1, n_weeks + 1):
+        for day_number, weekday in enumerate(LESSON_DAYS, 1):
+            lesson_day = COURSE_START + timedelta(days=(week - 1) * 7 + weekday)
+            lessons.append({
+                'lesson_number': len(lessons) + 1,
+                'week_number': week,
+                'day_number': day_number,
+                'date': lesson_day.date().isoformat(),
+                'title': f"Lezione {day_number} - Settimana {week}",
+            })
+
+    student_idx = rng.integers(0, n_students, n_scores)
+    lesson_idx = rng.integers(0, len(lessons), n_scores)
+    action_idx = rng.integers(0, len(SYNTHETIC_ACTIONS), n_scores)
+    keys = (student_idx * len(lessons) + lesson_idx) * len(SYNTHETIC_ACTIONS) + action_idx
+    unique_keys, counts = np.unique(keys, return_counts=True)
+
+    student_scores = {}
+    for key, count in zip(unique_keys.tolist(), counts.tolist()):
+        rest, action = divmod(key, len(SYNTHETIC_ACTIONS))
+        student, lesson = divmod(rest, len(lessons))
+        action_data = SYNTHETIC_ACTIONS[action]
+        lesson_key = f"{lesson + 1}_lezione"
+        student_lessons = student_scores.setdefault(students[student], {})
+        student_lessons.setdefault(lesson_key, {'actions': []})['actions'].append({
+            'action': action_data['name'],
+            'count': count,
+            'points': action_data['points'] * count,
+        })
+
+    return {
+        'students': students,
+        'actions': SYNTHETIC_ACTIONS,
+        'lessons': lessons,
+        'student_scores': student_scores,
+    }
+
+
+def create_session(conn, placeholder, quote, user_id, now):
+    """
+    Sessione valida per SESSION_DAYS giorni (tabella sessions dello schema Prisma).
+    L'id è deterministico: rilanciando il seed la sessione esistente viene rinnovata.
+    """
+    session_id = deterministic_id('loadtest_session', user_id)
+    expires_at = (datetime.now() + timedelta(days=SESSION_DAYS)).isoformat()
+    columns = ', '.join(f'{quote}{column}{quote}' for column in ['id', 'userId', 'expiresAt', 'createdAt'])
+    expires_column = f'{quote}expiresAt{quote}'
+    statement = (f'INSERT INTO {quote}sessions{quote} ({columns}) VALUES ({", ".join([placeholder] * 4)}) '
+                 f'ON CONFLICT ({quote}id{quote}) DO UPDATE SET {expires_column} = EXCLUDED.{expires_column}')
+    cursor = conn.cursor()
+    try:
+        cursor.execute(statement, (session_id, user_id, expires_at, now))
+        conn.commit()
+    finally:
+        cursor.close()
+    return session_id
+
+
+def seed(args):
+    data = synthetic_dataset(args.students, args.scores, args.weeks, args.seed)
+    dataset = {'students': args.students, 'scores': args.scores, 'weeks': args.weeks, 'seed': args.seed}
+
+    # Il checkpoint vale per gli stessi parametri di generazione
+    fingerprint = json.dumps(dataset, sort_keys=True)
+    checkpoint = load_checkpoint(args.checkpoint, fingerprint, args.batch_size)
+    now = checkpoint.setdefault('created_at', datetime.now().isoformat())
+    teacher_password = hash_password(DEFAULT_TEACHER_PASSWORD)
+
+    conn, placeholder, quote = connect(args.database)
+    try:
+        if placeholder == '?':
+            conn.executescript(SESSIONS_SCHEMA)
+        user_ids = existing_user_ids(conn, quote)
+        rows = build_rows(data, now, teacher_password, user_ids)
+        stats = load_rows(conn, placeholder, quote, rows, checkpoint, args.checkpoint, args.batch_size)
+        first_email = student_email(data['students'][0])
+        student_id = user_ids.get(first_email) or deterministic_id('user', first_email)
+        session_id = create_session(conn, placeholder, quote, student_id, now)
+    finally:
+        conn.close()
+
+    print_stats(stats)
+    dataset['score_rows'] = len(rows['scores'])
+    state = {'database': args.database, 'dataset': dataset, 'session': session_id,
+             'teacher': TEACHER['email'], 'student': data['students'][0]}
+    with open(args.state, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    print(f"🔑 Sessione di {data['students'][0]} salvata in {args.state}")
+
+
+def previous_runs(history_path):
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_record(results, route, state, concurrency):
+    p50, p95, p99 = percentiles(results['latencies_ms'])
+    return {
+        'at': datetime.now().isoformat(),
+        'route': route,
+        'dataset': state['dataset'],
+        'concurrency': concurrency,
+        'requests': results['requests'],
+        'seconds': round(results['seconds'], 3),
+        'rps': round(results['rps'], 2),
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'statuses': {str(status): count for status, count in results['statuses'].items()},
+        'histogram': histogram(results['latencies_ms']),
+    }
+
+
+def print_comparison(record, history):
+    """Confronto con l'ultima esecuzione a parità di pagina, dataset e concorrenza"""
+    same = [old for old in history
+            if old['route'] == record['route'] and old['dataset'] == record['dataset']
+            and old['concurrency'] == record['concurrency']]
+    if not same:
+        return
+    previous = same[-1]
+    rps_change = (record['rps'] / previous['rps'] - 1) * 100 if previous['rps'] else 0.0
+    p95_change = (record['p95_ms'] / previous['p95_ms'] - 1) * 100 if previous['p95_ms'] else 0.0
+    print(f"   Rispetto al {previous['at'][:16]}: req/s {rps_change:+.1f}%, p95 {p95_change:+.1f}%")
+
+
+def run(args):
+    with open(args.state, encoding='utf-8') as f:
+        state = json.load(f)
+    headers = {'Cookie': f"session={state['session']}", 'Accept-Encoding': 'gzip'}
+    history = previous_runs(args.history)
+    dataset = state['dataset']
+    print(f"👥 Dataset: {dataset['students']} studenti, {dataset.get('score_rows', dataset['scores'])} punteggi")
+
+    records = []
+    for route in args.routes or DEFAULT_ROUTES:
+        results = run_load(args.base_url.rstrip('/') + route, args.concurrency, args.duration, headers=headers)
+        print_results(results)
+        if any(str(status).startswith('3') for status in results['statuses']):
+            print("   ⚠️ Risposte di redirect: la sessione non è valida (rieseguire seed sullo stesso database)")
+        record = run_record(results, route, state, args.concurrency)
+        print_comparison(record, history)
+        records.append(record)
+
+    with open(args.history, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    print(f"\n✅ Risultati aggiunti a {args.history}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test di carico delle classifiche dell'app FantaKombat")
+    parser.add_argument('--state', default=DEFAULT_STATE)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help="carica una stagione sintetica nel database")
+    seed_parser.add_argument('--database', default=DEFAULT_DATABASE,
+                             help="percorso SQLite (o sqlite:///...) oppure URL postgresql://")
+    seed_parser.add_argument('--students', type=int, default=10000)
+    seed_parser.add_argument('--scores', type=int, default=100000)
+    seed_parser.add_argument('--weeks', type=int, default=25)
+    seed_parser.add_argument('--seed', type=int, default=0)
+    seed_parser.add_argument('--batch-size', type=int, default=2000)
+    seed_parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+
+    run_parser = commands.add_parser('run', help="misura le pagine su un'istanza locale dell'app")
+    run_parser.add_argument('--base-url', default='http://127.0.0.1:5173')
+    run_parser.add_argument('--route', action='append', dest='routes')
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--duration', type=float, default=10.0)
+    run_parser.add_argument('--history', default=DEFAULT_HISTORY)
+    args = parser.parse_args()
+
+    if args.command == 'seed':
+        seed(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Matrice delle presenze a bit: studenti x lezioni, un bit per lezione.
+
+I fogli registrano solo quante volte uno studente è stato presente o assente
+nella settimana (colonne 'Presenza' e 'Assenza'). Le lezioni di una settimana
+sono il massimo di presenze + assenze registrate nel foglio; le presenze
+occupano le prime lezioni della settimana (stessa convenzione di spread_counts
+in lesson_views.py). Tutto ciò che dipende dalla posizione delle lezioni nella
+settimana (serie di presenze consecutive, giorno della settimana) è quindi una stima:
+chi è stato presente lunedì e venerdì ma non mercoledì risulta presente alle prime due.
+
+Le righe sono impacchettate con np.packbits: totali con popcount e controlli
+come "presente a tutte le lezioni della settimana N" sono operazioni bit a bit
+su tutta la classe insieme.
+
+Esempio:
+    python attendance.py FantaKombat.xls --week 10
+"""
+
+import argparse
+
+import numpy as np
+
+from scoring import calculate_points
+from season import action_counts, build_season
+from sheet_calendar import calendar_for
+
+PRESENCE_ACTION = 'Presenza'
+ABSENCE_ACTION = 'Assenza'
+
+if hasattr(np, 'bitwise_count'):
+    popcount = np.bitwise_count
+else:
+    POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+    def popcount(values):
+        return POPCOUNT_TABLE[values]
+
+
+def weekly_attendance_counts(season):
+    """Ritorna (presenze, assenze): due array interi studenti x settimane"""
+    counts = action_counts(season)
+    presences = counts[:, :, season['actions'].index(PRESENCE_ACTION)]
+    absences = counts[:, :, season['actions'].index(ABSENCE_ACTION)]
+    return np.rint(presences).astype(int), np.rint(absences).astype(int)
+
+
+def lesson_layout(presences, absences):
+    """
+    Numero di lezioni di ogni settimana (almeno 1) e indice della prima lezione.
+    Ritorna (lessons_per_week, week_start, lesson_week).
+    """
+    lessons_per_week = np.maximum((presences + absences).max(axis=0, initial=0), 1)
+    week_start = np.concatenate(([0], np.cumsum(lessons_per_week)[:-1]))
+    lesson_week = np.repeat(np.arange(len(lessons_per_week)), lessons_per_week)
+    return lessons_per_week, week_start, lesson_week
+
+
+def weekly_counts_from_weekly_scores(weekly_scores, students, n_weeks):
+    """
+    Presenze e assenze (studenti x settimane) dal formato 'weekly_scores'
+    di extract_fantakombat_data.py, contando le unità dal valore della cella (es. '1+1+1' = 3).
+    """
+    presences = np.zeros((len(students), n_weeks), dtype=int)
+    absences = np.zeros((len(students), n_weeks), dtype=int)
+    targets = {PRESENCE_ACTION: presences, ABSENCE_ACTION: absences}
+
+    for row, student in enumerate(students):
+        for week_key, week_data in weekly_scores.get(student, {}).items():
+            week_idx = int(week_key.split('_')[1]) - 1
+            if not 0 <= week_idx < n_weeks:
+                continue
+            for action in week_data['actions']:
+                target = targets.get(action['action'].split('(')[0].strip())
+                if target is not None:
+                    target[row, week_idx] += int(round(calculate_points(action['value'], 1.0)))
+    return presences, absences
+
+
+def attendance_from_weekly_scores(data):
+    """
+    Matrice delle presenze da un'estrazione di extract_fantakombat_data.py.
+    Le date delle lezioni vengono ricavate dal nome del foglio riportato nella descrizione.
+    """
+    students = [student['name'] for student in data['students']]
+    students += sorted(set(data['weekly_scores']) - set(students))
+    n_weeks = data['course_info']['total_weeks']
+
+    sheets = [''] * n_weeks
+    for lesson in data['lessons']:
+        if 1 <= lesson['week'] <= n_weeks and ' - ' in lesson.get('description', ''):
+            sheets[lesson['week'] - 1] = lesson['description'].split(' - ', 1)[1]
+
+    presences, absences = weekly_counts_from_weekly_scores(data['weekly_scores'], students, n_weeks)
+    return build_attendance_from_counts(students, sheets, presences, absences)
+
+
+def lesson_dates(week_dates, lessons_per_week):
+    """Data ISO di ogni lezione dalle date di ogni settimana (None se non ricavabile)"""
+    dates = []
+    for dates_of_week, n_lessons in zip(week_dates, lessons_per_week):
+        dates.extend(dates_of_week[day] if day < len(dates_of_week) else None for day in range(n_lessons))
+    return dates
+
+
+def build_attendance_from_counts(students, sheets, presences, absences, week_dates=None):
+    """
+    Costruisce la matrice delle presenze impacchettata da presenze e assenze settimanali.
+
+    Ritorna un dizionario con:
+      - students / sheets: etichette di righe e settimane
+      - n_lessons, lessons_per_week, week_start, lesson_week, lesson_dates
+      - bits: array uint8 (studenti x ceil(lezioni / 8)), bit 1 = presente
+    """
+    lessons_per_week, week_start, lesson_week = lesson_layout(presences, absences)
+    if week_dates is None:
+        lesson_calendar = calendar_for(tuple(enumerate(sheets, 1)))
+        week_dates = [lesson_calendar.week_dates(week) for week in range(1, len(sheets) + 1)]
+
+    # Lezione l della settimana w è frequentata se l - inizio(w) < presenze(w)
+    offset_in_week = np.arange(len(lesson_week)) - week_start[lesson_week]
+    attended = offset_in_week[np.newaxis, :] < presences[:, lesson_week]
+
+    return {
+        'students': list(students),
+        'sheets': list(sheets),
+        'n_lessons': len(lesson_week),
+        'lessons_per_week': lessons_per_week,
+        'week_start': week_start,
+        'lesson_week': lesson_week,
+        'lesson_dates': lesson_dates(week_dates, lessons_per_week),
+        'bits': np.packbits(attended, axis=1),
+    }
+
+
+def build_attendance(season):
+    """Matrice delle presenze della stagione (vedi build_attendance_from_counts)"""
+    presences, absences = weekly_attendance_counts(season)
+    return build_attendance_from_counts(season['students'], season['sheets'], presences, absences)
+
+
+def unpack(attendance):
+    """Matrice booleana studenti x lezioni"""
+    return np.unpackbits(attendance['bits'], axis=1, count=attendance['n_lessons']).astype(bool)
+
+
+def lesson_mask(attendance, lessons):
+    """Maschera impacchettata (una riga) con i bit delle lezioni indicate"""
+    mask = np.zeros(attendance['n_lessons'], dtype=bool)
+    mask[lessons] = True
+    return np.packbits(mask)
+
+
+def week_mask(attendance, week_idx):
+    """Maschera impacchettata delle lezioni della settimana (indice 0-based)"""
+    start = attendance['week_start'][week_idx]
+    return lesson_mask(attendance, slice(start, start + attendance['lessons_per_week'][week_idx]))
+
+
+def attendance_totals(attendance, mask=None):
+    """Lezioni frequentate per studente (popcount), eventualmente solo quelle della maschera"""
+    bits = attendance['bits'] if mask is None else attendance['bits'] & mask
+    return popcount(bits).sum(axis=1, dtype=np.int64)
+
+
+def attended_all(attendance, mask):
+    """True per gli studenti presenti a tutte le lezioni della maschera"""
+    return ((attendance['bits'] & mask) == mask).all(axis=1)
+
+
+def attended_all_week(attendance, week_idx):
+    """True per gli studenti presenti a tutte le lezioni della settimana"""
+    return attended_all(attendance, week_mask(attendance, week_idx))
+
+
+def streaks(attendance):
+    """
+    Stima delle serie di presenze consecutive per studente.
+    Le presenze occupano le prime lezioni di ogni settimana, quindi la serie è esatta
+    solo attraverso settimane complete; una settimana parziale la interrompe sempre
+    all'ultima lezione (la serie in corso è 0 se l'ultima settimana non è completa).
+    Ritorna (longest, current): la serie più lunga e quella in corso all'ultima lezione.
+    """
+    attended = unpack(attendance)
+    n_students, n_lessons = attended.shape
+    if n_lessons == 0:
+        return np.zeros(n_students, dtype=int), np.zeros(n_students, dtype=int)
+
+    # Per ogni lezione: distanza dall'ultima assenza (0 se assente)
+    positions = np.arange(n_lessons)
+    last_absence = np.maximum.accumulate(np.where(attended, -1, positions), axis=1)
+    run_lengths = positions - last_absence
+    return run_lengths.max(axis=1), run_lengths[:, -1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presenze FantaKombat")
+    parser.add_argument('file_path', nargs='?', default='FantaKombat.xls')
+    parser.add_argument('--week', type=int, help="settimana (1..N) da controllare")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    attendance = build_attendance(build_season(args.file_path))
+    totals = attendance_totals(attendance)
+    longest, current = streaks(attendance)
+
+    print(f"📅 {attendance['n_lessons']} lezioni in {len(attendance['sheets'])} settimane")
+    print("\n🏅 Più presenze (serie stimate: i fogli non dicono in quali lezioni della settimana):")
+    for row in np.argsort(-totals, kind='stable')[:args.top]:
+        print(f"  {attendance['students'][row]:25s} {totals[row]:3d} presenze "
+              f"(serie più lunga {longest[row]}, in corso {current[row]})")
+
+    if args.week:
+        complete = attended_all_week(attendance, args.week - 1)
+        names = [name for name, ok in zip(attendance['students'], complete) if ok]
+        print(f"\n✅ Presenti a tutte le lezioni della settimana {args.week}: {len(names)}")
+        for name in names:
+            print(f"  {name}")
+
+
+if __name__ == "__main__":
+    main()
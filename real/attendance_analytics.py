@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Analisi delle presenze: frequenza mobile, abbandoni, retention e giorni della settimana.
+
+Tutte le metriche partono dalla matrice studenti x lezioni di attendance.py e
+vengono calcolate in blocco (somme cumulative e finestre mobili sull'intera
+classe), senza scorrere i punteggi studente per studente.
+
+Frequenza, abbandoni e retention usano solo i conteggi settimanali registrati nei fogli.
+Le presenze per giorno della settimana sono invece una stima: i fogli non dicono a
+quali lezioni della settimana si è stati presenti e attendance.py le mette nelle prime,
+quindi il primo giorno è sovrastimato e l'ultimo sottostimato. Report e JSON le
+riportano come stima.
+
+Esempio:
+    python attendance_analytics.py FantaKombat.xls
+"""
+
+import argparse
+from datetime import date
+
+import numpy as np
+
+from attendance import build_attendance, unpack
+from output_io import write_json
+from season import build_season
+
+ROLLING_WEEKS = 4
+DROP_OFF_WEEKS = 4
+ANALYTICS_FILE = 'fantakombat_attendance.json'
+WEEKDAYS = ['Lunedì', 'Martedì', 'Mercoledì', 'Giovedì', 'Venerdì', 'Sabato', 'Domenica']
+
+
+def weekly_attended(attendance):
+    """Lezioni frequentate per studente x settimana"""
+    attended = unpack(attendance).astype(np.int64)
+    if attended.shape[1] == 0:
+        return np.zeros((attended.shape[0], 0), dtype=np.int64)
+    return np.add.reduceat(attended, attendance['week_start'], axis=1)
+
+
+def window_sums(matrix, window):
+    """Somma mobile sulle ultime `window` colonne (finestra troncata all'inizio)"""
+    cumulative = np.cumsum(matrix, axis=-1)
+    shifted = np.zeros_like(cumulative)
+    shifted[..., window:] = cumulative[..., :-window]
+    return cumulative - shifted
+
+
+def rolling_rate(attended_weekly, lessons_per_week, window=ROLLING_WEEKS):
+    """Frequenza (0..1) sulle ultime `window` settimane, per studente x settimana"""
+    lessons = window_sums(np.asarray(lessons_per_week, dtype=float), window)
+    return window_sums(attended_weekly.astype(float), window) / lessons[np.newaxis, :]
+
+
+def drop_off_weeks(attended_weekly, min_gap=DROP_OFF_WEEKS):
+    """
+    Settimana di abbandono (indice 0-based) per studente: la settimana dopo l'ultima
+    presenza, se da lì alla fine ci sono almeno `min_gap` settimane senza presenze.
+    -1 per chi è ancora attivo o non ha mai frequentato.
+    """
+    active = attended_weekly > 0
+    n_weeks = active.shape[1]
+    ever = active.any(axis=1)
+    last_active = n_weeks - 1 - np.argmax(active[:, ::-1], axis=1)
+    dropped = ever & (n_weeks - 1 - last_active >= min_gap)
+    return np.where(dropped, last_active + 1, -1)
+
+
+def retention_curves(attended_weekly):
+    """
+    Retention per coorte (settimana della prima presenza).
+    Ritorna (cohorts, sizes, curves): curves[c, k] è la quota della coorte c ancora
+    attiva k settimane dopo l'ingresso, cioè presente alla settimana +k o a una successiva
+    (NaN oltre la fine della stagione). Le curve quindi non crescono mai.
+    """
+    active = attended_weekly > 0
+    n_students, n_weeks = active.shape
+    if n_weeks == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros((0, 0))
+    ever = active.any(axis=1)
+    first_week = np.argmax(active, axis=1)
+
+    # Riallinea ogni studente alla propria settimana di ingresso
+    offsets = first_week[:, np.newaxis] + np.arange(n_weeks)[np.newaxis, :]
+    in_season = offsets < n_weeks
+    aligned = np.take_along_axis(active, np.minimum(offsets, n_weeks - 1), axis=1) & in_season
+    # Attivo a +k se presente a +k o dopo: OR cumulativo da destra
+    still_active = np.logical_or.accumulate(aligned[:, ::-1], axis=1)[:, ::-1]
+
+    cohorts = np.unique(first_week[ever])
+    cohort_of = np.searchsorted(cohorts, first_week[ever])
+    sizes = np.bincount(cohort_of, minlength=len(cohorts))
+    retained = np.zeros((len(cohorts), n_weeks))
+    np.add.at(retained, cohort_of, still_active[ever])
+
+    curves = retained / np.maximum(sizes, 1)[:, np.newaxis]
+    curves[np.arange(n_weeks)[np.newaxis, :] >= (n_weeks - cohorts)[:, np.newaxis]] = np.nan
+    return cohorts, sizes, curves
+
+
+def weekday_attendance(attendance):
+    """
+    Stima delle presenze per giorno della settimana (lezioni con data nota).
+    Non è una misura: i fogli registrano solo il numero di presenze della settimana e
+    attendance.py le colloca nelle prime lezioni, quindi il primo giorno è sovrastimato
+    e l'ultimo sottostimato.
+    Ritorna (attendees, lessons): due array di 7 elementi, lunedì = 0.
+    """
+    attendees_per_lesson = unpack(attendance).sum(axis=0)
+    weekdays = np.array([date.fromisoformat(day).weekday() if is_valid_date(day) else -1
+                         for day in attendance['lesson_dates']], dtype=int)
+    known = weekdays >= 0
+    attendees = np.bincount(weekdays[known], weights=attendees_per_lesson[known], minlength=7)
+    lessons = np.bincount(weekdays[known], minlength=7)
+    return attendees, lessons
+
+
+def is_valid_date(value):
+    try:
+        date.fromisoformat(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def compute_analytics(attendance, window=ROLLING_WEEKS, drop_off_gap=DROP_OFF_WEEKS):
+    """
+    Calcola tutte le metriche in un unico passaggio sulla matrice delle presenze.
+    window: settimane della frequenza mobile; drop_off_gap: settimane senza presenze
+    fino a fine stagione per considerare uno studente un abbandono.
+    """
+    attended = weekly_attended(attendance)
+    cohorts, sizes, curves = retention_curves(attended)
+    attendees, lessons = weekday_attendance(attendance)
+    return {
+        'window': window,
+        'drop_off_gap': drop_off_gap,
+        'attended_weekly': attended,
+        'rolling_rate': rolling_rate(attended, attendance['lessons_per_week'], window),
+        'drop_off': drop_off_weeks(attended, drop_off_gap),
+        'cohorts': cohorts,
+        'cohort_sizes': sizes,
+        'retention': curves,
+        'weekday_attendees': attendees,
+        'weekday_lessons': lessons,
+    }
+
+
+def analytics_to_dict(analytics, attendance):
+    """Versione serializzabile in JSON delle metriche (settimane numerate da 1)"""
+    weeks = [sheet.strip() for sheet in attendance['sheets']]
+    return {
+        'window_weeks': analytics['window'],
+        'drop_off_weeks': analytics['drop_off_gap'],
+        'weeks': weeks,
+        'students': {
+            student: {
+                'attended_lessons': [int(count) for count in analytics['attended_weekly'][row]],
+                'rolling_rate': [round(float(rate), 4) for rate in analytics['rolling_rate'][row]],
+                'drop_off_week': int(analytics['drop_off'][row]) + 1 if analytics['drop_off'][row] >= 0 else None,
+            }
+            for row, student in enumerate(attendance['students'])
+        },
+        'retention': [
+            {
+                'cohort_week': int(cohort) + 1,
+                'size': int(size),
+                'curve': [round(float(rate), 4) for rate in curve if not np.isnan(rate)],
+            }
+            for cohort, size, curve in zip(analytics['cohorts'], analytics['cohort_sizes'], analytics['retention'])
+        ],
+        'weekdays': {
+            'estimated': True,
+            'note': "stima: i fogli registrano solo le presenze della settimana, "
+                    "attribuite alle prime lezioni (primo giorno sovrastimato, ultimo sottostimato)",
+            'days': [
+                {
+                    'weekday': WEEKDAYS[day],
+                    'lessons': int(analytics['weekday_lessons'][day]),
+                    'estimated_attendees': int(analytics['weekday_attendees'][day]),
+                }
+                for day in range(7) if analytics['weekday_lessons'][day]
+            ],
+        },
+    }
+
+
+def format_attendance_report(analytics, attendance):
+    """Righe di testo per il report: frequenza recente, abbandoni, retention e giorni"""
+    students = attendance['students']
+    window = analytics['window']
+    report = []
+    report.append("PRESENZE E RETENTION")
+    report.append("-" * 40)
+
+    report.append(f"Frequenza nelle ultime {window} settimane:")
+    latest = analytics['rolling_rate'][:, -1] if analytics['rolling_rate'].size else np.zeros(len(students))
+    for row in np.argsort(-latest, kind='stable'):
+        if analytics['attended_weekly'][row].any() and analytics['drop_off'][row] < 0:
+            report.append(f"  {students[row]:<25} {latest[row] * 100:5.1f}%")
+
+    report.append("")
+    report.append(f"ABBANDONI (almeno {analytics['drop_off_gap']} settimane senza presenze fino a fine stagione):")
+    dropped = [(int(week), students[row]) for row, week in enumerate(analytics['drop_off']) if week >= 0]
+    for week, name in sorted(dropped):
+        report.append(f"  {name:<25} dalla settimana {week + 1}")
+    if not dropped:
+        report.append("  Nessuno")
+
+    report.append("")
+    report.append("RETENTION PER COORTE (quota ancora attiva dopo 1, 4, 8 settimane):")
+    for cohort, size, curve in zip(analytics['cohorts'], analytics['cohort_sizes'], analytics['retention']):
+        steps = []
+        for offset in (1, 4, 8):
+            if offset < len(curve) and not np.isnan(curve[offset]):
+                steps.append(f"+{offset}: {curve[offset] * 100:3.0f}%")
+        report.append(f"  Ingresso settimana {cohort + 1:2d} ({size} studenti): {', '.join(steps) or '-'}")
+
+    report.append("")
+    report.append("PRESENZE PER GIORNO DELLA SETTIMANA (STIMA):")
+    report.append("  I fogli registrano solo quante presenze ci sono in una settimana, non in quali giorni:")
+    report.append("  le presenze sono attribuite alle prime lezioni, quindi il primo giorno è sovrastimato")
+    report.append("  e l'ultimo sottostimato.")
+    for day in range(7):
+        lessons = analytics['weekday_lessons'][day]
+        if lessons:
+            attendees = analytics['weekday_attendees'][day]
+            report.append(f"  {WEEKDAYS[day]:<10} {lessons:3d} lezioni, ~{attendees / lessons:5.1f} presenti in media (stima)")
+
+    return report
+
+
+def save_analytics(analytics, attendance, filename=ANALYTICS_FILE):
+    """Salva le metriche in JSON; ritorna il percorso scritto"""
+    return write_json(analytics_to_dict(analytics, attendance), filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisi presenze FantaKombat")
+    parser.add_argument('file_path', nargs='?', default='FantaKombat.xls')
+    parser.add_argument('--window', type=int, default=ROLLING_WEEKS,
+                        help="settimane della frequenza mobile")
+    parser.add_argument('--drop-off', type=int, default=DROP_OFF_WEEKS, dest='drop_off_gap',
+                        help="settimane senza presenze fino a fine stagione per un abbandono")
+    parser.add_argument('--output', default=ANALYTICS_FILE)
+    args = parser.parse_args()
+    if args.window < 1:
+        parser.error("--window deve essere almeno 1")
+    if args.drop_off_gap < 1:
+        parser.error("--drop-off deve essere almeno 1")
+
+    attendance = build_attendance(build_season(args.file_path))
+    analytics = compute_analytics(attendance, args.window, args.drop_off_gap)
+    print('\n'.join(format_attendance_report(analytics, attendance)))
+    print(f"\n✅ Metriche salvate in: {save_analytics(analytics, attendance, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,19 @@
 Script per creare un report dettagliato dei dati FantaKombat.
 """
 
-import json
 from datetime import datetime
 
+from attendance import attendance_from_weekly_scores
+from attendance_analytics import compute_analytics, format_attendance_report, save_analytics
+from output_io import read_json
+from ranking_history import compute_history, format_history_report, points_matrix_from_weekly_scores
+from rollups import build_rollups, format_monthly_report
+
 def create_detailed_report():
     """Crea un report dettagliato dei dati FantaKombat."""
     
-    # Carica i dati JSON
-    with open('fantakombat_data.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Carica i dati JSON (semplice, compatto o compresso)
+    data = read_json('fantakombat_data.json')
     
     report = []
     
@@ -140,6 +144,26 @@ def create_detailed_report():
     
     report.append("")
     
+    # Andamento della classifica (calcolato in un'unica operazione su tutte le settimane)
+    history_students = list(data['weekly_scores'].keys())
+    points_matrix = points_matrix_from_weekly_scores(
+        data['weekly_scores'], history_students, course_info['total_weeks']
+    )
+    history = compute_history(points_matrix)
+    report.extend(format_history_report(history, history_students))
+    report.append("")
+
+    # Punti per mese (tabelle di aggregazione costruite in un unico passaggio)
+    report.extend(format_monthly_report(build_rollups(data)))
+    report.append("")
+
+    # Presenze e retention (anche in formato JSON per altri strumenti)
+    attendance = attendance_from_weekly_scores(data)
+    attendance_analytics = compute_analytics(attendance)
+    report.extend(format_attendance_report(attendance_analytics, attendance))
+    report.append("")
+    attendance_file = save_analytics(attendance_analytics, attendance)
+    
     # Salva il report
     with open('fantakombat_report.txt', 'w', encoding='utf-8') as f:
         f.write('\n'.join(report))
@@ -158,6 +182,7 @@ def create_detailed_report():
     print(f"📈 Punteggio medio: {avg_points:.1f} punti")
     print(f"📄 File JSON: fantakombat_data.json")
     print(f"📝 Report testuale: fantakombat_report.txt")
+    print(f"📅 Presenze e retention: {attendance_file}")
     
     return report
 
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Indici di interrogazione sui dati estratti.
+
+Invece di scorrere ogni volta tutta la lista dei punteggi, ScoreIndex carica
+un'estrazione una sola volta e costruisce indici per studente, lezione, azione,
+settimana e data (array ordinati + ricerca binaria). I risultati sono viste
+(RecordsView) sulle righe originali, non copie.
+
+Formati supportati:
+  - 'scores': lista piatta di punteggi (extract_fantakombat_data_final.py)
+  - 'student_scores': studente -> lezione -> azioni (seed, _complete, extract_correct_data)
+  - 'weekly_scores': studente -> settimana -> azioni (extract_fantakombat_data.py e _fixed)
+
+Esempio:
+    python dataset_index.py fantakombat_data.json --student Raffa --from 2025-03-01 --to 2025-03-31
+"""
+
+import argparse
+from collections.abc import Sequence
+from datetime import date, datetime
+
+import numpy as np
+
+from fixed_point import from_units, to_units
+from output_io import read_json
+from sheet_calendar import build_calendar
+
+NO_DATE = -1
+
+
+def to_ordinal(value):
+    """Converte una data (date, datetime o stringa ISO) in ordinale; NO_DATE se mancante"""
+    if value is None or value == '':
+        return NO_DATE
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return datetime.fromisoformat(str(value)[:10]).date().toordinal()
+    except ValueError:
+        return NO_DATE
+
+
+def lessons_calendar(lessons):
+    """Calendario dei nomi di foglio usati come data dalle lezioni (in ordine), per lesson_date_ordinal"""
+    sheet_names = [str(lesson['date']) for lesson in lessons
+                   if lesson.get('date') and to_ordinal(lesson['date']) == NO_DATE]
+    return build_calendar(list(dict.fromkeys(sheet_names)))
+
+
+def lesson_date_ordinal(lesson, lesson_calendar):
+    """Data di una lezione: campo ISO se presente, altrimenti primo giorno del suo foglio nel calendario"""
+    ordinal = to_ordinal(lesson.get('date'))
+    if ordinal == NO_DATE and lesson.get('date'):
+        sheet_dates = lesson_calendar.sheet_dates(str(lesson['date']))
+        if sheet_dates:
+            ordinal = to_ordinal(sheet_dates[0])
+    return ordinal
+
+
+def flatten_dataset(data):
+    """
+    Riduce un'estrazione a una lista di punteggi con le chiavi
+    student, lesson, week, action, points e alla lista delle loro date (ordinali).
+    Per il formato 'scores' le righe restituite sono quelle originali.
+    """
+    if 'scores' in data:
+        lessons = {lesson_id: lesson for lesson_id, lesson in enumerate(data['lessons'], 1)}
+        records = data['scores']
+        weeks = [lessons.get(record['lesson_id'], {}).get('week') for record in records]
+        lesson_calendar = lessons_calendar(data['lessons'])
+        lesson_dates = {lesson_id: lesson_date_ordinal(lesson, lesson_calendar) for lesson_id, lesson in lessons.items()}
+        dates = [lesson_dates.get(record['lesson_id'], NO_DATE) for record in records]
+        return records, weeks, dates
+
+    records, weeks, dates = [], [], []
+
+    if 'student_scores' in data:
+        lessons = {lesson['lesson_number']: lesson for lesson in data.get('lessons', [])}
+        lesson_calendar = lessons_calendar(data.get('lessons', []))
+        lesson_dates = {number: lesson_date_ordinal(lesson, lesson_calendar) for number, lesson in lessons.items()}
+        for student, student_lessons in data['student_scores'].items():
+            for lesson_key, lesson_data in student_lessons.items():
+                lesson_number = int(lesson_key.split('_')[0])
+                lesson = lessons.get(lesson_number, {})
+                week = lesson.get('week_number', lesson.get('week'))
+                for action in lesson_data['actions']:
+                    records.append({
+                        'student': student,
+                        'lesson': lesson_number,
+                        'week': week,
+                        'action': action['action'],
+                        'points': action['points']
+                    })
+                    weeks.append(week)
+                    dates.append(lesson_dates.get(lesson_number, NO_DATE))
+        return records, weeks, dates
+
+    if 'weekly_scores' in data:
+        first_lesson = {}
+        lesson_calendar = lessons_calendar(data.get('lessons', []))
+        for lesson in data.get('lessons', []):
+            first_lesson.setdefault(lesson['week'], lesson_date_ordinal(lesson, lesson_calendar))
+        for student, student_weeks in data['weekly_scores'].items():
+            for week_key, week_data in student_weeks.items():
+                week = int(week_key.split('_')[1])
+                for action in week_data['actions']:
+                    records.append({
+                        'student': student,
+                        'lesson': None,
+                        'week': week,
+                        'action': action['action'],
+                        'points': action['calculated_points']
+                    })
+                    weeks.append(week)
+                    dates.append(first_lesson.get(week, NO_DATE))
+        return records, weeks, dates
+
+    raise ValueError("Formato dei dati non riconosciuto")
+
+
+class RecordsView(Sequence):
+    """Vista in sola lettura su un sottoinsieme di punteggi (nessuna copia delle righe)"""
+
+    def __init__(self, records, positions):
+        self.records = records
+        self.positions = positions
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordsView(self.records, self.positions[index])
+        return self.records[self.positions[index]]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def total_points(self):
+        return from_units(sum(to_units(self.records[pos]['points']) for pos in self.positions))
+
+    def __repr__(self):
+        return f"RecordsView({len(self)} punteggi)"
+
+
+def build_group_index(keys, dates):
+    """
+    Raggruppa le posizioni per chiave, ordinate per data all'interno del gruppo.
+    Ritorna {chiave: array di posizioni}: ogni array è una fetta (vista) di un'unica permutazione.
+    """
+    labels = np.array([str(key) for key in keys], dtype=object)
+    codes_by_key = {}
+    codes = np.array([codes_by_key.setdefault(label, len(codes_by_key)) for label in labels], dtype=np.int64)
+    order = np.lexsort((dates, codes))
+
+    sorted_codes = codes[order]
+    boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+    starts = np.concatenate(([0], boundaries)) if len(order) else np.array([], dtype=int)
+    ends = np.concatenate((boundaries, [len(order)])) if len(order) else np.array([], dtype=int)
+
+    key_of_code = {code: key for key, code in zip(keys, codes)}
+    return {key_of_code[sorted_codes[start]]: order[start:end] for start, end in zip(starts, ends)}
+
+
+class ScoreIndex:
+    """Indici per studente, lezione, azione, settimana e intervallo di date su un'estrazione"""
+
+    def __init__(self, data):
+        self.records, weeks, dates = flatten_dataset(data)
+        self.dates = np.array(dates, dtype=np.int64)
+
+        self.by_student = build_group_index([record['student'] for record in self.records], self.dates)
+        self.by_lesson = build_group_index([record.get('lesson') for record in self.records], self.dates)
+        self.by_action = build_group_index([record['action'] for record in self.records], self.dates)
+        self.by_week = build_group_index(weeks, self.dates)
+
+        self.date_order = np.argsort(self.dates, kind='stable')
+        self.sorted_dates = self.dates[self.date_order]
+
+    def view(self, positions):
+        return RecordsView(self.records, positions)
+
+    def date_slice(self, positions, start=None, end=None):
+        """Restringe posizioni ordinate per data all'intervallo [start, end] con ricerca binaria"""
+        if start is None and end is None:
+            return positions
+        position_dates = self.dates[positions]
+        lo = 0 if start is None else np.searchsorted(position_dates, to_ordinal(start), side='left')
+        hi = len(positions) if end is None else np.searchsorted(position_dates, to_ordinal(end), side='right')
+        return positions[lo:hi]
+
+    def student(self, name, start=None, end=None):
+        """Punteggi di uno studente, eventualmente in un intervallo di date"""
+        return self.view(self.date_slice(self.by_student.get(name, np.array([], dtype=np.int64)), start, end))
+
+    def lesson(self, lesson):
+        return self.view(self.by_lesson.get(lesson, np.array([], dtype=np.int64)))
+
+    def action(self, action, start=None, end=None):
+        return self.view(self.date_slice(self.by_action.get(action, np.array([], dtype=np.int64)), start, end))
+
+    def week(self, week):
+        return self.view(self.by_week.get(week, np.array([], dtype=np.int64)))
+
+    def between(self, start=None, end=None):
+        """Tutti i punteggi in un intervallo di date"""
+        return self.view(self.date_slice(self.date_order, start, end))
+
+    def query(self, student=None, action=None, week=None, lesson=None, start=None, end=None):
+        """
+        Combina più filtri partendo dall'indice più selettivo.
+        Es. query(action='Sacco con Angy', week=12) -> chi ha fatto 'Sacco con Angy' nella settimana 12.
+        """
+        candidates = []
+        if student is not None:
+            candidates.append(self.by_student.get(student, np.array([], dtype=np.int64)))
+        if action is not None:
+            candidates.append(self.by_action.get(action, np.array([], dtype=np.int64)))
+        if week is not None:
+            candidates.append(self.by_week.get(week, np.array([], dtype=np.int64)))
+        if lesson is not None:
+            candidates.append(self.by_lesson.get(lesson, np.array([], dtype=np.int64)))
+        if not candidates:
+            return self.between(start, end)
+
+        candidates.sort(key=len)
+        positions = candidates[0]
+        for other in candidates[1:]:
+            positions = positions[np.isin(positions, other, assume_unique=True)]
+        return self.view(self.date_slice(positions, start, end))
+
+
+def load_index(path):
+    """Carica un'estrazione (anche compressa) e ne costruisce gli indici"""
+    return ScoreIndex(read_json(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interroga i dati FantaKombat estratti")
+    parser.add_argument('data_file', nargs='?', default='fantakombat_data.json')
+    parser.add_argument('--student')
+    parser.add_argument('--action')
+    parser.add_argument('--week', type=int)
+    parser.add_argument('--from', dest='start')
+    parser.add_argument('--to', dest='end')
+    args = parser.parse_args()
+
+    index = load_index(args.data_file)
+    results = index.query(student=args.student, action=args.action, week=args.week,
+                          start=args.start, end=args.end)
+
+    for record in results:
+        print(f"{record['student']:25s} settimana {record.get('week', '')!s:>3} "
+              f"{record['action'][:40]:40s} {record['points']:+.1f}")
+    print(f"\n{len(results)} punteggi, totale {results.total_points():+.1f} punti")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Caricamento a blocchi e riprendibile dei dati estratti nel database dell'app.
+
+A differenza di prisma/seed_real.ts (che svuota il database e inserisce tutto
+in un colpo solo) questo script:
+  - usa ID deterministici, derivati dalle chiavi naturali (email, nome azione, lezione...)
+  - inserisce le righe ordinate in blocchi di dimensione fissa, ognuno in una transazione
+  - salva un file di checkpoint dopo ogni blocco: un caricamento interrotto riparte
+    dall'ultimo blocco confermato
+  - usa INSERT ... ON CONFLICT DO NOTHING, quindi ripetere un blocco è innocuo
+
+Come il seed crea l'insegnante con password (hash bcrypt, richiede il pacchetto bcrypt)
+e le quattro azioni automatiche di presenza/assenza. Gli utenti già presenti nel
+database (ad esempio creati da seed_real.ts) vengono riconosciuti per email e
+mantengono il loro ID; corso, anno accademico, azioni e lezioni sono invece sempre
+quelli con ID deterministico del caricatore.
+
+Funziona con PostgreSQL (schema creato dalle migrazioni Prisma, richiede psycopg)
+e con un database SQLite locale, per cui crea uno schema equivalente.
+
+Esempio:
+    python db_loader.py fantakombat_data.json --database fantakombat.db
+    python db_loader.py fantakombat_data.json --database postgresql://localhost/fantakombat
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from output_io import read_json, resolve_json_path
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CHECKPOINT = 'db_loader.checkpoint.json'
+
+TEACHER = {'email': 'angy@fantakombat.com', 'name': 'Angela'}
+DEFAULT_TEACHER_PASSWORD = 'password123'
+# Stesso costo di hashPassword in src/lib/auth.ts
+BCRYPT_ROUNDS = 12
+COURSE_NAME = 'FantaKombat 2025 / 2026'
+ACADEMIC_YEAR = {'name': 'Anno 2025 / 2026', 'start': '2025-09-01', 'end': '2026-07-31'}
+COURSE_START = datetime(2025, 1, 13)
+
+# Spazi nei nomi degli studenti: stessa classe di replace(/\s+/g, '.') in prisma/seed_real.ts
+WHITESPACE = re.compile(r'\s+')
+
+# Azioni automatiche create dal seed prima di quelle del file: (nome, punti, tipo, categoria)
+AUTOMATIC_ACTIONS = [
+    ('Presenza', 1.0, 'BONUS', 'SINGLE_PRESENCE'),
+    ('Assenza', -0.5, 'MALUS', 'SINGLE_ABSENCE'),
+    ('Bonus Presenze Consecutive', 0.5, 'BONUS', 'STREAK_PRESENCE'),
+    ('Malus Assenze Consecutive', -0.5, 'MALUS', 'STREAK_ABSENCE'),
+]
+
+# Colonne di ogni tabella nell'ordine di inserimento (nomi dello schema Prisma)
+TABLES = {
+    'users': ['id', 'email', 'password', 'name', 'role', 'createdAt', 'updatedAt'],
+    'courses': ['id', 'name', 'description', 'ownerId', 'isActive', 'createdAt', 'updatedAt'],
+    'academic_years': ['id', 'name', 'courseId', 'startDate', 'endDate', 'isActive', 'createdAt', 'updatedAt'],
+    'academic_year_enrollments': ['id', 'userId', 'academicYearId', 'enrolledAt'],
+    'actions': ['id', 'name', 'description', 'points', 'type', 'courseId', 'isActive', 'isAutomatic',
+                'actionCategory', 'createdAt', 'updatedAt'],
+    'lessons': ['id', 'academicYearId', 'date', 'title', 'description', 'createdAt', 'updatedAt'],
+    'scores': ['id', 'userId', 'actionId', 'lessonId', 'assignedBy', 'points', 'notes', 'createdAt'],
+}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY, email TEXT NOT NULL UNIQUE, password TEXT, name TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'ISCRITTO', createdAt TEXT NOT NULL, updatedAt TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT, ownerId TEXT NOT NULL REFERENCES users(id),
+    isActive BOOLEAN NOT NULL DEFAULT 1, createdAt TEXT NOT NULL, updatedAt TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS academic_years (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, courseId TEXT NOT NULL REFERENCES courses(id),
+    startDate TEXT NOT NULL, endDate TEXT, isActive BOOLEAN NOT NULL DEFAULT 1,
+    createdAt TEXT NOT NULL, updatedAt TEXT NOT NULL, UNIQUE (courseId, name)
+);
+CREATE TABLE IF NOT EXISTS academic_year_enrollments (
+    id TEXT PRIMARY KEY, userId TEXT NOT NULL REFERENCES users(id),
+    academicYearId TEXT NOT NULL REFERENCES academic_years(id), enrolledAt TEXT NOT NULL,
+    UNIQUE (userId, academicYearId)
+);
+CREATE TABLE IF NOT EXISTS actions (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT, points REAL NOT NULL, type TEXT NOT NULL,
+    courseId TEXT NOT NULL REFERENCES courses(id), isActive BOOLEAN NOT NULL DEFAULT 1,
+    isAutomatic BOOLEAN NOT NULL DEFAULT 0, actionCategory TEXT,
+    createdAt TEXT NOT NULL, updatedAt TEXT NOT NULL, UNIQUE (courseId, name)
+);
+CREATE TABLE IF NOT EXISTS lessons (
+    id TEXT PRIMARY KEY, academicYearId TEXT NOT NULL REFERENCES academic_years(id), date TEXT NOT NULL,
+    title TEXT, description TEXT, createdAt TEXT NOT NULL, updatedAt TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    id TEXT PRIMARY KEY, userId TEXT NOT NULL REFERENCES users(id), actionId TEXT NOT NULL REFERENCES actions(id),
+    lessonId TEXT NOT NULL REFERENCES lessons(id), assignedBy TEXT NOT NULL REFERENCES users(id),
+    points REAL NOT NULL, notes TEXT, createdAt TEXT NOT NULL
+);
+"""
+
+
+def deterministic_id(kind, *parts):
+    """ID stabile (stesso formato di lunghezza di un cuid) derivato dalle chiavi naturali"""
+    digest = hashlib.sha1('\x1f'.join([kind] + [str(part) for part in parts]).encode('utf-8')).hexdigest()
+    return f"c{digest[:24]}"
+
+
+def student_email(student_name):
+    """
+    Email dello studente, come in prisma/seed_real.ts: ogni sequenza di spazi,
+    anche iniziale o finale, diventa un solo punto.
+    """
+    local_part = WHITESPACE.sub('.', student_name.lower())
+    return f"{local_part}@fantakombat.com"
+
+
+def lesson_date(lesson):
+    """Data della lezione: quella estratta se presente, altrimenti calcolata come nel seed"""
+    if lesson.get('date'):
+        try:
+            return datetime.fromisoformat(str(lesson['date'])).isoformat()
+        except ValueError:
+            pass
+    offset = (lesson['week_number'] - 1) * 7 + (lesson['day_number'] - 1)
+    return (COURSE_START + timedelta(days=offset)).isoformat()
+
+
+def hash_password(password):
+    """Hash bcrypt compatibile con bcryptjs.compare usato dall'app"""
+    try:
+        import bcrypt
+    except ImportError:
+        raise SystemExit("❌ Per la password dell'insegnante serve il pacchetto bcrypt (pip install bcrypt)")
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS)).decode('ascii')
+
+
+def existing_user_ids(conn, quote):
+    """Mappa email -> ID degli utenti già presenti nel database"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f'SELECT {quote}email{quote}, {quote}id{quote} FROM {quote}users{quote}')
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def build_rows(data, now, teacher_password=None, user_ids=None):
+    """
+    Trasforma i dati estratti (formato del seed) nelle righe di ogni tabella,
+    ordinate per ID. Ritorna {tabella: [tuple, ...]}.
+
+    teacher_password è l'hash della password dell'insegnante (vedi hash_password).
+    user_ids (email -> ID, vedi existing_user_ids) fa riusare gli ID degli utenti già
+    nel database: ON CONFLICT DO NOTHING sull'email terrebbe la riga esistente e
+    iscrizioni e punteggi punterebbero a un ID che non c'è.
+    """
+    user_ids = user_ids or {}
+
+    def user_id_for(email):
+        return user_ids.get(email) or deterministic_id('user', email)
+
+    teacher_id = user_id_for(TEACHER['email'])
+    course_id = deterministic_id('course', COURSE_NAME)
+    year_id = deterministic_id('academic_year', course_id, ACADEMIC_YEAR['name'])
+
+    users = [(teacher_id, TEACHER['email'], teacher_password, TEACHER['name'], 'INSEGNANTE', now, now)]
+    enrollments = []
+    student_ids = {}
+    for student_name in data['students']:
+        email = student_email(student_name)
+        user_id = user_id_for(email)
+        student_ids[student_name] = user_id
+        users.append((user_id, email, None, student_name, 'ISCRITTO', now, now))
+        enrollments.append((deterministic_id('enrollment', user_id, year_id), user_id, year_id, now))
+
+    action_ids = {}
+    actions = []
+    for name, points, action_type, category in AUTOMATIC_ACTIONS:
+        action_id = deterministic_id('action', course_id, name)
+        action_ids[name] = action_id
+        actions.append((action_id, name, None, points, action_type, course_id, True, True, category, now, now))
+    for action in data['actions']:
+        # Il nome è unico nel corso: un'azione del file con il nome di una automatica usa quella
+        if action['name'] in action_ids:
+            continue
+        action_id = deterministic_id('action', course_id, action['name'])
+        action_ids[action['name']] = action_id
+        action_type = 'BONUS' if action['points'] >= 0 else 'MALUS'
+        actions.append((action_id, action['name'], None, float(action['points']), action_type,
+                        course_id, True, False, None, now, now))
+
+    lesson_ids = {}
+    lessons = []
+    for lesson in data['lessons']:
+        lesson_id = deterministic_id('lesson', year_id, lesson['lesson_number'])
+        lesson_ids[lesson['lesson_number']] = lesson_id
+        lessons.append((lesson_id, year_id, lesson_date(lesson), lesson.get('title'), None, now, now))
+
+    scores = []
+    for student_name, student_lessons in data['student_scores'].items():
+        user_id = student_ids.get(student_name)
+        if user_id is None:
+            continue
+        for lesson_key, lesson_data in student_lessons.items():
+            lesson_id = lesson_ids.get(int(lesson_key.split('_')[0]))
+            if lesson_id is None:
+                continue
+            for action_data in lesson_data['actions']:
+                action_id = action_ids.get(action_data['action'])
+                count = int(action_data['count'])
+                if action_id is None or count <= 0:
+                    continue
+                # Un punteggio per ogni occorrenza dell'azione, come nel seed
+                for occurrence in range(count):
+                    score_id = deterministic_id('score', user_id, lesson_id, action_id, occurrence)
+                    scores.append((score_id, user_id, action_id, lesson_id, teacher_id,
+                                   action_data['points'] / count, None, now))
+
+    rows = {
+        'users': users,
+        'courses': [(course_id, COURSE_NAME, 'Corso di Fit&Box con sistema di punti', teacher_id, True, now, now)],
+        'academic_years': [(year_id, ACADEMIC_YEAR['name'], course_id, ACADEMIC_YEAR['start'],
+                            ACADEMIC_YEAR['end'], True, now, now)],
+        'academic_year_enrollments': enrollments,
+        'actions': actions,
+        'lessons': lessons,
+        'scores': scores,
+    }
+    return {table: sorted(table_rows) for table, table_rows in rows.items()}
+
+
+def connect(database):
+    """
+    Apre la connessione. Ritorna (connessione, placeholder, quote) dove quote
+    racchiude i nomi delle colonne (Postgres usa i nomi camelCase di Prisma).
+    """
+    if database.startswith(('postgres://', 'postgresql://')):
+        try:
+            import psycopg
+        except ImportError:
+            import psycopg2 as psycopg
+        return psycopg.connect(database), '%s', '"'
+
+    path = database[len('sqlite:///'):] if database.startswith('sqlite:///') else database
+    conn = sqlite3.connect(path)
+    conn.executescript(SQLITE_SCHEMA)
+    conn.commit()
+    return conn, '?', '"'
+
+
+def insert_statement(table, placeholder, quote):
+    columns = TABLES[table]
+    column_list = ', '.join(f'{quote}{column}{quote}' for column in columns)
+    values = ', '.join([placeholder] * len(columns))
+    return f'INSERT INTO {quote}{table}{quote} ({column_list}) VALUES ({values}) ON CONFLICT DO NOTHING'
+
+
+def source_fingerprint(path):
+    """Hash del file sorgente: un checkpoint vale solo per lo stesso file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(path, fingerprint, batch_size):
+    """Legge il checkpoint; se non corrisponde al file o alla dimensione dei blocchi riparte da zero"""
+    if not os.path.exists(path):
+        return {'source': fingerprint, 'batch_size': batch_size, 'tables': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('source') != fingerprint or checkpoint.get('batch_size') != batch_size:
+        print("⚠️ Checkpoint relativo a un altro file o a un'altra dimensione dei blocchi: riparto da zero")
+        return {'source': fingerprint, 'batch_size': batch_size, 'tables': {}}
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    """Scrive il checkpoint in modo atomico"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_rows(conn, placeholder, quote, rows, checkpoint, checkpoint_path, batch_size):
+    """
+    Inserisce le righe tabella per tabella in blocchi transazionali, saltando quelli
+    già confermati nel checkpoint. Ritorna {tabella: (righe inserite, secondi)}.
+    """
+    stats = {}
+    for table in TABLES:
+        table_rows = rows[table]
+        statement = insert_statement(table, placeholder, quote)
+        done = checkpoint['tables'].get(table, 0)
+        n_batches = (len(table_rows) + batch_size - 1) // batch_size
+
+        started = time.perf_counter()
+        inserted = 0
+        for batch in range(done, n_batches):
+            chunk = table_rows[batch * batch_size:(batch + 1) * batch_size]
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(statement, chunk)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+            inserted += len(chunk)
+            checkpoint['tables'][table] = batch + 1
+            save_checkpoint(checkpoint_path, checkpoint)
+
+        stats[table] = (inserted, time.perf_counter() - started)
+    return stats
+
+
+def print_stats(stats):
+    """Stampa righe e righe al secondo per tabella"""
+    total_rows = sum(rows for rows, _ in stats.values())
+    total_seconds = sum(seconds for _, seconds in stats.values())
+    for table, (rows, seconds) in stats.items():
+        rate = rows / seconds if seconds > 0 else 0.0
+        print(f"   {table:28s} {rows:8d} righe  {rate:10.0f} righe/s")
+    rate = total_rows / total_seconds if total_seconds > 0 else 0.0
+    print(f"✅ Caricate {total_rows} righe in {total_seconds:.2f}s ({rate:.0f} righe/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caricamento riprendibile dei dati FantaKombat nel database")
+    parser.add_argument('data_file', nargs='?', default='fantakombat_data.json')
+    parser.add_argument('--database', default='fantakombat.db',
+                        help="percorso SQLite (o sqlite:///...) oppure URL postgresql://")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    parser.add_argument('--restart', action='store_true', help="ignora il checkpoint e riparte dall'inizio")
+    parser.add_argument('--teacher-password', default=DEFAULT_TEACHER_PASSWORD,
+                        help="password dell'insegnante (default: quella di prisma/seed_real.ts)")
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size deve essere almeno 1")
+
+    source_path = resolve_json_path(args.data_file)
+    data = read_json(source_path)
+    fingerprint = source_fingerprint(source_path)
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = load_checkpoint(args.checkpoint, fingerprint, args.batch_size)
+    if checkpoint['tables']:
+        print(f"↩️ Ripresa dal checkpoint: {checkpoint['tables']}")
+
+    # Il timestamp di creazione è salvato nel checkpoint: le righe ripetute restano identiche
+    now = checkpoint.setdefault('created_at', datetime.now().isoformat())
+    teacher_password = hash_password(args.teacher_password)
+
+    conn, placeholder, quote = connect(args.database)
+    try:
+        rows = build_rows(data, now, teacher_password, existing_user_ids(conn, quote))
+        stats = load_rows(conn, placeholder, quote, rows, checkpoint, args.checkpoint, args.batch_size)
+    finally:
+        conn.close()
+
+    print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
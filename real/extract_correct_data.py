@@ -1,19 +1,39 @@
 #!/usr/bin/env python3
 """
 Script per estrarre i dati corretti dal foglio totale FantaKombat
+
+Con --weeks=, --from=, --to= o --students= (vedi sheet_filters.py) estrae
+un'anteprima in fantakombat_data_corrected_preview.json con le sole settimane
+e gli studenti richiesti.
 """
 
 import pandas as pd
-import json
+import sys
 from datetime import datetime, timedelta
 
-def extract_correct_data():
-    """Estrae i dati corretti dal foglio totale"""
+from lesson_views import LessonScoresView, split_evenly
+from output_io import parse_output_args, write_json
+from sheet_calendar import build_calendar
+from sheet_filters import parse_filter_args, select_sheets, student_selected
+
+def extract_correct_data(sheet_filter=None):
+    """
+    Estrae i dati corretti dal foglio totale.
+    Con sheet_filter (vedi sheet_filters.py) restano solo le settimane
+    (colonne del totale) e gli studenti richiesti.
+    """
     
     # Carica il file Excel
     file_path = 'FantaKombat.xls'
     xls = pd.ExcelFile(file_path)
     
+    # Date delle lezioni dai nomi dei fogli settimanali; settimane da estrarre
+    lesson_calendar = build_calendar(xls.sheet_names)
+    weeks = range(1, 26)
+    if sheet_filter is not None:
+        selected_weeks = {week for week, _ in select_sheets(list(lesson_calendar.sheets.items()), sheet_filter)}
+        weeks = [week for week in weeks if week in selected_weeks]
+    
     # Leggi il foglio totale
     df = pd.read_excel(xls, sheet_name='totale FANTAKombat', header=None)
     
@@ -27,30 +47,37 @@ def extract_correct_data():
         
         if pd.notna(student_name):
             student_name = str(student_name).strip()
+            if not student_selected(sheet_filter, student_name):
+                continue
             students.append(student_name)
             student_scores[student_name] = {}
             
             # Estrai i punteggi per ciascuna settimana (colonne 1-25)
-            for week in range(1, 26):
+            for week in weeks:
                 if week < len(row) and pd.notna(row.iloc[week]):
                     points = float(row.iloc[week])
                     student_scores[student_name][f'week_{week}'] = points
     
-    # Crea le lezioni (3 per settimana)
+    # Crea le lezioni (3 per settimana) con le date del calendario dei fogli settimanali;
+    # le settimane con meno di 3 lezioni ripetono la data dell'ultima
     lessons = []
-    base_date = datetime(2025, 1, 13)  # Data di inizio corso
+    base_date = datetime(2025, 1, 13)  # Data di inizio corso (settimane senza date)
     
-    for week in range(1, 26):
+    for week in weeks:
+        week_dates = lesson_calendar.week_dates(week)
         for day in range(1, 4):
             lesson_number = (week - 1) * 3 + day
-            lesson_date = base_date + timedelta(days=(week - 1) * 7 + (day - 1))
+            if week_dates:
+                lesson_date = week_dates[min(day, len(week_dates)) - 1]
+            else:
+                lesson_date = (base_date + timedelta(days=(week - 1) * 7 + (day - 1))).strftime('%Y-%m-%d')
             
             lessons.append({
                 'lesson_number': lesson_number,
                 'week_number': week,
                 'day_number': day,
                 'title': f'Lezione {lesson_number} - Settimana {week} - Giorno {day}',
-                'date': lesson_date.strftime('%Y-%m-%d')
+                'date': lesson_date
             })
     
     # Definisci le azioni standard (dalle analisi precedenti)
@@ -70,31 +97,24 @@ def extract_correct_data():
     ]
     
     # Converti i punteggi settimanali in punteggi per lezione
-    # Ogni punteggio settimanale viene distribuito equamente tra le 3 lezioni
-    lesson_scores = {}
+    # Ogni punteggio settimanale viene distribuito equamente tra le 3 lezioni:
+    # le lezioni sono una vista calcolata su richiesta sui dati della settimana
+    week_actions = {}
     
     for student_name, week_scores in student_scores.items():
-        lesson_scores[student_name] = {}
+        week_actions[student_name] = {}
         
         for week_key, week_points in week_scores.items():
             week_number = int(week_key.split('_')[1])
             
-            # Distribuisci i punti tra le 3 lezioni della settimana
-            points_per_lesson = week_points / 3
-            
-            for day in range(1, 4):
-                lesson_number = (week_number - 1) * 3 + day
-                lesson_key = f"{lesson_number:02d}_L{lesson_number}"
-                
-                # Crea un'azione generica che rappresenta i punti della settimana
-                lesson_scores[student_name][lesson_key] = {
-                    'actions': [{
-                        'action': 'Punteggio Settimanale',
-                        'count': 1,
-                        'points': points_per_lesson
-                    }],
-                    'total_points': points_per_lesson
-                }
+            # Un'azione generica che rappresenta i punti della settimana
+            week_actions[student_name][week_number] = [{
+                'action': 'Punteggio Settimanale',
+                'count': 1,
+                'points': week_points
+            }]
+    
+    lesson_scores = LessonScoresView(week_actions, lessons_per_week=3, rule=split_evenly)
     
     # Aggiungi l'azione per il punteggio settimanale
     actions.append({
@@ -148,14 +168,22 @@ def generate_report(data):
 def main():
     print("Estrazione dati corretti dal foglio totale FantaKombat...")
     
-    # Estrai i dati
-    data = extract_correct_data()
+    # Opzioni di output lette subito: una compressione non valida non fa perdere l'estrazione
+    compact, compression = parse_output_args(sys.argv[1:])
+
+    # Estrai i dati (eventualmente solo settimane, date o studenti richiesti)
+    sheet_filter = parse_filter_args(sys.argv[1:])
+    data = extract_correct_data(sheet_filter)
+    
+    # Salva i dati JSON (un'estrazione filtrata non sovrascrive quella completa)
+    output_name = 'fantakombat_data_corrected.json' if sheet_filter is None else 'fantakombat_data_corrected_preview.json'
+    output_file = write_json(data, output_name, compact, compression)
     
-    # Salva i dati JSON
-    with open('fantakombat_data_corrected.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"Dati salvati in: {output_file}")
     
-    print(f"Dati salvati in: fantakombat_data_corrected.json")
+    if sheet_filter is not None:
+        # Anteprima: il report riguarda solo l'estrazione completa
+        return
     
     # Genera e salva il report
     report = generate_report(data)
@@ -1,37 +1,59 @@
 #!/usr/bin/env python3
 """
 Script per estrarre i dati del FantaKombat dal file Excel e organizzarli in formato strutturato.
+
+Con --weeks=, --from=, --to= o --students= (vedi sheet_filters.py) estrae
+un'anteprima in fantakombat_data_preview.json leggendo solo i fogli necessari.
 """
 
 import pandas as pd
-import json
+import sys
 from datetime import datetime
 
-def extract_fantakombat_data():
-    """Estrae tutti i dati dal file FantaKombat.xls e li organizza in una struttura dati comprensibile."""
+from output_io import parse_output_args, write_json
+from sheet_calendar import calendar_for
+from season import read_weekly_sheet
+from sheet_filters import parse_filter_args, select_sheets, student_selected
+
+def extract_fantakombat_data(sheet_filter=None):
+    """
+    Estrae tutti i dati dal file FantaKombat.xls e li organizza in una struttura dati comprensibile.
+    Con sheet_filter (vedi sheet_filters.py) i fogli esclusi non vengono letti
+    e restano solo gli studenti richiesti.
+    """
     
     file_path = '/Users/pasqualecarminecarbone/Projects/personal/fantakombat_new/FantaKombat.xls'
     
-    # Leggi tutti i fogli del file Excel
-    df_dict = pd.read_excel(file_path, sheet_name=None)
+    # Lista delle settimane (escludendo il foglio totale), dai soli nomi dei fogli
+    xls = pd.ExcelFile(file_path)
+    weekly_sheets = [sheet for sheet in xls.sheet_names if sheet != 'totale FANTAKombat']
     
-    # Lista delle settimane (escludendo il foglio totale)
-    weekly_sheets = [sheet for sheet in df_dict.keys() if sheet != 'totale FANTAKombat']
+    # Settimane da estrarre, numerate come nel file
+    numbered_sheets = select_sheets(list(enumerate(weekly_sheets, 1)), sheet_filter)
     
-    # Estrai le azioni e i loro punteggi dalla prima settimana
-    actions = extract_actions_and_scores(df_dict[weekly_sheets[0]])
+    # Leggi il foglio totale e i soli fogli settimanali selezionati
+    # (di questi solo le colonne del piano e le righe dei partecipanti, vedi season.read_weekly_sheet)
+    df_dict = {name: read_weekly_sheet(xls, name, sheet_filter) for _, name in numbered_sheets}
+    df_dict['totale FANTAKombat'] = pd.read_excel(xls, sheet_name='totale FANTAKombat')
+    
+    # Estrai le azioni e i loro punteggi dalla prima settimana (basta l'intestazione)
+    first_week_df = df_dict.get(weekly_sheets[0])
+    if first_week_df is None:
+        first_week_df = pd.read_excel(xls, sheet_name=weekly_sheets[0], nrows=0)
+    actions = extract_actions_and_scores(first_week_df)
     
     # Estrai tutti gli studenti dalla tabella totale
-    students = extract_students(df_dict['totale FANTAKombat'])
+    students = [student for student in extract_students(df_dict['totale FANTAKombat'])
+                if student_selected(sheet_filter, str(student['name']).strip())]
     
     # Estrai le lezioni (settimane con 3 lezioni ciascuna)
-    lessons = extract_lessons(weekly_sheets)
+    lessons = extract_lessons(weekly_sheets, numbered_sheets)
     
     # Estrai i punteggi dettagliati per ogni studente per ogni settimana
-    weekly_scores = extract_weekly_scores(df_dict, weekly_sheets)
+    weekly_scores = extract_weekly_scores(df_dict, numbered_sheets, sheet_filter)
     
     # Estrai i totali finali
-    final_totals = extract_final_totals(df_dict['totale FANTAKombat'])
+    final_totals = extract_final_totals(df_dict['totale FANTAKombat'], sheet_filter)
     
     # Organizza tutto in una struttura dati
     fantakombat_data = {
@@ -108,58 +130,35 @@ def extract_students(totals_df):
     
     return students
 
-def extract_lessons(weekly_sheets):
-    """Estrae le informazioni sulle lezioni (3 lezioni per settimana)."""
+def extract_lessons(weekly_sheets, numbered_sheets=None):
+    """
+    Estrae le informazioni sulle lezioni dalle date dei fogli settimanali (vedi sheet_calendar.py).
+    numbered_sheets: (settimana, foglio) da estrarre; tutti se None.
+    """
     
     lessons = []
+    lesson_calendar = calendar_for(tuple(enumerate(weekly_sheets, 1)))
+    if numbered_sheets is None:
+        numbered_sheets = enumerate(weekly_sheets, 1)
     
-    for i, sheet_name in enumerate(weekly_sheets):
-        # Estrai le date dalla denominazione del foglio
-        week_dates = sheet_name.split(' ')[0].split('-')
-        
-        # Crea 3 lezioni per settimana
-        for j, date_str in enumerate(week_dates[:3]):  # Prende solo le prime 3 date
-            lesson_date = f"2025-{parse_date(date_str, sheet_name)}"
-            
+    for week, sheet_name in numbered_sheets:
+        for j, lesson_date in enumerate(lesson_calendar.week_dates(week)):
             lessons.append({
-                'week': i + 1,
+                'week': week,
                 'lesson_number': j + 1,
                 'date': lesson_date,
-                'title': f"Lezione {j + 1} - Settimana {i + 1}",
+                'title': f"Lezione {j + 1} - Settimana {week}",
                 'description': f"Lezione di Fit&Box - {sheet_name}"
             })
     
     return lessons
 
-def parse_date(date_str, sheet_name):
-    """Converte la stringa data nel formato corretto."""
-    
-    # Estrai il mese dal nome del foglio
-    month_map = {
-        'Gen': '01', 'Febb': '02', 'Marzo': '03', 'Aprile': '04',
-        'Maggio': '05', 'Giugno': '06', 'Luglio': '07'
-    }
-    
-    month = None
-    for month_name, month_num in month_map.items():
-        if month_name in sheet_name:
-            month = month_num
-            break
-    
-    if not month:
-        month = '01'  # Default
-    
-    # Formatta il giorno
-    day = date_str.zfill(2)
-    
-    return f"{month}-{day}"
-
-def extract_weekly_scores(df_dict, weekly_sheets):
-    """Estrae i punteggi settimanali per ogni studente."""
+def extract_weekly_scores(df_dict, numbered_sheets, sheet_filter=None):
+    """Estrae i punteggi settimanali per ogni studente (numbered_sheets: lista di (settimana, foglio))."""
     
     weekly_scores = {}
     
-    for week_num, sheet_name in enumerate(weekly_sheets, 1):
+    for week_num, sheet_name in numbered_sheets:
         df = df_dict[sheet_name]
         
         # Trova la colonna del nome e del totale
@@ -176,7 +175,8 @@ def extract_weekly_scores(df_dict, weekly_sheets):
             # Estrai i dati per ogni studente
             for idx, row in df.iterrows():
                 student_name = row[name_col]
-                if pd.notna(student_name) and student_name != 'Partecipante':
+                if pd.notna(student_name) and student_name != 'Partecipante' \
+                        and student_selected(sheet_filter, str(student_name).strip()):
                     weekly_total = row[total_col]
                     
                     if student_name not in weekly_scores:
@@ -279,8 +279,8 @@ def calculate_points_from_value(value, action_col):
     
     return 0
 
-def extract_final_totals(totals_df):
-    """Estrae i totali finali per ogni studente."""
+def extract_final_totals(totals_df, sheet_filter=None):
+    """Estrae i totali finali per ogni studente (solo quelli del filtro, se presente)."""
     
     final_totals = {}
     
@@ -292,7 +292,8 @@ def extract_final_totals(totals_df):
         student_name = row.iloc[0]
         total_points = row.iloc[-1]  # Ultima colonna è il totale
         
-        if pd.notna(student_name) and student_name != 'NaN':
+        if pd.notna(student_name) and student_name != 'NaN' \
+                and student_selected(sheet_filter, str(student_name).strip()):
             final_totals[student_name] = {
                 'total_points': total_points if pd.notna(total_points) else 0,
                 'ranking': 0  # Verrà calcolato dopo
@@ -305,13 +306,12 @@ def extract_final_totals(totals_df):
     
     return final_totals
 
-def save_data_to_json(data, filename='fantakombat_data.json'):
-    """Salva i dati in formato JSON."""
+def save_data_to_json(data, filename='fantakombat_data.json', compact=False, compression=None):
+    """Salva i dati in formato JSON (eventualmente compatto e compresso)."""
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    output_file = write_json(data, filename, compact, compression)
     
-    print(f"Dati salvati in {filename}")
+    print(f"Dati salvati in {output_file}")
 
 def print_summary(data):
     """Stampa un riassunto dei dati estratti."""
@@ -346,11 +346,16 @@ def print_summary(data):
 if __name__ == "__main__":
     print("Estrazione dati FantaKombat in corso...")
     
-    # Estrai tutti i dati
-    fantakombat_data = extract_fantakombat_data()
+    # Opzioni di output lette subito: una compressione non valida non fa perdere l'estrazione
+    compact, compression = parse_output_args(sys.argv[1:])
+
+    # Estrai i dati (eventualmente solo settimane, date o studenti richiesti)
+    sheet_filter = parse_filter_args(sys.argv[1:])
+    fantakombat_data = extract_fantakombat_data(sheet_filter)
     
-    # Salva in JSON
-    save_data_to_json(fantakombat_data)
+    # Salva in JSON (un'estrazione filtrata non sovrascrive quella completa)
+    filename = 'fantakombat_data.json' if sheet_filter is None else 'fantakombat_data_preview.json'
+    save_data_to_json(fantakombat_data, filename, compact=compact, compression=compression)
     
     # Stampa riassunto
     print_summary(fantakombat_data)
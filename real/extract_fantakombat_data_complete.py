@@ -2,13 +2,22 @@
 """
 Script per estrarre TUTTI i dati completi dal file Excel FantaKombat
 con tutte le azioni e i punteggi corretti
+
+Con --weeks=, --from=, --to= o --students= (vedi sheet_filters.py) estrae
+un'anteprima in fantakombat_data_complete_preview.json leggendo solo i fogli necessari.
 """
 
 import pandas as pd
-import json
 import re
+import sys
 from datetime import datetime
 
+from action_rules import compile_sheet_plan
+from lesson_views import LessonScoresView, spread_counts
+from output_io import parse_output_args, write_json
+from sheet_calendar import calendar_for
+from sheet_filters import parse_filter_args, select_sheets, student_selected
+
 def extract_points_from_action_name(action_name):
     """Estrae i punti dal nome dell'azione"""
     # Pattern per punti semplici come (+1pt) o (-0,5pt)
@@ -79,8 +88,12 @@ def calculate_points_extra_settimana(weeks, is_positive=True):
         else:
             return -0.5 * weeks  # Fallback
 
-def extract_all_data():
-    """Estrae tutti i dati dal file Excel"""
+def extract_all_data(sheet_filter=None):
+    """
+    Estrae tutti i dati dal file Excel.
+    Con sheet_filter (vedi sheet_filters.py) i fogli esclusi non vengono letti
+    e le righe degli studenti esclusi non vengono valutate.
+    """
     
     # Carica il file Excel
     file_path = 'FantaKombat.xls'
@@ -118,22 +131,27 @@ def extract_all_data():
         13: "Punti extra settimana (-0,5pt dopo 1settimana di seguito) (-1pt dopo 2 settimane di seguito) (-1,5pt dopo 3 settimane di seguito) (-2pt dopo 4 settimane di seguito)"
     }
     
+    action_points = {action["name"]: action["points"] for action in actions}
+    
     students = set()
     lessons = []
+    numbered_sheets = tuple((sheet_idx + 1, sheet_name) for sheet_idx, sheet_name in enumerate(xls.sheet_names)
+                            if 'totale' not in sheet_name.lower())
+    lesson_calendar = calendar_for(numbered_sheets)
     student_scores = {}
     
-    # Processa ogni foglio (escludendo il totale)
-    for sheet_idx, sheet_name in enumerate(xls.sheet_names):
-        if 'totale' in sheet_name.lower():
-            continue
-        
+    # Processa ogni foglio selezionato (escludendo il totale)
+    for week_number, sheet_name in select_sheets(numbered_sheets, sheet_filter):
         print(f"Processando foglio: {sheet_name}")
         
         try:
             df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
             
-            # Crea le lezioni per questa settimana (3 lezioni per settimana)
-            week_number = sheet_idx + 1
+            # Piano delle azioni compilato dalla riga di intestazione (riusato tra fogli uguali)
+            plan = compile_sheet_plan(tuple(str(header) for header in df.iloc[0]))
+            
+            # Crea le lezioni per questa settimana (3 lezioni per settimana, date dal calendario)
+            week_dates = lesson_calendar.week_dates(week_number)
             for day in range(3):
                 lesson_number = (week_number - 1) * 3 + day + 1
                 lessons.append({
@@ -141,10 +159,7 @@ def extract_all_data():
                     "week_number": week_number,
                     "day_number": day + 1,
                     "title": f"Lezione {lesson_number} - Settimana {week_number} - Giorno {day + 1}",
-                    "date": sheet_name.split()[0] if day == 0 else 
-                           sheet_name.split()[1] if day == 1 and len(sheet_name.split()) > 1 else 
-                           sheet_name.split()[2] if day == 2 and len(sheet_name.split()) > 2 else 
-                           sheet_name
+                    "date": week_dates[day] if day < len(week_dates) else sheet_name
                 })
             
             # Processa i dati degli studenti
@@ -157,49 +172,44 @@ def extract_all_data():
                     continue
                 
                 student_name = str(student_name).strip()
+                if not student_selected(sheet_filter, student_name):
+                    continue
                 students.add(student_name)
                 
                 if student_name not in student_scores:
                     student_scores[student_name] = {}
                 
-                # Calcola i punti per ogni lezione della settimana
-                for day in range(3):
-                    lesson_number = (week_number - 1) * 3 + day + 1
-                    lesson_key = f"{lesson_number:02d}_L{lesson_number}"
-                    
-                    lesson_actions = []
-                    total_points = 0.0
-                    
-                    # Processa ogni azione
-                    for col_idx, action_name in column_mapping.items():
-                        if col_idx < len(row):
-                            cell_value = row.iloc[col_idx]
-                            if pd.notna(cell_value) and cell_value != '':
-                                count, extra_info = parse_action_value(cell_value)
-                                if count > 0:
-                                    # Calcola i punti
-                                    base_points = next(a["points"] for a in actions if a["name"] == action_name)
-                                    
-                                    # Gestione speciale per i punti extra
-                                    if "Punti extra settimana" in action_name:
-                                        if "presenza" in action_name:
-                                            points = calculate_points_extra_settimana(extra_info, True)
-                                        else:
-                                            points = calculate_points_extra_settimana(extra_info, False)
+                # Calcola le azioni della settimana una sola volta: le lezioni
+                # sono una vista che le distribuisce sui 3 giorni
+                week_actions = []
+                
+                # Processa ogni azione
+                for col_idx, action_name in column_mapping.items():
+                    if col_idx < len(row):
+                        cell_value = row.iloc[col_idx]
+                        if pd.notna(cell_value) and cell_value != '':
+                            count, extra_info = parse_action_value(cell_value)
+                            if count > 0:
+                                # Calcola i punti
+                                rule = plan['by_col'].get(col_idx)
+                                base_points = rule['points'] if rule else action_points[action_name]
+                                
+                                # Gestione speciale per i punti extra
+                                if "Punti extra settimana" in action_name:
+                                    if "presenza" in action_name:
+                                        points = calculate_points_extra_settimana(extra_info, True)
                                     else:
-                                        points = base_points * count
-                                    
-                                    lesson_actions.append({
-                                        "action": action_name,
-                                        "count": count,
-                                        "points": points
-                                    })
-                                    total_points += points
-                    
-                    student_scores[student_name][lesson_key] = {
-                        "actions": lesson_actions,
-                        "total_points": total_points
-                    }
+                                        points = calculate_points_extra_settimana(extra_info, False)
+                                else:
+                                    points = base_points * count
+                                
+                                week_actions.append({
+                                    "action": action_name,
+                                    "count": count,
+                                    "points": points
+                                })
+                
+                student_scores[student_name][week_number] = week_actions
         
         except Exception as e:
             print(f"Errore nel processare il foglio {sheet_name}: {e}")
@@ -217,7 +227,7 @@ def extract_all_data():
         "students": students,
         "lessons": lessons,
         "actions": actions,
-        "student_scores": student_scores
+        "student_scores": LessonScoresView(student_scores, lessons_per_week=3, rule=spread_counts)
     }
     
     return result
@@ -282,14 +292,22 @@ def generate_report(data):
 def main():
     print("Estrazione dati completa da FantaKombat.xls...")
     
-    # Estrai i dati
-    data = extract_all_data()
+    # Opzioni di output lette subito: una compressione non valida non fa perdere l'estrazione
+    compact, compression = parse_output_args(sys.argv[1:])
+
+    # Estrai i dati (eventualmente solo settimane, date o studenti richiesti)
+    sheet_filter = parse_filter_args(sys.argv[1:])
+    data = extract_all_data(sheet_filter)
+    
+    # Salva i dati JSON (un'estrazione filtrata non sovrascrive quella completa)
+    output_name = 'fantakombat_data_complete.json' if sheet_filter is None else 'fantakombat_data_complete_preview.json'
+    output_file = write_json(data, output_name, compact, compression)
     
-    # Salva i dati JSON
-    with open('fantakombat_data_complete.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"Dati salvati in: {output_file}")
     
-    print(f"Dati salvati in: fantakombat_data_complete.json")
+    if sheet_filter is not None:
+        # Anteprima: il report riguarda solo l'estrazione completa
+        return
     
     # Genera e salva il report
     report = generate_report(data)
@@ -2,13 +2,21 @@
 """
 Script finale per estrarre i dati da FantaKombat.xls
 Mantiene esattamente i nomi come sono nell'Excel (inclusi spazi extra)
+
+Con --weeks=, --from=, --to= o --students= (vedi sheet_filters.py) estrae
+un'anteprima in fantakombat_data_preview.json leggendo solo i fogli necessari.
 """
 
 import pandas as pd
-import json
-import re
+import sys
 from datetime import datetime
 
+from action_rules import plan_for_dataframe
+from output_io import parse_output_args, write_json
+from sheet_calendar import calendar_for
+from season import read_weekly_sheet
+from sheet_filters import parse_filter_args, select_sheets
+
 def calculate_points(value):
     """Calcola i punti basandosi sul valore nella cella"""
     if pd.isna(value) or value == '':
@@ -48,8 +56,12 @@ def normalize_date_string(date_str):
     
     return date_str
 
-def extract_fantakombat_data():
-    """Estrae tutti i dati dal file Excel"""
+def extract_fantakombat_data(sheet_filter=None):
+    """
+    Estrae tutti i dati dal file Excel.
+    Con sheet_filter (vedi sheet_filters.py) i fogli esclusi non vengono letti
+    e le righe degli studenti esclusi non vengono valutate.
+    """
     
     # Leggi il file Excel
     xl = pd.ExcelFile('FantaKombat.xls')
@@ -61,6 +73,7 @@ def extract_fantakombat_data():
     
     # Rimuovi il foglio totale
     lesson_sheets = [name for name in sheet_names if 'totale' not in name.lower()]
+    lesson_calendar = calendar_for(tuple(enumerate(lesson_sheets, 1)))
     print(f"\nFogli lezioni: {len(lesson_sheets)}")
     
     # Strutture dati
@@ -69,12 +82,13 @@ def extract_fantakombat_data():
     lessons = []
     scores = []
     
-    # Analizza ogni foglio settimanale
-    for sheet_name in lesson_sheets:
+    # Analizza ogni foglio settimanale selezionato
+    for week, sheet_name in select_sheets(list(enumerate(lesson_sheets, 1)), sheet_filter):
         print(f"\nAnalizzando foglio: {sheet_name}")
         
         try:
-            df = pd.read_excel('FantaKombat.xls', sheet_name=sheet_name)
+            # Solo le colonne del piano e le righe dei partecipanti richiesti (file già aperto)
+            df = read_weekly_sheet(xl, sheet_name, sheet_filter)
             
             # Trova la colonna dei partecipanti
             participant_col = None
@@ -118,27 +132,24 @@ def extract_fantakombat_data():
             
             print(f"  Azioni trovate: {len(action_columns)}")
             
-            # Estrai i punti delle azioni dal nome della colonna
+            # Estrai i punti delle azioni dal piano compilato dell'intestazione
+            # (condiviso tra tutti i fogli con lo stesso layout)
+            plan = plan_for_dataframe(df)
             for action_col in action_columns:
                 action_name = str(action_col).strip()
-                
-                # Estrai i punti dal nome dell'azione usando regex
-                points_match = re.search(r'\(([+-]?\d+(?:[.,]\d+)?)\s*pt\)', action_name)
-                if points_match:
-                    points_str = points_match.group(1).replace(',', '.')
-                    points = float(points_str)
-                else:
-                    points = 0.0
+                points = plan['points_by_header'].get(action_name, 0.0)
                 
                 if action_name not in actions:
                     actions[action_name] = points
                     print(f"    Azione: {action_name} -> {points} punti")
             
-            # Crea l'oggetto lezione
+            # Crea l'oggetto lezione (data: prima lezione della settimana nel calendario,
+            # settimana numerata come nel file anche nelle anteprime)
+            sheet_dates = lesson_calendar.sheet_dates(sheet_name)
             lesson = {
                 'name': normalize_date_string(sheet_name),
-                'date': sheet_name,  # Usa il nome del foglio come data
-                'week': len(lessons) + 1
+                'date': sheet_dates[0] if sheet_dates else sheet_name,
+                'week': week
             }
             lessons.append(lesson)
             lesson_id = len(lessons)
@@ -244,12 +255,21 @@ if __name__ == "__main__":
     print("Estrazione dati da FantaKombat.xls...")
     
     try:
-        # Estrai i dati
-        data = extract_fantakombat_data()
+        # Opzioni di output lette subito: una compressione non valida non fa perdere l'estrazione
+        compact, compression = parse_output_args(sys.argv[1:])
+
+        # Estrai i dati (eventualmente solo settimane, date o studenti richiesti)
+        sheet_filter = parse_filter_args(sys.argv[1:])
+        data = extract_fantakombat_data(sheet_filter)
+        
+        # Salva il JSON (un'estrazione filtrata non sovrascrive quella completa)
+        output_name = 'fantakombat_data.json' if sheet_filter is None else 'fantakombat_data_preview.json'
+        output_file = write_json(data, output_name, compact, compression)
         
-        # Salva il JSON
-        with open('fantakombat_data.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if sheet_filter is not None:
+            # Anteprima: il report riguarda solo l'estrazione completa
+            print(f"\n✅ Anteprima salvata in: {output_file}")
+            sys.exit(0)
         
         # Genera e salva il report
         report = generate_report(data)
@@ -257,7 +277,7 @@ if __name__ == "__main__":
             f.write(report)
         
         print(f"\n✅ Estrazione completata!")
-        print(f"📊 Dati salvati in: fantakombat_data.json")
+        print(f"📊 Dati salvati in: {output_file}")
         print(f"📄 Report salvato in: fantakombat_report.txt")
         print(f"\nRiepilogo:")
         print(f"- {data['metadata']['total_students']} studenti")
@@ -2,112 +2,48 @@
 """
 Script per estrarre i dati dal file Excel FantaKombat.xls
 e generare un file JSON strutturato per il seed del database.
+
+Con --weeks=, --from=, --to= o --students= (vedi sheet_filters.py) estrae
+un'anteprima in fantakombat_data_preview.json leggendo solo i fogli necessari.
 """
 
 import pandas as pd
-import json
 import re
+import sys
 from datetime import datetime, timedelta
 import calendar
 
-def parse_sheet_dates(sheet_name):
-    """
-    Estrae le date da un nome di foglio come '13- 15 - 17 Gen 2025'
-    Ritorna una lista di date nel formato YYYY-MM-DD
-    """
-    # Rimuovi spazi extra e normalizza
-    sheet_name = re.sub(r'\s+', ' ', sheet_name.strip())
-    
-    # Casi speciali
-    if '23 Aprile 2025' in sheet_name:
-        return ['2025-04-23']
-    
-    if '04-06-Giugno 2025' in sheet_name:
-        return ['2025-06-04', '2025-06-06', '2025-06-08']
-    
-    if 'X-18-20-special Giugno 2025' in sheet_name:
-        return ['2025-06-16', '2025-06-18', '2025-06-20']
-    
-    if '30-02-04 Giugno 2025' in sheet_name:
-        return ['2025-05-30', '2025-06-02', '2025-06-04']
-    
-    # Pattern per estrarre date e mese/anno
-    patterns = [
-        r'(\d{1,2})[-\s]+(\d{1,2})[-\s]+(\d{1,2})\s+(\w+)\s+(\d{4})',  # es. 13- 15 - 17 Gen 2025
-        r'(\d{1,2})[-\s]+(\d{1,2})[-\s]+(\d{1,2})\s*\+?\s*\w*\s+(\w+)\s+(\d{4})',  # es. 18- 20 - 22 + OpenD Marzo 2025
-        r'(\d{1,2})[-\s]+(\d{1,2})[-\s]+(\d{1,2})[-\s]+(\w+)\s+(\d{4})',  # es. 04-06-Giugno 2025
-        r'(\d{1,2})[-\s]+(\d{1,2})[-\s]+(\d{1,2})\s+(\w+)\s+(\d{4})',  # variante
-        r'(\d{1,2})\s+(\w+)\s+(\d{4})',  # es. 23 Aprile 2025
-        r'(\d{1,2})[-\s]+(\d{1,2})[-\s]+(\d{1,2})\s+(\w+)\s+(\d{4})',  # caso generale
-    ]
-    
-    # Mappa dei mesi italiani
-    month_map = {
-        'gen': 1, 'gennaio': 1,
-        'febb': 2, 'febbraio': 2,
-        'marzo': 3, 'mar': 3,
-        'aprile': 4, 'apr': 4,
-        'maggio': 5, 'mag': 5,
-        'giugno': 6, 'giu': 6,
-        'luglio': 7, 'lug': 7,
-        'agosto': 8, 'ago': 8,
-        'settembre': 9, 'set': 9,
-        'ottobre': 10, 'ott': 10,
-        'novembre': 11, 'nov': 11,
-        'dicembre': 12, 'dic': 12
-    }
-    
-    dates = []
-    
-    # Prova i pattern principali
-    for pattern in patterns:
-        match = re.search(pattern, sheet_name, re.IGNORECASE)
-        if match:
-            if len(match.groups()) == 5:  # 3 date + mese + anno
-                day1, day2, day3, month_str, year = match.groups()
-                month = month_map.get(month_str.lower())
-                if month:
-                    year = int(year)
-                    
-                    # Gestisci i casi dove il mese cambia
-                    try:
-                        dates.append(f"{year:04d}-{month:02d}-{int(day1):02d}")
-                        dates.append(f"{year:04d}-{month:02d}-{int(day2):02d}")
-                        
-                        # Per il terzo giorno, controlla se è del mese successivo
-                        if int(day3) < int(day2):
-                            # Probabilmente è del mese successivo
-                            next_month = month + 1 if month < 12 else 1
-                            next_year = year if month < 12 else year + 1
-                            dates.append(f"{next_year:04d}-{next_month:02d}-{int(day3):02d}")
-                        else:
-                            dates.append(f"{year:04d}-{month:02d}-{int(day3):02d}")
-                    except ValueError:
-                        continue
-                    break
-            elif len(match.groups()) == 3:  # 1 data + mese + anno
-                day, month_str, year = match.groups()
-                month = month_map.get(month_str.lower())
-                if month:
-                    dates.append(f"{int(year):04d}-{month:02d}-{int(day):02d}")
-                    break
-    
-    # Se non abbiamo trovato date valide, restituisci date placeholder
-    if not dates:
-        print(f"⚠️ Impossibile parsare le date dal foglio: {sheet_name}")
-        return []
-    
-    return dates
+from action_rules import TOTAL_HEADER, plan_for_dataframe
+from fixed_point import QUANTUM, from_units, to_units
+from output_io import parse_output_args, write_json
+from reconcile import print_discrepancies, reconcile_extraction, save_discrepancies
+from scoring import calculate_points, score_block
+from season import read_summary_totals, read_weekly_sheet
+from sheet_calendar import build_calendar
+from sheet_filters import parse_filter_args, select_sheets, student_selected
 
-def extract_fantakombat_data(file_path):
+def extract_fantakombat_data(file_path, sheet_filter=None, reconcile_input=None):
     """
-    Estrae tutti i dati dal file Excel FantaKombat
+    Estrae tutti i dati dal file Excel FantaKombat.
+    Con sheet_filter (vedi sheet_filters.py) i fogli esclusi non vengono letti
+    e le righe degli studenti esclusi non vengono valutate.
+    Se reconcile_input è un dizionario viene riempito con quanto serve alla riconciliazione
+    ('Tot Settimana' dei fogli già letti, nomi dei fogli e riepilogo), così non si rileggono
+    i fogli settimanali (vedi reconcile.reconcile_extraction).
     """
     print(f"📖 Leggendo il file Excel: {file_path}")
     
     # Leggi il file Excel
     xls = pd.ExcelFile(file_path)
     
+    # Date di tutte le lezioni, risolte una volta sui nomi dei fogli (settimane = fogli con date valide)
+    lesson_calendar = build_calendar(xls.sheet_names)
+    
+    # Fogli da estrarre, numerati come nel ciclo principale
+    selected_sheets = None
+    if sheet_filter is not None:
+        selected_sheets = {name for _, name in select_sheets(list(lesson_calendar.sheets.items()), sheet_filter)}
+    
     # Inizializza la struttura dati
     data = {
         'course_info': {
@@ -125,9 +61,6 @@ def extract_fantakombat_data(file_path):
         'final_totals': {}
     }
     
-    # Estrai le azioni dal primo foglio
-    first_sheet = pd.read_excel(file_path, sheet_name=0)
-    
     # Definisci le azioni principali
     actions = [
         {'name': 'Presenza', 'points': 1, 'type': 'BONUS'},
@@ -156,22 +89,31 @@ def extract_fantakombat_data(file_path):
     # Useremo i nomi che abbiamo già raccolto durante l'estrazione dei punteggi
     students = []
     
-    # Prima passa per raccogliere i nomi degli studenti
+    # Prima passa per raccogliere i nomi degli studenti; i fogli letti (solo le colonne
+    # del piano e le righe dei partecipanti, vedi season.read_weekly_sheet) restano
+    # in sheet_frames per il calcolo dei punti
     temp_students = set()
+    sheet_frames = {}
     
     for sheet_name in xls.sheet_names:
         if sheet_name == 'totale FANTAKombat':
             continue
+        if selected_sheets is not None and sheet_name not in selected_sheets:
+            continue
             
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+            df = sheet_frames[sheet_name] = read_weekly_sheet(xls, sheet_name, sheet_filter)
+            name_col = plan_for_dataframe(df)['participant_col']
+            if name_col is None:
+                continue
             
             for idx, row in df.iterrows():
-                student_name = row.iloc[1] if len(row) > 1 else None
+                student_name = row.iloc[name_col]
                 
                 if pd.notna(student_name) and isinstance(student_name, str):
                     student_name = student_name.strip()
-                    if student_name and student_name not in ['Partecipante', 'TOTALE', 'Tot']:
+                    if student_name and student_name not in ['Partecipante', 'TOTALE', 'Tot'] \
+                            and student_selected(sheet_filter, student_name):
                         temp_students.add(student_name)
         except Exception as e:
             continue
@@ -195,6 +137,7 @@ def extract_fantakombat_data(file_path):
     # Estrai le lezioni e i punteggi
     lessons = []
     week_number = 1
+    sheet_totals = {}
     
     for sheet_name in xls.sheet_names:
         if sheet_name == 'totale FANTAKombat':
@@ -203,12 +146,16 @@ def extract_fantakombat_data(file_path):
         print(f"📊 Processando foglio: {sheet_name}")
         
         # Estrai le date dal nome del foglio
-        dates = parse_sheet_dates(sheet_name)
+        dates = lesson_calendar.sheet_dates(sheet_name)
         
         if not dates:
             print(f"⚠️ Saltando foglio senza date valide: {sheet_name}")
             continue
         
+        if selected_sheets is not None and sheet_name not in selected_sheets:
+            week_number += 1
+            continue
+        
         # Crea le lezioni per questa settimana
         for i, date in enumerate(dates):
             lesson = {
@@ -220,13 +167,35 @@ def extract_fantakombat_data(file_path):
             }
             lessons.append(lesson)
         
-        # Leggi i dati del foglio
+        # Dati del foglio già letti nella prima passata (solo le righe degli studenti richiesti)
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+            df = sheet_frames.get(sheet_name)
+            if df is None:
+                df = read_weekly_sheet(xls, sheet_name, sheet_filter)
+            name_col = plan_for_dataframe(df)['participant_col']
+            if name_col is None:
+                raise ValueError("colonna 'Partecipante' non trovata")
+            
+            # Calcola i punti di tutte le celle azione del foglio in un colpo solo
+            # (le azioni seguono la colonna dei partecipanti)
+            main_actions = actions[:10]  # Prime 10 azioni principali
+            action_block = df.iloc[:, name_col + 1:name_col + 1 + len(main_actions)]
+            sheet_units = score_block(
+                action_block,
+                [action['points'] for action in main_actions[:action_block.shape[1]]],
+                calculate_points,
+                quantum=QUANTUM,
+                label=sheet_name,
+                row_labels=df.iloc[:, name_col].tolist(),
+                column_labels=[action['name'] for action in main_actions]
+            )
+            
+            total_col = next((col for col, header in enumerate(df.columns)
+                              if TOTAL_HEADER in str(header).lower()), None)
             
             # Estrai i punteggi degli studenti
-            for idx, row in df.iterrows():
-                student_name = row.iloc[1] if len(row) > 1 else None
+            for row_pos, (idx, row) in enumerate(df.iterrows()):
+                student_name = row.iloc[name_col]
                 
                 if pd.notna(student_name) and isinstance(student_name, str):
                     student_name = student_name.strip()
@@ -242,25 +211,27 @@ def extract_fantakombat_data(file_path):
                             'total': 0
                         }
                         
-                        # Estrai i punteggi dalle colonne
-                        total_points = 0
-                        col_idx = 2
+                        # Estrai i punteggi dalle colonne (somma esatta in unità intere)
+                        total_units = 0
+                        col_idx = name_col + 1
                         
-                        for action in actions[:10]:  # Prime 10 azioni principali
+                        for action_pos, action in enumerate(main_actions):
                             if col_idx < len(row):
                                 cell_value = row.iloc[col_idx]
                                 if pd.notna(cell_value):
-                                    calculated_points = calculate_points(str(cell_value), action['points'])
-                                    if calculated_points != 0:
+                                    cell_units = int(sheet_units[row_pos, action_pos])
+                                    if cell_units != 0:
                                         data['weekly_scores'][student_name][week_key]['actions'].append({
                                             'action': action['name'],
                                             'value': str(cell_value),
-                                            'calculated_points': calculated_points
+                                            'calculated_points': from_units(cell_units)
                                         })
-                                        total_points += calculated_points
+                                        total_units += cell_units
                             col_idx += 1
                         
-                        data['weekly_scores'][student_name][week_key]['total'] = total_points
+                        data['weekly_scores'][student_name][week_key]['total'] = from_units(total_units)
+                        if reconcile_input is not None and total_col is not None:
+                            sheet_totals[(student_name, week_number)] = pd.to_numeric(row.iloc[total_col], errors='coerce')
                         
         except Exception as e:
             print(f"⚠️ Errore nel processare il foglio {sheet_name}: {e}")
@@ -271,92 +242,70 @@ def extract_fantakombat_data(file_path):
     data['lessons'] = lessons
     print(f"✅ Create {len(lessons)} lezioni")
     
-    # Calcola i totali finali
-    for student_name in data['weekly_scores']:
-        total_points = sum(
-            week_data['total'] 
-            for week_data in data['weekly_scores'][student_name].values()
-        )
+    if reconcile_input is not None:
+        reconcile_input.update({
+            'sheet_totals': sheet_totals,
+            'sheet_names': dict(lesson_calendar.sheets),
+            'summary': read_summary_totals(xls),
+        })
+    
+    # Calcola i totali finali (in unità intere: i pari merito sono esatti)
+    final_units = {
+        student_name: sum(to_units(week_data['total']) for week_data in weeks.values())
+        for student_name, weeks in data['weekly_scores'].items()
+    }
+    for student_name, units in final_units.items():
         data['final_totals'][student_name] = {
-            'total_points': total_points,
+            'total_points': from_units(units),
             'ranking': 0  # Verrà calcolato dopo
         }
     
-    # Calcola le classifiche
-    sorted_students = sorted(
-        data['final_totals'].items(),
-        key=lambda x: x[1]['total_points'],
-        reverse=True
-    )
+    # Calcola le classifiche: a parità di punti stessa posizione (1, 2, 2, 4, ...)
+    sorted_students = sorted(final_units.items(), key=lambda x: x[1], reverse=True)
     
-    for rank, (student_name, student_data) in enumerate(sorted_students, 1):
+    previous_units = None
+    for position, (student_name, units) in enumerate(sorted_students, 1):
+        if units != previous_units:
+            rank = position
+            previous_units = units
         data['final_totals'][student_name]['ranking'] = rank
     
     print(f"✅ Dati estratti con successo!")
     print(f"📊 Riepilogo:")
     print(f"   - Studenti: {len(data['students'])}")
     print(f"   - Lezioni: {len(data['lessons'])}")
-    print(f"   - Settimane: {week_number - 1}")
+    print(f"   - Settimane: {len(set(lesson['week'] for lesson in lessons))}")
     print(f"   - Azioni: {len(data['actions'])}")
     
     return data
 
-def calculate_points(value, base_points):
-    """
-    Calcola i punti in base al valore nella cella
-    """
-    if pd.isna(value) or value == '':
-        return 0
-    
-    value_str = str(value).strip().lower()
-    
-    # Se è vuoto o 0, restituisci 0
-    if not value_str or value_str == '0' or value_str == 'nan':
-        return 0
-    
-    # Se contiene 'v', conta le occorrenze
-    if 'v' in value_str:
-        v_count = value_str.count('v')
-        return base_points * v_count
-    
-    # Se contiene '+', somma i numeri
-    if '+' in value_str:
-        try:
-            parts = value_str.split('+')
-            total = 0
-            for part in parts:
-                part = part.strip()
-                if part == 'v':
-                    total += base_points
-                elif part.replace('.', '').replace('-', '').isdigit():
-                    total += float(part)
-            return total
-        except:
-            pass
-    
-    # Se è un numero, restituiscilo
-    try:
-        return float(value_str)
-    except:
-        pass
-    
-    # Se tutto il resto fallisce, restituisci base_points se c'è qualcosa
-    return base_points if value_str else 0
-
 def main():
     file_path = 'FantaKombat.xls'
     
     try:
-        # Estrai i dati
-        data = extract_fantakombat_data(file_path)
+        # Opzioni di output lette subito: una compressione non valida non fa perdere l'estrazione
+        compact, compression = parse_output_args(sys.argv[1:])
+
+        # Estrai i dati (eventualmente solo settimane, date o studenti richiesti)
+        sheet_filter = parse_filter_args(sys.argv[1:])
+        reconcile_input = {}
+        data = extract_fantakombat_data(file_path, sheet_filter, reconcile_input)
         
-        # Salva il file JSON
-        output_file = 'fantakombat_data.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Salva il file JSON (un'estrazione filtrata non sovrascrive quella completa)
+        output_name = 'fantakombat_data.json' if sheet_filter is None else 'fantakombat_data_preview.json'
+        output_file = write_json(data, output_name, compact, compression)
         
         print(f"✅ Dati salvati in: {output_file}")
         
+        if sheet_filter is not None:
+            # Anteprima: riconciliazione e report riguardano solo l'estrazione completa
+            return
+        
+        # Confronta i totali calcolati con 'Tot Settimana' (già letti) e con il foglio totale
+        discrepancies = reconcile_extraction(data['weekly_scores'], reconcile_input)
+        print_discrepancies(discrepancies)
+        save_discrepancies(discrepancies)
+        
         # Genera report
         report_file = 'fantakombat_report.txt'
         with open(report_file, 'w', encoding='utf-8') as f:
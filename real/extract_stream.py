@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+API a generatori per l'estrazione: studenti, lezioni e punteggi prodotti
+foglio per foglio, man mano che il file Excel viene letto.
+
+A differenza degli estrattori che costruiscono un unico dizionario, qui ogni
+foglio viene letto solo quando il consumatore chiede l'elemento successivo:
+i primi punteggi sono disponibili dopo il primo foglio e uno stadio lento a
+valle (scrittura, caricamento su database) frena la lettura invece di far
+accumulare dati in memoria.
+
+    for record in iter_scores('FantaKombat.xls', weeks={1, 2}, students={'Raffa'}):
+        ...
+
+I filtri (settimane, date, studenti: vedi sheet_filters.py) si applicano prima
+della lettura: i fogli esclusi non vengono aperti e le righe escluse non vengono valutate.
+
+I punteggi hanno le stesse chiavi dei record di dataset_index.flatten_dataset
+(student, lesson, week, action, points) più il foglio e il valore grezzo della cella.
+
+Esempio (un record JSON per riga, utilizzabile in pipe):
+    python extract_stream.py FantaKombat.xls --kind scores --weeks 3 | head
+    python extract_stream.py FantaKombat.xls --from 2025-03-01 --to 2025-03-31 --students Raffa
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from action_rules import EXCLUDED_NAMES, PARTICIPANT_HEADER, score_sheet
+from fixed_point import from_units
+from season import read_weekly_sheet, weekly_sheet_names
+from sheet_calendar import calendar_for
+from sheet_filters import add_filter_arguments, filter_from_args, make_filter, select_sheets
+
+STUDENT = 'student'
+LESSON = 'lesson'
+SCORE = 'score'
+KINDS = {'students': STUDENT, 'lessons': LESSON, 'scores': SCORE}
+
+
+def selected_sheets(xls, sheet_filter=None):
+    """Calendario della stagione e fogli (settimana, nome) che rientrano nel filtro, dai soli nomi dei fogli"""
+    numbered_sheets = tuple(enumerate(weekly_sheet_names(xls), 1))
+    return calendar_for(numbered_sheets), select_sheets(numbered_sheets, sheet_filter)
+
+
+def iter_sheets(path, sheet_filter=None):
+    """
+    Fogli settimanali valutati, uno alla volta: (settimana, nome foglio, date delle lezioni, risultato di score_sheet).
+    Le settimane sono numerate da 1 nell'ordine del file; i fogli esclusi dal filtro non vengono letti.
+    """
+    xls = pd.ExcelFile(path)
+    lesson_calendar, sheets = selected_sheets(xls, sheet_filter)
+    for week, sheet_name in sheets:
+        sheet = score_sheet(read_weekly_sheet(xls, sheet_name, sheet_filter), label=sheet_name)
+        yield week, sheet_name, lesson_calendar.week_dates(week), sheet
+
+
+def sheet_lessons(week, sheet_name, lesson_dates):
+    """Lezioni di una settimana dalle date del calendario (come extract_fantakombat_data_fixed)"""
+    return [
+        {
+            'week': week,
+            'lesson_number': number,
+            'date': lesson_date,
+            'title': f'Lezione {number} - Settimana {week}',
+            'description': f'Lezione di Fit&Box - {sheet_name}',
+        }
+        for number, lesson_date in enumerate(lesson_dates, 1)
+    ]
+
+
+def sheet_students(xls, sheet_name):
+    """Nomi dei partecipanti di un foglio, leggendo solo la loro colonna (nessuna cella azione)"""
+    df = pd.read_excel(xls, sheet_name=sheet_name,
+                       usecols=lambda header: PARTICIPANT_HEADER in str(header).strip().lower())
+    if df.shape[1] == 0:
+        return []
+    return [name.strip() for name in df.iloc[:, 0]
+            if isinstance(name, str) and name.strip() not in EXCLUDED_NAMES + ['']]
+
+
+def sheet_scores(week, sheet_name, sheet, include_zero=False):
+    """Punteggi di un foglio valutato, una riga per cella azione (per default solo celle con punti)"""
+    actions = sheet['plan']['actions']
+    for row, student in enumerate(sheet['students']):
+        units = sheet['points'][row]
+        columns = range(len(actions)) if include_zero else np.flatnonzero(units)
+        for col in columns:
+            value = sheet['values'][row, col]
+            yield {
+                'student': student,
+                'lesson': None,
+                'week': week,
+                'sheet': sheet_name,
+                'action': actions[col],
+                'value': None if pd.isna(value) else str(value),
+                'points': from_units(units[col]),
+            }
+
+
+def iter_events(path, sheet_filter=None, include_zero=False):
+    """
+    Un unico passaggio sul file che produce coppie (tipo, elemento) in ordine di lettura:
+    per ogni foglio prima le sue lezioni, poi gli studenti mai visti prima, poi i punteggi.
+    Tipi: STUDENT (nome), LESSON (dizionario lezione), SCORE (record punteggio).
+    """
+    seen = set()
+    for week, sheet_name, lesson_dates, sheet in iter_sheets(path, sheet_filter):
+        for lesson in sheet_lessons(week, sheet_name, lesson_dates):
+            yield LESSON, lesson
+        for student in sheet['students']:
+            if student not in seen:
+                seen.add(student)
+                yield STUDENT, student
+        for record in sheet_scores(week, sheet_name, sheet, include_zero):
+            yield SCORE, record
+
+
+def iter_kind(kind, path, sheet_filter=None, include_zero=False):
+    return (item for item_kind, item in iter_events(path, sheet_filter, include_zero) if item_kind == kind)
+
+
+def iter_scores(path, weeks=None, students=None, include_zero=False, start=None, end=None):
+    """Punteggi, foglio dopo foglio (filtrabili per settimane, date e studenti)"""
+    return iter_kind(SCORE, path, make_filter(weeks, start, end, students), include_zero)
+
+
+def iter_lessons(path, weeks=None, start=None, end=None):
+    """Lezioni, settimana dopo settimana: vengono dal calendario dei nomi dei fogli, nessun foglio viene letto"""
+    lesson_calendar, sheets = selected_sheets(pd.ExcelFile(path), make_filter(weeks, start, end))
+    for week, sheet_name in sheets:
+        yield from sheet_lessons(week, sheet_name, lesson_calendar.week_dates(week))
+
+
+def iter_students(path, weeks=None, start=None, end=None):
+    """Nomi degli studenti nell'ordine in cui compaiono per la prima volta (legge solo la colonna dei partecipanti)"""
+    xls = pd.ExcelFile(path)
+    _, sheets = selected_sheets(xls, make_filter(weeks, start, end))
+    seen = set()
+    for _, sheet_name in sheets:
+        for student in sheet_students(xls, sheet_name):
+            if student not in seen:
+                seen.add(student)
+                yield student
+
+
+def batched(iterable, size):
+    """Raggruppa un generatore in liste di al più `size` elementi (per scritture e insert a blocchi)"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estrazione FantaKombat in streaming (NDJSON su stdout)")
+    parser.add_argument('file_path', nargs='?', default='FantaKombat.xls')
+    parser.add_argument('--kind', choices=list(KINDS) + ['all'], default='scores')
+    parser.add_argument('--include-zero', action='store_true')
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+
+    out = sys.stdout
+    try:
+        # Gli avvisi degli estrattori vanno su stderr: stdout resta NDJSON valido
+        with redirect_stdout(sys.stderr):
+            for kind, item in iter_events(args.file_path, filter_from_args(args, parser), args.include_zero):
+                if args.kind == 'all':
+                    item = {'type': kind, 'data': item}
+                elif kind != KINDS[args.kind]:
+                    continue
+                out.write(json.dumps(item, ensure_ascii=False) + '\n')
+        out.flush()
+    except BrokenPipeError:
+        # Il lettore ha chiuso la pipe (es. `| head`): si esce senza traceback.
+        # stdout punta a devnull così anche il flush all'uscita dell'interprete non fallisce
+        os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
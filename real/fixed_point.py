@@ -0,0 +1,47 @@
+"""
+Aritmetica a virgola fissa per i punteggi.
+
+Tutti i punti del gioco sono multipli di mezzo punto: internamente vengono
+rappresentati come interi di unità (1 unità = QUANTUM punti). Somme, classifiche
+e confronti lavorano su interi, quindi sono esatti e due totali uguali risultano
+sempre a pari merito; la conversione in decimali avviene solo in output.
+"""
+
+import math
+
+import numpy as np
+
+QUANTUM = 0.5
+
+
+def to_units(points, quantum=QUANTUM):
+    """
+    Converte punti (scalare o array) in unità intere.
+    Solleva ValueError se un valore non è multiplo del quanto (o non è finito).
+    """
+    scaled = np.asarray(points, dtype=float) / quantum
+    units = np.rint(scaled)
+    if not np.all(np.isfinite(scaled) & np.isclose(scaled, units, rtol=0.0, atol=1e-6)):
+        raise ValueError(f"Punteggio non multiplo di {quantum}: {points}")
+    if units.ndim == 0:
+        return int(units)
+    return units.astype(np.int64)
+
+
+def round_to_units(points, quantum=QUANTUM):
+    """
+    Unità del multiplo del quanto più vicino, per i punti calcolati dalle celle dei fogli.
+    Ritorna (unità, esatto): esatto è False se il valore è stato arrotondato (NaN e infiniti valgono 0).
+    """
+    scaled = float(points) / quantum
+    if not math.isfinite(scaled):
+        return 0, False
+    units = int(np.rint(scaled))
+    return units, abs(scaled - units) <= 1e-6
+
+
+def from_units(units, quantum=QUANTUM):
+    """Converte unità intere (scalare o array) in punti decimali, per l'output"""
+    if np.ndim(units) == 0:
+        return float(units) * quantum
+    return np.asarray(units, dtype=np.int64) * quantum
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Servizio HTTP locale che espone uno snapshot precalcolato della classifica.
+
+Lo snapshot (JSON prodotto da build_snapshot o da un job di aggregazione sul
+database) viene tenuto in memoria già serializzato e compresso con gzip, con
+ETag calcolato sul contenuto: le richieste con If-None-Match ricevono 304.
+Il file viene ricaricato automaticamente quando cambia su disco.
+
+Esempi:
+    python leaderboard_server.py --build-from FantaKombat.xls
+    python leaderboard_server.py --port 8765
+    python leaderboard_server.py --load-test --concurrency 16 --duration 10
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fixed_point import from_units
+from loadtest import print_results, run_load
+from output_io import read_json, write_json
+from ranking_history import compute_history
+from season import build_season, weekly_totals
+
+DEFAULT_SNAPSHOT = 'leaderboard_snapshot.json'
+RELOAD_INTERVAL = 1.0
+
+
+def build_snapshot(season):
+    """Snapshot della classifica: totale, posizione e punti settimanali di ogni studente"""
+    totals = weekly_totals(season)
+    history = compute_history(totals)
+    final_totals = history['cumulative'][:, -1]
+    final_ranks = history['ranks'][:, -1]
+
+    order = sorted(range(len(season['students'])), key=lambda row: (final_ranks[row], season['students'][row]))
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'weeks': [sheet.strip() for sheet in season['sheets']],
+        'leaderboard': [
+            {
+                'ranking': int(final_ranks[row]),
+                'student': season['students'][row],
+                'total_points': from_units(final_totals[row]),
+                'weekly_points': from_units(totals[row]).tolist(),
+            }
+            for row in order
+        ],
+    }
+
+
+class Snapshot:
+    """Snapshot in memoria (corpo JSON, corpo gzip, ETag) con ricarica quando il file cambia"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.body = b''
+        self.gzip_body = b''
+        self.etag = ''
+        self.reload()
+
+    def reload(self):
+        """Ricarica il file se è cambiato; ritorna True se è stato ricaricato"""
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return False
+
+        body = json.dumps(read_json(self.path), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        gzip_body = gzip.compress(body, compresslevel=6)
+        with self.lock:
+            self.mtime = mtime
+            self.body = body
+            self.gzip_body = gzip_body
+            self.etag = etag
+        return True
+
+    def current(self):
+        with self.lock:
+            return self.body, self.gzip_body, self.etag
+
+
+def watch(snapshot, interval=RELOAD_INTERVAL):
+    """Thread di controllo: ricarica lo snapshot quando il file viene modificato"""
+    while True:
+        time.sleep(interval)
+        try:
+            if snapshot.reload():
+                print(f"🔄 Snapshot ricaricato: {snapshot.path}")
+        except (OSError, ValueError) as e:
+            # File in scrittura o temporaneamente assente: si riprova al giro successivo
+            print(f"⚠️ Ricarica snapshot fallita: {e}")
+
+
+def make_handler(snapshot):
+    """Crea la classe handler legata a uno snapshot"""
+
+    class LeaderboardHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Intestazioni e corpo partono in due scritture: senza TCP_NODELAY ogni risposta attende l'ACK ritardato
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if self.path == '/healthz':
+                self.send_body(200, b'ok', 'text/plain')
+                return
+            if self.path.split('?')[0] not in ('/', '/leaderboard'):
+                self.send_body(404, b'{"error":"not found"}', 'application/json')
+                return
+
+            body, gzip_body, etag = snapshot.current()
+            if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+            self.send_body(200, gzip_body if use_gzip else body, 'application/json; charset=utf-8',
+                           etag=etag, encoding='gzip' if use_gzip else None)
+
+        def send_body(self, status, body, content_type, etag=None, encoding=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'public, max-age=0, must-revalidate')
+            self.send_header('Vary', 'Accept-Encoding')
+            if etag:
+                self.send_header('ETag', etag)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return LeaderboardHandler
+
+
+def start_server(snapshot_path, host='127.0.0.1', port=8765):
+    """Avvia il server in un thread; ritorna (server, snapshot)"""
+    snapshot = Snapshot(snapshot_path)
+    server = ThreadingHTTPServer((host, port), make_handler(snapshot))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    threading.Thread(target=watch, args=(snapshot,), daemon=True).start()
+    return server, snapshot
+
+
+def load_test(snapshot_path, concurrency, duration):
+    """Avvia un'istanza locale su una porta libera e misura req/s e latenze"""
+    server, snapshot = start_server(snapshot_path, port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/leaderboard"
+    _, _, etag = snapshot.current()
+    try:
+        print("Richieste complete con gzip:")
+        print_results(run_load(url, concurrency, duration, headers={'Accept-Encoding': 'gzip'}))
+        print("\nRichieste condizionali (If-None-Match -> 304):")
+        print_results(run_load(url, concurrency, duration, headers={'If-None-Match': etag}))
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server della classifica FantaKombat")
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT)
+    parser.add_argument('--build-from', help="file Excel da cui generare lo snapshot")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--load-test', action='store_true')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.build_from:
+        write_json(build_snapshot(build_season(args.build_from)), args.snapshot, compact=True)
+        print(f"✅ Snapshot salvato in: {args.snapshot}")
+        return
+
+    if args.load_test:
+        load_test(args.snapshot, args.concurrency, args.duration)
+        return
+
+    server, _ = start_server(args.snapshot, args.host, args.port)
+    print(f"🏆 Classifica disponibile su http://{args.host}:{server.server_address[1]}/leaderboard")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Viste pigre per lezione sui dati settimanali.
+
+Gli estrattori conoscono i punteggi solo a livello di settimana, mentre il seed
+del database li vuole per lezione (chiavi come '04_L4'). Invece di copiare le
+azioni della settimana in ognuna delle 3 lezioni, LessonScoresView conserva
+solo i dati settimanali e calcola le lezioni quando vengono lette (o scritte
+in JSON), distribuendo le azioni con una regola intercambiabile.
+
+Una regola riceve (count, points, lessons_per_week) e ritorna, per ogni
+lezione della settimana, la coppia (count, points) assegnata: la somma dei
+punti delle lezioni è sempre uguale ai punti della settimana. Le divisioni
+avvengono in unità intere (vedi fixed_point.py), quindi ogni lezione riceve un
+multiplo del quanto e la somma è esatta.
+"""
+
+from collections.abc import Mapping
+
+from fixed_point import from_units, to_units
+
+
+def split_units(units, weights):
+    """
+    Divide units (intero) in parti proporzionali ai pesi interi;
+    il resto va un'unità per volta alle prime parti con peso non nullo.
+    """
+    total_weight = sum(weights)
+    shares = [units * weight // total_weight for weight in weights]
+    remainder = units - sum(shares)
+    for idx, weight in enumerate(weights):
+        if remainder == 0:
+            break
+        if weight:
+            shares[idx] += 1
+            remainder -= 1
+    return shares
+
+
+def split_evenly(count, points, lessons_per_week):
+    """Divide i punti in parti uguali tra le lezioni (il resto, in mezzi punti, va alle prime)"""
+    shares = split_units(to_units(points), [1] * lessons_per_week)
+    return [(1 if share else 0, from_units(share)) for share in shares]
+
+
+def first_lesson(count, points, lessons_per_week):
+    """Assegna tutta l'azione alla prima lezione della settimana"""
+    return [(count, points)] + [(0, 0.0)] * (lessons_per_week - 1)
+
+
+def spread_counts(count, points, lessons_per_week):
+    """
+    Distribuisce le occorrenze ('v+v' = 2) una per lezione a partire dalla prima;
+    i punti seguono le occorrenze. Senza occorrenze si comporta come first_lesson.
+    """
+    if count <= 0:
+        return first_lesson(count, points, lessons_per_week)
+    counts = [count // lessons_per_week + (1 if day < count % lessons_per_week else 0)
+              for day in range(lessons_per_week)]
+    shares = split_units(to_units(points), counts)
+    return [(lesson_count, from_units(share)) for lesson_count, share in zip(counts, shares)]
+
+
+def lesson_key(week_number, day, lessons_per_week):
+    """Chiave della lezione nel formato del seed (es. '04_L4')"""
+    lesson_number = (week_number - 1) * lessons_per_week + day
+    return f"{lesson_number:02d}_L{lesson_number}"
+
+
+def parse_lesson_key(key, lessons_per_week):
+    """Ritorna (settimana, giorno) da una chiave come '04_L4'"""
+    lesson_number = int(key.split('_')[0])
+    week_number, day_index = divmod(lesson_number - 1, lessons_per_week)
+    return week_number + 1, day_index + 1
+
+
+class StudentLessonsView(Mapping):
+    """Lezioni di uno studente: chiave lezione -> {'actions': [...], 'total_points': x}"""
+
+    def __init__(self, weeks, lessons_per_week, rule):
+        # weeks: numero settimana -> lista di azioni {'action', 'count', 'points'}
+        self.weeks = weeks
+        self.lessons_per_week = lessons_per_week
+        self.rule = rule
+
+    def lesson(self, week_number, day):
+        """Calcola le azioni e il totale di una lezione"""
+        actions = []
+        total_points = 0.0
+        for action in self.weeks[week_number]:
+            count, points = self.rule(action['count'], action['points'], self.lessons_per_week)[day - 1]
+            if count == 0 and points == 0:
+                continue
+            actions.append({
+                'action': action['action'],
+                'count': count,
+                'points': points
+            })
+            total_points += points
+        return {
+            'actions': actions,
+            'total_points': total_points
+        }
+
+    def __getitem__(self, key):
+        week_number, day = parse_lesson_key(key, self.lessons_per_week)
+        if week_number not in self.weeks or key != lesson_key(week_number, day, self.lessons_per_week):
+            raise KeyError(key)
+        return self.lesson(week_number, day)
+
+    def __iter__(self):
+        for week_number in sorted(self.weeks):
+            for day in range(1, self.lessons_per_week + 1):
+                yield lesson_key(week_number, day, self.lessons_per_week)
+
+    def __len__(self):
+        return len(self.weeks) * self.lessons_per_week
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class LessonScoresView(Mapping):
+    """
+    Punteggi per lezione di tutti gli studenti, calcolati su richiesta.
+    week_scores: studente -> numero settimana -> lista di azioni {'action', 'count', 'points'}
+    """
+
+    def __init__(self, week_scores, lessons_per_week=3, rule=split_evenly):
+        self.week_scores = week_scores
+        self.lessons_per_week = lessons_per_week
+        self.rule = rule
+
+    def __getitem__(self, student_name):
+        return StudentLessonsView(self.week_scores[student_name], self.lessons_per_week, self.rule)
+
+    def __iter__(self):
+        return iter(self.week_scores)
+
+    def __len__(self):
+        return len(self.week_scores)
+
+    def to_dict(self):
+        return {student_name: lessons.to_dict() for student_name, lessons in self.items()}
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Piccolo generatore di carico HTTP per servizi locali.
+
+Apre una connessione keep-alive per ogni worker (thread), invia richieste GET
+per un numero fisso di richieste o per una durata e riporta throughput e
+latenze (p50/p95/p99 e istogramma).
+
+Esempio:
+    python loadtest.py http://127.0.0.1:8765/leaderboard --concurrency 16 --duration 10
+"""
+
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+def worker(url, headers, deadline, max_requests, counter, lock, latencies, statuses):
+    """Invia richieste su una singola connessione keep-alive fino alla scadenza"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    conn = connection_class(parts.hostname, parts.port, timeout=30)
+
+    local_latencies = []
+    local_statuses = {}
+    try:
+        while time.perf_counter() < deadline:
+            with lock:
+                if max_requests is not None and counter[0] >= max_requests:
+                    break
+                counter[0] += 1
+
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = connection_class(parts.hostname, parts.port, timeout=30)
+                status = 'errore'
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+    finally:
+        conn.close()
+
+    with lock:
+        latencies.extend(local_latencies)
+        for status, count in local_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+
+def run_load(url, concurrency=8, duration=10.0, max_requests=None, headers=None):
+    """
+    Esegue il test di carico su un URL.
+    Ritorna un dizionario con requests, seconds, rps, statuses e latencies_ms (array numpy).
+    """
+    headers = headers or {}
+    lock = threading.Lock()
+    counter = [0]
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(target=worker,
+                         args=(url, headers, deadline, max_requests, counter, lock, latencies, statuses))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = np.array(latencies, dtype=float) * 1000.0
+    return {
+        'url': url,
+        'requests': len(latencies_ms),
+        'seconds': elapsed,
+        'rps': len(latencies_ms) / elapsed if elapsed > 0 else 0.0,
+        'statuses': statuses,
+        'latencies_ms': latencies_ms,
+    }
+
+
+def percentiles(latencies_ms):
+    """Ritorna (p50, p95, p99) in millisecondi"""
+    if len(latencies_ms) == 0:
+        return 0.0, 0.0, 0.0
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return float(p50), float(p95), float(p99)
+
+
+def histogram(latencies_ms, bounds=HISTOGRAM_BOUNDS_MS):
+    """Conteggi per fascia di latenza: lista di (etichetta, conteggio)"""
+    edges = [0.0] + list(bounds) + [np.inf]
+    counts, _ = np.histogram(latencies_ms, bins=edges)
+    labels = [f"<= {bound} ms" for bound in bounds] + [f"> {bounds[-1]} ms"]
+    return list(zip(labels, counts.tolist()))
+
+
+def print_results(results, show_histogram=True):
+    """Stampa throughput, percentili e istogramma delle latenze"""
+    p50, p95, p99 = percentiles(results['latencies_ms'])
+    print(f"📈 {results['url']}")
+    print(f"   Richieste: {results['requests']} in {results['seconds']:.2f}s ({results['rps']:.0f} req/s)")
+    print(f"   Latenza: p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms")
+    print(f"   Stati: {results['statuses']}")
+    if show_histogram:
+        for label, count in histogram(results['latencies_ms']):
+            if count:
+                print(f"   {label:>12s}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test di carico HTTP")
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--requests', type=int, default=None)
+    parser.add_argument('--header', action='append', default=[], help="es. 'Accept-Encoding: gzip'")
+    args = parser.parse_args()
+
+    headers = dict(header.split(':', 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    print_results(run_load(args.url, args.concurrency, args.duration, args.requests, headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Scrittura e lettura dei file JSON prodotti dagli estrattori.
+
+Oltre al JSON indentato classico supporta:
+  - JSON compatto (senza spazi), prodotto con orjson se installato
+  - compressione gzip (libreria standard) o zstd (pacchetto zstandard o compression.zstd)
+La lettura riconosce automaticamente il formato dai primi byte del file.
+
+Gli script accettano le opzioni --compact e --compress=gzip|zstd
+(vedi parse_output_args).
+"""
+
+import argparse
+import gzip
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from compression import zstd as stdlib_zstd
+except ImportError:
+    stdlib_zstd = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def json_default(obj):
+    """
+    Serializza le viste pigre (es. LessonScoresView) materializzandole
+    e i valori numpy (scalari e array) come numeri e liste Python.
+    """
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Oggetto di tipo {type(obj).__name__} non serializzabile in JSON")
+
+
+def encode_json(data, compact=False):
+    """
+    Serializza i dati in bytes UTF-8.
+    Con e senza orjson le chiavi non stringa (es. i numeri di settimana) diventano stringhe come in json.
+    """
+    if compact:
+        if orjson is not None:
+            return orjson.dumps(data, default=json_default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2, default=json_default).encode('utf-8')
+
+
+def compress_bytes(payload, compression):
+    """Comprime i bytes con l'algoritmo richiesto (None = nessuna compressione)"""
+    if compression is None:
+        return payload
+    if compression == 'gzip':
+        return gzip.compress(payload, compresslevel=6)
+    if compression == 'zstd':
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=3).compress(payload)
+        if stdlib_zstd is not None:
+            return stdlib_zstd.compress(payload)
+        raise RuntimeError("Compressione zstd non disponibile: installa il pacchetto 'zstandard'")
+    raise ValueError(f"Compressione non supportata: {compression}")
+
+
+def decompress_bytes(payload):
+    """Decomprime i bytes riconoscendo il formato dai primi byte"""
+    if payload.startswith(GZIP_MAGIC):
+        return gzip.decompress(payload)
+    if payload.startswith(ZSTD_MAGIC):
+        if zstandard is not None:
+            return zstandard.ZstdDecompressor().decompressobj().decompress(payload)
+        if stdlib_zstd is not None:
+            return stdlib_zstd.decompress(payload)
+        raise RuntimeError("Decompressione zstd non disponibile: installa il pacchetto 'zstandard'")
+    return payload
+
+
+def output_path(filename, compression=None):
+    """Nome del file di output con l'estensione della compressione (es. .json.gz)"""
+    suffix = COMPRESSION_SUFFIXES.get(compression, '')
+    if suffix and not filename.endswith(suffix):
+        return filename + suffix
+    return filename
+
+
+def write_json(data, filename, compact=False, compression=None):
+    """
+    Salva i dati in JSON, eventualmente compatto e compresso.
+    Ritorna il percorso effettivamente scritto.
+    """
+    path = output_path(filename, compression)
+    payload = compress_bytes(encode_json(data, compact), compression)
+    with open(path, 'wb') as f:
+        f.write(payload)
+    return path
+
+
+def resolve_json_path(filename):
+    """
+    Trova il file da leggere tra filename, filename.gz e filename.zst
+    (se ce n'è più di uno usa il più recente).
+    """
+    candidates = [filename] + [filename + suffix for suffix in COMPRESSION_SUFFIXES.values()]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        raise FileNotFoundError(f"Nessun file trovato per {filename}")
+    return max(existing, key=os.path.getmtime)
+
+
+def read_json(filename):
+    """Legge un file JSON scritto da write_json (formato riconosciuto automaticamente)"""
+    with open(resolve_json_path(filename), 'rb') as f:
+        payload = decompress_bytes(f.read())
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload.decode('utf-8'))
+
+
+def parse_output_args(argv):
+    """
+    Estrae le opzioni di output dalla riga di comando (--compact, --compress[=gzip|zstd]).
+    Ritorna (compact, compression). Le altre opzioni vengono ignorate; una compressione
+    sconosciuta o non disponibile termina subito con un errore di argparse, prima dell'estrazione.
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--compress', nargs='?', const='gzip', choices=list(COMPRESSION_SUFFIXES))
+    args, _ = parser.parse_known_args(argv)
+    if args.compress == 'zstd' and zstandard is None and stdlib_zstd is None:
+        parser.error("compressione zstd non disponibile: installa il pacchetto 'zstandard'")
+    return args.compact, args.compress
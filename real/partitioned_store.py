@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Archivio partizionato dei dati estratti, con manifest.
+
+Invece di un unico fantakombat_data.json l'archivio contiene:
+    <root>/manifest.json
+    <root>/<anno>/students.json, lessons.json, actions.json
+    <root>/<anno>/scores/week-NN.json      (un file per settimana)
+    <root>/<anno>/scores/week-unknown.json (punteggi senza settimana, se presenti)
+
+Il manifest elenca ogni partizione con numero di righe, date minima e massima
+e hash del contenuto. I lettori consultano solo il manifest e aprono le sole
+partizioni che la query tocca; in scrittura un file viene riscritto solo se
+il suo hash cambia, quindi aggiungere una settimana scrive una partizione e
+aggiorna il manifest.
+
+Esempi:
+    python partitioned_store.py write fantakombat_data.json --root fantakombat_dataset
+    python partitioned_store.py read --root fantakombat_dataset --week 12 --student Raffa
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import date
+
+from dataset_index import NO_DATE, flatten_dataset, to_ordinal
+from fixed_point import from_units, to_units
+from output_io import encode_json, read_json
+
+DEFAULT_ROOT = 'fantakombat_dataset'
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+SCORES_TABLE = 'scores'
+TABLES = ['students', 'lessons', 'actions']
+UNKNOWN_WEEK = 'unknown'
+
+
+def academic_year(data):
+    """Anno accademico dell'estrazione (course_info.year, altrimenti anno della prima lezione con data ISO)"""
+    course_info = data.get('course_info', {})
+    if course_info.get('year'):
+        return str(course_info['year'])
+    for lesson in data.get('lessons', []):
+        ordinal = to_ordinal(lesson.get('date'))
+        if ordinal != NO_DATE:
+            return str(date.fromordinal(ordinal).year)
+    return 'unknown'
+
+
+def score_rows_by_week(data):
+    """Punteggi dell'estrazione raggruppati per settimana: {settimana: [righe]}"""
+    records, weeks, dates = flatten_dataset(data)
+    partitions = {}
+    for record, week, ordinal in zip(records, weeks, dates):
+        partitions.setdefault(week, []).append({
+            'student': record['student'],
+            'lesson': record.get('lesson'),
+            'week': week,
+            'action': record['action'],
+            'points': record['points'],
+            'date': date.fromordinal(ordinal).isoformat() if ordinal != NO_DATE else None,
+        })
+    return partitions
+
+
+def partition_path(year, table, week=None):
+    """Percorso relativo di una partizione"""
+    if table == SCORES_TABLE:
+        if week is None:
+            return f"{year}/{SCORES_TABLE}/week-{UNKNOWN_WEEK}.json"
+        return f"{year}/{SCORES_TABLE}/week-{week:02d}.json"
+    return f"{year}/{table}.json"
+
+
+def week_order(week):
+    """Chiave di ordinamento delle settimane: la partizione senza settimana va in fondo"""
+    return (week is None, week or 0)
+
+
+def content_hash(payload):
+    return hashlib.sha256(payload).hexdigest()
+
+
+class PartitionedStore:
+    """Archivio partizionato su disco: scrittura incrementale e letture limitate alle partizioni utili"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        manifest_path = os.path.join(root, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            self.manifest = read_json(manifest_path)
+        else:
+            self.manifest = {'version': MANIFEST_VERSION, 'partitions': []}
+        self.entries = {entry['path']: entry for entry in self.manifest['partitions']}
+
+    # --- scrittura ---
+
+    def write_partition(self, year, table, rows, week=None):
+        """
+        Scrive una partizione se il contenuto è cambiato e aggiorna la voce del manifest.
+        Ritorna True se il file è stato riscritto.
+        """
+        path = partition_path(year, table, week)
+        payload = encode_json(rows, compact=True)
+        digest = content_hash(payload)
+        if path in self.entries and self.entries[path]['sha256'] == digest:
+            return False
+
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f"{full_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, full_path)
+
+        dates = [row['date'] for row in rows
+                 if isinstance(row, dict) and to_ordinal(row.get('date')) != NO_DATE]
+        self.entries[path] = {
+            'path': path,
+            'year': year,
+            'table': table,
+            'week': week,
+            'rows': len(rows),
+            'min_date': min(dates) if dates else None,
+            'max_date': max(dates) if dates else None,
+            'sha256': digest,
+        }
+        return True
+
+    def write_week(self, year, week, rows):
+        """Aggiunge (o sostituisce) la partizione dei punteggi di una settimana"""
+        written = self.write_partition(year, SCORES_TABLE, rows, week)
+        if written:
+            self.save_manifest()
+        return written
+
+    def write_dataset(self, data, year=None):
+        """
+        Partiziona un'intera estrazione (sostituisce l'anno accademico).
+        Ritorna i percorsi riscritti; le settimane non più presenti vengono rimosse.
+        """
+        year = year or academic_year(data)
+        written = []
+        for table in TABLES:
+            if self.write_partition(year, table, data.get(table, [])):
+                written.append(partition_path(year, table))
+
+        # I punteggi senza settimana vanno nella partizione week-unknown (settimana None nel manifest)
+        weeks = score_rows_by_week(data)
+        for week in sorted(weeks, key=week_order):
+            if self.write_partition(year, SCORES_TABLE, weeks[week], week):
+                written.append(partition_path(year, SCORES_TABLE, week))
+
+        stale = [entry['path'] for entry in self.select(SCORES_TABLE, year) if entry['week'] not in weeks]
+        for path in stale:
+            del self.entries[path]
+            os.remove(os.path.join(self.root, path))
+
+        if written or stale:
+            self.save_manifest()
+        return written
+
+    def save_manifest(self):
+        """Scrive il manifest in modo atomico, con le partizioni in ordine"""
+        self.manifest['partitions'] = sorted(
+            self.entries.values(),
+            key=lambda entry: (entry['year'], entry['table'], week_order(entry['week']))
+        )
+        os.makedirs(self.root, exist_ok=True)
+        manifest_path = os.path.join(self.root, MANIFEST_FILE)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    # --- lettura ---
+
+    def years(self):
+        return sorted({entry['year'] for entry in self.entries.values()})
+
+    def select(self, table, year=None, weeks=None, start=None, end=None):
+        """
+        Voci del manifest che la query tocca: filtra per anno, settimane e
+        intervallo di date usando solo min_date/max_date, senza aprire i file.
+        """
+        selected = []
+        for entry in self.entries.values():
+            if entry['table'] != table or (year is not None and entry['year'] != str(year)):
+                continue
+            if weeks is not None and entry['week'] not in weeks:
+                continue
+            if start is not None and entry['max_date'] is not None and entry['max_date'] < start:
+                continue
+            if end is not None and entry['min_date'] is not None and entry['min_date'] > end:
+                continue
+            selected.append(entry)
+        return selected
+
+    def load(self, entry):
+        """Legge una partizione"""
+        return read_json(os.path.join(self.root, entry['path']))
+
+    def table(self, table, year=None):
+        """Righe di una tabella anagrafica (students, lessons, actions)"""
+        rows = []
+        for entry in self.select(table, year):
+            rows.extend(self.load(entry))
+        return rows
+
+    def scores(self, year=None, weeks=None, start=None, end=None, student=None):
+        """Punteggi delle sole partizioni interessate, filtrati per data e studente"""
+        rows = []
+        for entry in self.select(SCORES_TABLE, year, weeks, start, end):
+            for row in self.load(entry):
+                if student is not None and row['student'] != student:
+                    continue
+                if start is not None and (row['date'] is None or row['date'] < start):
+                    continue
+                if end is not None and (row['date'] is None or row['date'] > end):
+                    continue
+                rows.append(row)
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivio partizionato dei dati FantaKombat")
+    commands = parser.add_subparsers(dest='command', required=True)
+    # --root vale per ogni comando e va indicato dopo il comando (vedi gli esempi)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--root', default=DEFAULT_ROOT, help="cartella dell'archivio")
+
+    write_parser = commands.add_parser('write', parents=[common], help="partiziona un'estrazione JSON")
+    write_parser.add_argument('data_file', nargs='?', default='fantakombat_data.json')
+    write_parser.add_argument('--year', help="anno accademico (default: dall'estrazione)")
+
+    read_parser = commands.add_parser('read', parents=[common], help="legge i punteggi dalle partizioni")
+    read_parser.add_argument('--year')
+    read_parser.add_argument('--week', type=int, action='append', dest='weeks')
+    read_parser.add_argument('--from', dest='start')
+    read_parser.add_argument('--to', dest='end')
+    read_parser.add_argument('--student')
+    args = parser.parse_args()
+
+    store = PartitionedStore(args.root)
+    if args.command == 'write':
+        written = store.write_dataset(read_json(args.data_file), args.year)
+        print(f"✅ {len(written)} partizioni scritte in {args.root} ({len(store.entries)} nel manifest)")
+        return
+
+    touched = store.select(SCORES_TABLE, args.year, args.weeks, args.start, args.end)
+    rows = store.scores(args.year, args.weeks, args.start, args.end, args.student)
+    for row in rows:
+        print(f"{row['student']:25s} settimana {row['week']!s:>3} {row['action'][:40]:40s} {row['points']:+.1f}")
+    total = from_units(sum(to_units(row['points']) for row in rows))
+    print(f"\n{len(rows)} punteggi da {len(touched)} partizioni, totale {total:+.1f} punti")
+
+
+if __name__ == "__main__":
+    main()
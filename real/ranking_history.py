@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Andamento della classifica settimana per settimana.
+
+Dalla matrice studenti x settimane dei punti calcola in un'unica operazione i
+punteggi cumulati, la classifica dopo ogni settimana, gli studenti che salgono
+o scendono di più e i cambi di leader.
+"""
+
+import sys
+
+import numpy as np
+
+from fixed_point import from_units, to_units
+from season import build_season, rank_descending, weekly_totals
+
+
+def points_matrix_from_weekly_scores(weekly_scores, students, n_weeks, total_key='total_points'):
+    """
+    Converte weekly_scores (studente -> 'week_N' -> {total_key: punti})
+    nella matrice studenti x settimane in unità intere (0 per le settimane mancanti).
+    """
+    matrix = np.zeros((len(students), n_weeks), dtype=np.int64)
+    for row, student in enumerate(students):
+        for week_key, week_data in weekly_scores.get(student, {}).items():
+            week = int(week_key.split('_')[1])
+            if 1 <= week <= n_weeks and week_data.get(total_key) is not None:
+                matrix[row, week - 1] = to_units(week_data[total_key])
+    return matrix
+
+
+def compute_history(points):
+    """
+    Calcola l'andamento della classifica da una matrice studenti x settimane
+    (in unità intere: cumulati e parità sono esatti).
+
+    Ritorna un dizionario con:
+      - cumulative: punti cumulati dopo ogni settimana
+      - ranks: posizione dopo ogni settimana (parità = stessa posizione)
+      - movement: posizioni guadagnate rispetto alla settimana precedente (prima settimana = 0)
+      - leaders: per ogni settimana, gli indici degli studenti in prima posizione
+    """
+    cumulative = np.cumsum(points, axis=1)
+    ranks = rank_descending(cumulative)
+
+    movement = np.zeros_like(ranks)
+    movement[:, 1:] = ranks[:, :-1] - ranks[:, 1:]
+
+    leaders = [np.flatnonzero(ranks[:, week] == 1) for week in range(ranks.shape[1])]
+
+    return {
+        'cumulative': cumulative,
+        'ranks': ranks,
+        'movement': movement,
+        'leaders': leaders,
+    }
+
+
+def rank_series(history, students):
+    """Posizione settimana per settimana di ogni studente: {studente: [rank, ...]}"""
+    return {student: history['ranks'][row].tolist() for row, student in enumerate(students)}
+
+
+def weekly_movers(history, students):
+    """
+    Per ogni settimana lo studente che sale di più e quello che scende di più.
+    Ritorna una lista di {'week', 'up': (studente, posizioni), 'down': (studente, posizioni)}.
+    """
+    movement = history['movement']
+    if movement.shape[1] == 0:
+        return []
+    best = movement.argmax(axis=0)
+    worst = movement.argmin(axis=0)
+    weeks = np.arange(movement.shape[1])
+
+    return [
+        {
+            'week': int(week) + 1,
+            'up': (students[best[week]], int(movement[best[week], week])),
+            'down': (students[worst[week]], int(movement[worst[week], week]))
+        }
+        for week in weeks[1:]
+    ]
+
+
+def leader_changes(history, students):
+    """
+    Settimane in cui cambia il leader della classifica.
+    Ritorna una lista di {'week', 'leaders': [studenti]} (la prima settimana è sempre inclusa).
+    """
+    changes = []
+    previous = None
+    for week, leader_rows in enumerate(history['leaders'], 1):
+        leaders = [students[row] for row in leader_rows]
+        if leaders != previous:
+            changes.append({'week': week, 'leaders': leaders})
+            previous = leaders
+    return changes
+
+
+def format_history_report(history, students, sheet_names=None):
+    """Righe di testo con leader dopo ogni settimana, cambi di leader e movimenti principali"""
+    report = []
+    report.append("ANDAMENTO CLASSIFICA")
+    report.append("-" * 40)
+
+    for week, leader_rows in enumerate(history['leaders'], 1):
+        leaders = ', '.join(students[row] for row in leader_rows)
+        points = from_units(history['cumulative'][leader_rows[0], week - 1]) if len(leader_rows) else 0.0
+        label = f" ({sheet_names[week - 1].strip()})" if sheet_names else ""
+        report.append(f"Leader dopo la settimana {week:2d}{label}: {leaders} ({points:.1f} punti)")
+
+    report.append("")
+    report.append("CAMBI DI LEADER:")
+    for change in leader_changes(history, students):
+        report.append(f"  Settimana {change['week']:2d}: {', '.join(change['leaders'])}")
+
+    report.append("")
+    report.append("MOVIMENTI SETTIMANALI:")
+    for mover in weekly_movers(history, students):
+        up_name, up_positions = mover['up']
+        down_name, down_positions = mover['down']
+        report.append(
+            f"  Settimana {mover['week']:2d}: ↑ {up_name} ({up_positions:+d}), "
+            f"↓ {down_name} ({down_positions:+d})"
+        )
+
+    return report
+
+
+def main():
+    file_path = sys.argv[1] if len(sys.argv) > 1 else 'FantaKombat.xls'
+    season = build_season(file_path)
+    history = compute_history(weekly_totals(season))
+    print('\n'.join(format_history_report(history, season['students'], season['sheets'])))
+
+
+if __name__ == "__main__":
+    main()
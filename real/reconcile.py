@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Riconciliazione dei totali calcolati con i totali presenti nel file Excel.
+
+Il file contiene già due verità di riferimento: la colonna 'Tot Settimana' di
+ogni foglio settimanale e il foglio riepilogativo 'totale FANTAKombat'.
+reconcile unisce in un solo passaggio vettoriale i totali settimanali calcolati
+con entrambe e restituisce la tabella delle differenze per studente e settimana.
+
+Un estrattore che ha già letto i fogli passa i propri totali e il riepilogo
+(reconcile_extraction): il file non viene riletto.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from fixed_point import from_units
+from season import build_season, read_summary_totals, weekly_totals
+
+TOLERANCE = 1e-9
+
+
+def season_frame(season, matrix):
+    """Converte una matrice studenti x settimane in formato lungo (student, week, value)"""
+    frame = pd.DataFrame(matrix, index=season['students'], columns=range(1, len(season['sheets']) + 1))
+    frame.index.name = 'student'
+    frame.columns.name = 'week'
+    return frame.stack(future_stack=True)
+
+
+def computed_from_season(season):
+    """Totali settimanali calcolati dalla matrice della stagione (solo settimane presenti)"""
+    computed = season_frame(season, np.where(season['present'], from_units(weekly_totals(season)), np.nan))
+    return computed.dropna().rename('computed')
+
+
+def computed_from_weekly_scores(weekly_scores, total_key='total'):
+    """
+    Totali settimanali calcolati da un dizionario weekly_scores
+    (studente -> 'week_N' -> {total_key: punti}) come quelli degli estrattori.
+    """
+    records = [
+        (student, int(week_key.split('_')[1]), week_data[total_key])
+        for student, weeks in weekly_scores.items()
+        for week_key, week_data in weeks.items()
+    ]
+    frame = pd.DataFrame(records, columns=['student', 'week', 'computed'])
+    frame['computed'] = pd.to_numeric(frame['computed'], errors='coerce')
+    return frame.set_index(['student', 'week'])['computed']
+
+
+def sheet_totals_series(sheet_totals):
+    """Series (student, week) dei valori 'Tot Settimana' da un dizionario (studente, settimana) -> valore"""
+    index = pd.MultiIndex.from_tuples(list(sheet_totals), names=['student', 'week'])
+    return pd.Series(list(sheet_totals.values()), index=index, dtype=float, name='sheet_total')
+
+
+def reconcile(computed, sheet_totals, sheet_names, summary, tolerance=TOLERANCE):
+    """
+    Confronta i totali calcolati con 'Tot Settimana' e con il foglio riepilogativo.
+
+    computed e sheet_totals sono Series indicizzate per (student, week); sheet_names
+    mappa settimana -> nome del foglio. Ritorna il DataFrame delle sole righe con almeno
+    una differenza, con colonne:
+    student, week, sheet, computed, sheet_total, summary_total, delta_sheet, delta_summary
+    """
+    sheet_totals = sheet_totals.rename('sheet_total')
+
+    summary_weeks = summary.drop(columns='Totale')
+    summary_weeks.columns.name = 'week'
+    summary_totals = summary_weeks.stack(future_stack=True).rename('summary_total')
+
+    table = pd.concat([computed, sheet_totals, summary_totals], axis=1, join='outer')
+    table.index.names = ['student', 'week']
+    # Una settimana senza valori vale 0 punti per tutte e tre le fonti
+    table = table.fillna(0.0)
+
+    table['delta_sheet'] = table['computed'] - table['sheet_total']
+    table['delta_summary'] = table['computed'] - table['summary_total']
+
+    mismatch = (table['delta_sheet'].abs() > tolerance) | (table['delta_summary'].abs() > tolerance)
+    discrepancies = table[mismatch].reset_index()
+
+    discrepancies.insert(2, 'sheet', [sheet_names.get(week, '') for week in discrepancies['week']])
+    return discrepancies.sort_values(['student', 'week'], ignore_index=True)
+
+
+def reconcile_file(file_path, computed=None, tolerance=TOLERANCE):
+    """
+    Riconcilia i totali di un file Excel.
+    Se computed non è indicato usa i totali calcolati dalla matrice della stagione.
+    """
+    season = build_season(file_path)
+    summary = read_summary_totals(file_path)
+    if computed is None:
+        computed = computed_from_season(season)
+    sheet_totals = season_frame(season, season['sheet_totals'])
+    return reconcile(computed, sheet_totals, dict(enumerate(season['sheets'], 1)), summary, tolerance)
+
+
+def reconcile_extraction(weekly_scores, reconcile_input, tolerance=TOLERANCE):
+    """
+    Riconcilia un'estrazione già in memoria senza rivalutare i fogli: weekly_scores come
+    computed_from_weekly_scores, reconcile_input riempito da extract_fantakombat_data
+    ('sheet_totals' (studente, settimana) -> 'Tot Settimana', 'sheet_names', 'summary').
+    """
+    computed = computed_from_weekly_scores(weekly_scores)
+    sheet_totals = sheet_totals_series(reconcile_input['sheet_totals'])
+    return reconcile(computed, sheet_totals, reconcile_input['sheet_names'], reconcile_input['summary'], tolerance)
+
+
+def print_discrepancies(discrepancies, limit=20):
+    """Stampa un riassunto delle differenze trovate"""
+    if discrepancies.empty:
+        print("✅ Riconciliazione: nessuna differenza con i totali del file")
+        return
+
+    students = discrepancies['student'].nunique()
+    print(f"⚠️ Riconciliazione: {len(discrepancies)} differenze su {students} studenti")
+    for row in discrepancies.head(limit).itertuples(index=False):
+        print(f"   {row.student:25s} settimana {row.week:2d}: calcolato {row.computed:+6.1f}, "
+              f"Tot Settimana {row.sheet_total:+6.1f} ({row.delta_sheet:+.1f}), "
+              f"riepilogo {row.summary_total:+6.1f} ({row.delta_summary:+.1f})")
+    if len(discrepancies) > limit:
+        print(f"   ... e altre {len(discrepancies) - limit} differenze")
+
+
+def save_discrepancies(discrepancies, filename='fantakombat_discrepancies.csv'):
+    """Salva la tabella delle differenze in CSV"""
+    discrepancies.to_csv(filename, index=False)
+    print(f"📄 Differenze salvate in: {filename}")
+
+
+def main():
+    file_path = sys.argv[1] if len(sys.argv) > 1 else 'FantaKombat.xls'
+    discrepancies = reconcile_file(file_path)
+    print_discrepancies(discrepancies)
+    save_discrepancies(discrepancies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Generazione delle pagelle individuali degli studenti (testo e HTML).
+
+Gli aggregati condivisi (totali settimanali, classifica nel tempo, dettaglio per
+azione) vengono calcolati una volta sola sulla matrice della stagione; le
+pagelle vengono poi prodotte a blocchi in un pool di processi, ognuno dei quali
+scrive direttamente i file del proprio blocco.
+"""
+
+import argparse
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from fixed_point import from_units
+from ranking_history import compute_history
+from season import build_season, weekly_totals
+from static_publish import unique_slugs
+
+DEFAULT_CHUNK_SIZE = 64
+
+
+def card_slug(student_name):
+    """Nome file della pagella, normalizzato come le email degli studenti"""
+    slug = re.sub(r'[^\w\.]', '.', student_name.lower())
+    slug = re.sub(r'\.+', '.', slug)
+    return slug.strip('.') or 'studente'
+
+
+def prepare_cards(season):
+    """
+    Calcola gli aggregati condivisi e ritorna una pagella (dizionario di soli
+    tipi Python) per ogni studente.
+    """
+    totals = weekly_totals(season)
+    history = compute_history(totals)
+    action_totals = season['points'].sum(axis=1)
+    season_totals = history['cumulative'][:, -1] if totals.shape[1] else np.zeros(len(season['students']), dtype=np.int64)
+    final_ranks = history['ranks'][:, -1] if totals.shape[1] else np.ones(len(season['students']), dtype=int)
+
+    # Migliore e peggiore settimana tra quelle a cui lo studente ha partecipato
+    present = season['present']
+    best_week = np.where(present, totals, -np.inf).argmax(axis=1)
+    worst_week = np.where(present, totals, np.inf).argmin(axis=1)
+
+    # Studenti con lo stesso slug ricevono un suffisso: nessuna pagella sovrascrive un'altra
+    slugs = unique_slugs(season['students'], card_slug)
+
+    cards = []
+    for row, student in enumerate(season['students']):
+        weeks = [
+            {
+                'week': week + 1,
+                'sheet': season['sheets'][week].strip(),
+                'points': from_units(totals[row, week]),
+                'cumulative': from_units(history['cumulative'][row, week]),
+                'rank': int(history['ranks'][row, week]),
+            }
+            for week in np.flatnonzero(present[row])
+        ]
+        actions = [
+            {'action': action, 'points': from_units(action_totals[row, col])}
+            for col, action in enumerate(season['actions'])
+            if action_totals[row, col] != 0
+        ]
+        has_weeks = bool(present[row].any())
+        cards.append({
+            'student': student,
+            'slug': slugs[row],
+            'total_points': from_units(season_totals[row]),
+            'ranking': int(final_ranks[row]),
+            'total_students': len(season['students']),
+            'weeks': weeks,
+            'actions': actions,
+            'best_week': int(best_week[row]) + 1 if has_weeks else None,
+            'best_points': from_units(totals[row, best_week[row]]) if has_weeks else None,
+            'worst_week': int(worst_week[row]) + 1 if has_weeks else None,
+            'worst_points': from_units(totals[row, worst_week[row]]) if has_weeks else None,
+            'rank_trajectory': [int(rank) for rank in history['ranks'][row]],
+        })
+    return cards
+
+
+def render_text(card):
+    """Pagella in formato testo"""
+    lines = []
+    lines.append("=" * 60)
+    lines.append(f"PAGELLA FANTAKOMBAT - {card['student']}")
+    lines.append("=" * 60)
+    lines.append(f"Punteggio totale: {card['total_points']:.1f} punti")
+    lines.append(f"Posizione finale: {card['ranking']} su {card['total_students']}")
+    if card['best_week'] is not None:
+        lines.append(f"Migliore settimana: {card['best_week']} ({card['best_points']:.1f} punti)")
+        lines.append(f"Peggiore settimana: {card['worst_week']} ({card['worst_points']:.1f} punti)")
+    lines.append("")
+
+    lines.append("PUNTI SETTIMANALI")
+    lines.append("-" * 40)
+    for week in card['weeks']:
+        lines.append(
+            f"Settimana {week['week']:2d} ({week['sheet']}): {week['points']:>6.1f} punti "
+            f"- totale {week['cumulative']:>6.1f} - posizione {week['rank']}"
+        )
+    lines.append("")
+
+    lines.append("DETTAGLIO AZIONI")
+    lines.append("-" * 40)
+    for action in card['actions']:
+        lines.append(f"  • {action['action']}: {action['points']:+.1f} punti")
+    lines.append("")
+
+    lines.append("ANDAMENTO POSIZIONE")
+    lines.append("-" * 40)
+    lines.append(" → ".join(str(rank) for rank in card['rank_trajectory']))
+    lines.append("")
+    return '\n'.join(lines)
+
+
+def render_html(card):
+    """Pagella in formato HTML"""
+    esc = html.escape
+    week_rows = ''.join(
+        f"<tr><td>{week['week']}</td><td>{esc(week['sheet'])}</td><td>{week['points']:.1f}</td>"
+        f"<td>{week['cumulative']:.1f}</td><td>{week['rank']}</td></tr>"
+        for week in card['weeks']
+    )
+    action_rows = ''.join(
+        f"<tr><td>{esc(action['action'])}</td><td>{action['points']:+.1f}</td></tr>"
+        for action in card['actions']
+    )
+    best = ''
+    if card['best_week'] is not None:
+        best = (
+            f"<p>Migliore settimana: {card['best_week']} ({card['best_points']:.1f} punti)<br>"
+            f"Peggiore settimana: {card['worst_week']} ({card['worst_points']:.1f} punti)</p>"
+        )
+    trajectory = ' &rarr; '.join(str(rank) for rank in card['rank_trajectory'])
+
+    return (
+        "<!DOCTYPE html>\n"
+        f"<html lang=\"it\"><head><meta charset=\"utf-8\"><title>Pagella {esc(card['student'])}</title></head>\n"
+        "<body>\n"
+        f"<h1>Pagella FantaKombat - {esc(card['student'])}</h1>\n"
+        f"<p>Punteggio totale: <strong>{card['total_points']:.1f}</strong> punti<br>"
+        f"Posizione finale: {card['ranking']} su {card['total_students']}</p>\n"
+        f"{best}\n"
+        "<h2>Punti settimanali</h2>\n"
+        "<table><tr><th>Settimana</th><th>Foglio</th><th>Punti</th><th>Totale</th><th>Posizione</th></tr>"
+        f"{week_rows}</table>\n"
+        "<h2>Dettaglio azioni</h2>\n"
+        f"<table><tr><th>Azione</th><th>Punti</th></tr>{action_rows}</table>\n"
+        "<h2>Andamento posizione</h2>\n"
+        f"<p>{trajectory}</p>\n"
+        "</body></html>\n"
+    )
+
+
+def write_chunk(cards, output_dir):
+    """Scrive le pagelle (testo e HTML) di un blocco di studenti; eseguita nei processi del pool"""
+    for card in cards:
+        base_path = os.path.join(output_dir, card['slug'])
+        with open(f"{base_path}.txt", 'w', encoding='utf-8') as f:
+            f.write(render_text(card))
+        with open(f"{base_path}.html", 'w', encoding='utf-8') as f:
+            f.write(render_html(card))
+    return len(cards)
+
+
+def write_cards(cards, output_dir, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Scrive tutte le pagelle in output_dir distribuendo i blocchi su un pool di processi.
+    Con workers=1 lavora nel processo corrente. Ritorna il numero di pagelle scritte.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    chunks = [cards[start:start + chunk_size] for start in range(0, len(cards), chunk_size)]
+
+    if workers == 1 or len(chunks) <= 1:
+        return sum(write_chunk(chunk, output_dir) for chunk in chunks)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(write_chunk, chunks, [output_dir] * len(chunks)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera le pagelle individuali FantaKombat")
+    parser.add_argument('file_path', nargs='?', default='FantaKombat.xls')
+    parser.add_argument('--output', default='pagelle')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers deve essere almeno 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size deve essere almeno 1")
+
+    season = build_season(args.file_path)
+    cards = prepare_cards(season)
+    written = write_cards(cards, args.output, args.workers, args.chunk_size)
+    print(f"✅ {written} pagelle salvate in: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
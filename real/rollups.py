@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tabelle di aggregazione dei punti per lezione, settimana, mese e stagione.
+
+Per ogni granularità ci sono due tabelle, per studente e per azione:
+    rollups.table('month', 'student') -> {'2025-03': {'Raffa': unità, ...}, ...}
+Le tabelle si costruiscono in un unico passaggio sui punteggi e si aggiornano
+per settimana: quando arriva (o cambia) una settimana si sottraggono i suoi
+vecchi contributi e si sommano i nuovi, senza riaggregare la stagione.
+Un report per periodo diventa una lettura dalla tabella.
+
+I punti sono in unità intere (vedi fixed_point.py). Il mese di un punteggio è
+quello della data della lezione; per le estrazioni settimanali è quello della
+prima lezione della settimana. Le estrazioni settimanali non hanno lezioni,
+quindi la tabella 'lesson' resta vuota.
+
+Esempio:
+    python rollups.py fantakombat_data.json --granularity month --dimension action
+"""
+
+import argparse
+from datetime import date
+
+from dataset_index import NO_DATE, flatten_dataset
+from fixed_point import from_units, to_units
+from output_io import read_json
+
+GRANULARITIES = ['lesson', 'week', 'month', 'season']
+DIMENSIONS = ['student', 'action']
+SEASON = 'season'
+
+
+def month_key(ordinal):
+    """Mese 'AAAA-MM' di una data ordinale (None se la data manca)"""
+    if ordinal == NO_DATE:
+        return None
+    return date.fromordinal(ordinal).strftime('%Y-%m')
+
+
+def bucket_order(bucket):
+    """Chiave di ordinamento dei periodi: prima i numeri in ordine numerico, poi le etichette"""
+    return (isinstance(bucket, str), bucket)
+
+
+def week_cells(records, weeks, dates):
+    """
+    Raggruppa i punteggi per settimana in celle (lezione, mese, studente, azione) -> unità.
+    Ritorna {settimana: {cella: unità}}.
+    """
+    cells_by_week = {}
+    for record, week, ordinal in zip(records, weeks, dates):
+        cells = cells_by_week.setdefault(week, {})
+        cell = (record.get('lesson'), month_key(ordinal), record['student'], record['action'])
+        cells[cell] = cells.get(cell, 0) + to_units(record['points'])
+    return cells_by_week
+
+
+class Rollups:
+    """Tabelle lezione/settimana/mese/stagione x studente/azione, aggiornabili per settimana"""
+
+    def __init__(self):
+        self.tables = {(granularity, dimension): {} for granularity in GRANULARITIES for dimension in DIMENSIONS}
+        self.weeks = {}
+        # Settimana di ogni lezione, per ordinare le lezioni anche quando sono nomi di fogli
+        self.lesson_weeks = {}
+
+    def add_to_table(self, granularity, dimension, bucket, key, units):
+        if bucket is None or units == 0:
+            return
+        table = self.tables[(granularity, dimension)]
+        values = table.setdefault(bucket, {})
+        total = values.get(key, 0) + units
+        if total:
+            values[key] = total
+        else:
+            # I valori tornati a zero spariscono, come se la cella non ci fosse mai stata
+            del values[key]
+            if not values:
+                del table[bucket]
+
+    def apply_cells(self, week, cells, sign):
+        for (lesson, month, student, action), units in cells.items():
+            if lesson is not None and week is not None:
+                self.lesson_weeks[lesson] = week
+            buckets = {'lesson': lesson, 'week': week, 'month': month, 'season': SEASON}
+            for granularity, bucket in buckets.items():
+                self.add_to_table(granularity, 'student', bucket, student, sign * units)
+                self.add_to_table(granularity, 'action', bucket, action, sign * units)
+
+    def set_week(self, week, cells):
+        """Sostituisce i contributi di una settimana; ritorna True se sono cambiati"""
+        old_cells = self.weeks.get(week, {})
+        if old_cells == cells:
+            return False
+        self.apply_cells(week, old_cells, -1)
+        self.apply_cells(week, cells, 1)
+        if cells:
+            self.weeks[week] = cells
+        else:
+            self.weeks.pop(week, None)
+        return True
+
+    def remove_week(self, week):
+        return self.set_week(week, {})
+
+    def update(self, data):
+        """
+        Allinea le tabelle a una nuova estrazione toccando solo le settimane cambiate.
+        Ritorna la lista delle settimane aggiornate o rimosse.
+        """
+        cells_by_week = week_cells(*flatten_dataset(data))
+        changed = [week for week, cells in cells_by_week.items() if self.set_week(week, cells)]
+        changed.extend(week for week in list(self.weeks) if week not in cells_by_week and self.remove_week(week))
+        return changed
+
+    # --- lettura ---
+
+    def table(self, granularity, dimension='student'):
+        """{periodo: {studente o azione: unità}}"""
+        return self.tables[(granularity, dimension)]
+
+    def buckets(self, granularity, dimension='student'):
+        """
+        Periodi con valori nella tabella, in ordine: settimane e lezioni numeriche in ordine
+        numerico, lezioni con un nome nell'ordine delle loro settimane.
+        """
+        buckets = self.tables[(granularity, dimension)]
+        if granularity == 'lesson':
+            def lesson_order(lesson):
+                week = self.lesson_weeks.get(lesson)
+                return (week is None, week if week is not None else 0, bucket_order(lesson))
+            return sorted(buckets, key=lesson_order)
+        return sorted(buckets, key=bucket_order)
+
+    def get(self, granularity, bucket, key, dimension='student'):
+        """Unità di uno studente (o di un'azione) in un periodo; 0 se assente"""
+        return self.tables[(granularity, dimension)].get(bucket, {}).get(key, 0)
+
+    def season(self, dimension='student'):
+        return self.tables[(SEASON, dimension)].get(SEASON, {})
+
+
+def build_rollups(data):
+    """Costruisce le tabelle da un'estrazione (qualsiasi formato supportato da dataset_index)"""
+    rollups = Rollups()
+    rollups.update(data)
+    return rollups
+
+
+def format_monthly_report(rollups):
+    """Righe di testo per il report: migliore studente e azione più frequente di ogni mese"""
+    report = []
+    report.append("PUNTI PER MESE")
+    report.append("-" * 40)
+    for month in rollups.buckets('month'):
+        students = rollups.table('month', 'student')[month]
+        actions = rollups.table('month', 'action').get(month, {})
+        best_student = max(students, key=lambda student: (students[student], student))
+        best_action = max(actions, key=lambda action: (abs(actions[action]), action)) if actions else '-'
+        report.append(f"{month}: totale {from_units(sum(students.values())):>7.1f} punti, "
+                      f"migliore {best_student} ({from_units(students[best_student]):.1f}), "
+                      f"azione con più peso: {best_action[:40]}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregazioni dei punti FantaKombat per periodo")
+    parser.add_argument('data_file', nargs='?', default='fantakombat_data.json')
+    parser.add_argument('--granularity', choices=GRANULARITIES, default='month')
+    parser.add_argument('--dimension', choices=DIMENSIONS, default='student')
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    rollups = build_rollups(read_json(args.data_file))
+    table = rollups.table(args.granularity, args.dimension)
+    for bucket in rollups.buckets(args.granularity, args.dimension):
+        values = table[bucket]
+        print(f"\n{args.granularity} {bucket}:")
+        for key in sorted(values, key=lambda key: (-values[key], key))[:args.top]:
+            print(f"  {key[:45]:<45} {from_units(values[key]):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
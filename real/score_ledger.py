@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Registro append-only dei punteggi, con totali aggiornati in modo incrementale.
+
+Ogni modifica è un evento NDJSON aggiunto in coda al segmento corrente:
+  - 'assigned': assegna (o corregge) i punti di una chiave (studente, lezione, azione)
+  - 'revoked': annulla il punteggio di una chiave
+I totali per studente e per studente x settimana si aggiornano con la sola
+differenza portata dall'evento: una correzione a una settimana vecchia costa
+quanto la correzione, non quanto la stagione.
+
+Periodicamente i segmenti chiusi vengono compattati in uno snapshot
+(scritto in modo atomico); all'apertura si carica lo snapshot e si rigiocano
+solo i segmenti successivi.
+
+Esempi:
+    python score_ledger.py import fantakombat_data.json
+    python score_ledger.py assign Raffa 12 "Sacco con Angy" 0.5 --week 4
+    python score_ledger.py revoke Raffa 12 "Sacco con Angy"
+    python score_ledger.py standings
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+from dataset_index import flatten_dataset
+from fixed_point import from_units, to_units
+from output_io import read_json
+
+DEFAULT_LEDGER_DIR = 'fantakombat_ledger'
+SNAPSHOT_FILE = 'snapshot.json'
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.ndjson'
+DEFAULT_SEGMENT_EVENTS = 10000
+DEFAULT_COMPACT_SEGMENTS = 8
+
+ASSIGNED = 'assigned'
+REVOKED = 'revoked'
+
+
+def segment_name(number):
+    return f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+
+def segment_number(filename):
+    """Numero del segmento dal nome del file (None se non è un segmento)"""
+    if not (filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX)):
+        return None
+    digits = filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+    return int(digits) if digits.isdigit() else None
+
+
+def event_key(event):
+    """Chiave (studente, lezione, azione) di un evento"""
+    return event['student'], event.get('lesson'), event['action']
+
+
+def check_event(event):
+    """Solleva ValueError se l'evento non può essere applicato (da controllare prima di scriverlo)"""
+    if event['type'] not in (ASSIGNED, REVOKED):
+        raise ValueError(f"Tipo di evento sconosciuto: {event['type']}")
+    event_key(event)
+    if event['type'] == ASSIGNED:
+        to_units(event['points'])
+
+
+class ScoreLedger:
+    """
+    Registro dei punteggi su disco con stato in memoria:
+      - scores: chiave -> (unità, settimana)
+      - student_totals: studente -> unità
+      - week_totals: (studente, settimana) -> unità
+    I punti sono tenuti in unità intere (vedi fixed_point.py): i totali
+    incrementali restano esatti anche dopo milioni di correzioni.
+    """
+
+    def __init__(self, directory=DEFAULT_LEDGER_DIR, segment_events=DEFAULT_SEGMENT_EVENTS,
+                 compact_segments=DEFAULT_COMPACT_SEGMENTS, fsync=False):
+        self.directory = directory
+        self.segment_events = segment_events
+        self.compact_segments = compact_segments
+        self.fsync = fsync
+
+        self.scores = {}
+        self.student_totals = {}
+        self.week_totals = {}
+        self.first_segment = 1
+        self.current_segment = 1
+        self.current_events = 0
+        self.handle = None
+
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    # --- stato ---
+
+    def add_to_totals(self, student, week, delta):
+        if delta == 0:
+            return
+        self.student_totals[student] = self.student_totals.get(student, 0) + delta
+        week_key = (student, week)
+        self.week_totals[week_key] = self.week_totals.get(week_key, 0) + delta
+
+    def apply(self, event):
+        """Applica un evento allo stato; ritorna la variazione (in unità) del totale dello studente"""
+        key = event_key(event)
+        old_units, old_week = self.scores.get(key, (0, None))
+
+        if event['type'] == ASSIGNED:
+            new_units, new_week = to_units(event['points']), event.get('week')
+            self.scores[key] = (new_units, new_week)
+        elif event['type'] == REVOKED:
+            new_units, new_week = 0, old_week
+            self.scores.pop(key, None)
+        else:
+            raise ValueError(f"Tipo di evento sconosciuto: {event['type']}")
+
+        # Se la correzione sposta la settimana, il vecchio valore esce dalla sua settimana
+        if old_week != new_week:
+            self.add_to_totals(key[0], old_week, -old_units)
+            self.add_to_totals(key[0], new_week, new_units)
+        else:
+            self.add_to_totals(key[0], new_week, new_units - old_units)
+        return new_units - old_units
+
+    # --- disco ---
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def segment_numbers(self):
+        numbers = (segment_number(filename) for filename in os.listdir(self.directory))
+        return sorted(number for number in numbers if number is not None)
+
+    def load(self):
+        """Carica lo snapshot e rigioca i segmenti successivi"""
+        snapshot_path = self.path(SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            snapshot = read_json(snapshot_path)
+            self.first_segment = snapshot['next_segment']
+            for row in snapshot['scores']:
+                self.apply({'type': ASSIGNED, **row})
+
+        numbers = [number for number in self.segment_numbers() if number >= self.first_segment]
+        for number in numbers:
+            self.current_events = self.replay_segment(number)
+        self.current_segment = numbers[-1] if numbers else self.first_segment
+
+    def replay_segment(self, number):
+        """
+        Rigioca un segmento. Una riga finale incompleta (scrittura interrotta) viene
+        troncata: gli eventi successivi ripartono dall'ultima riga completa.
+        """
+        path = self.path(segment_name(number))
+        count = 0
+        complete_bytes = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self.apply(json.loads(line))
+                complete_bytes += len(line)
+                count += 1
+        if complete_bytes < os.path.getsize(path):
+            print(f"⚠️ Riga incompleta in coda a {path}: troncata all'ultimo evento completo")
+            os.truncate(path, complete_bytes)
+        return count
+
+    def open_segment(self):
+        if self.handle is None:
+            self.handle = open(self.path(segment_name(self.current_segment)), 'a', encoding='utf-8')
+        return self.handle
+
+    def rotate(self):
+        """Chiude il segmento corrente e, se i segmenti chiusi sono abbastanza, compatta"""
+        self.close()
+        self.current_segment += 1
+        self.current_events = 0
+        if self.current_segment - self.first_segment >= self.compact_segments:
+            self.compact()
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    # --- API ---
+
+    def append(self, events):
+        """Scrive gli eventi in coda al registro e aggiorna i totali (solo dopo la scrittura)"""
+        for event in events:
+            check_event(event)
+            handle = self.open_segment()
+            handle.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self.apply(event)
+            self.current_events += 1
+            if self.current_events >= self.segment_events:
+                self.flush()
+                self.rotate()
+        self.flush()
+
+    def flush(self):
+        if self.handle is not None:
+            self.handle.flush()
+            if self.fsync:
+                os.fsync(self.handle.fileno())
+
+    def assign(self, student, lesson, action, points, week=None):
+        self.append([{
+            'type': ASSIGNED, 'student': student, 'lesson': lesson, 'action': action,
+            'week': week, 'points': points, 'at': datetime.now().isoformat(),
+        }])
+
+    def revoke(self, student, lesson, action):
+        self.append([{
+            'type': REVOKED, 'student': student, 'lesson': lesson, 'action': action,
+            'at': datetime.now().isoformat(),
+        }])
+
+    def compact(self):
+        """
+        Scrive lo stato in uno snapshot e rimuove i segmenti chiusi che vi sono inclusi.
+        Il segmento corrente resta aperto e viene rigiocato dopo lo snapshot.
+        """
+        self.close()
+        if self.current_events:
+            self.current_segment += 1
+            self.current_events = 0
+
+        snapshot = {
+            'compacted_at': datetime.now().isoformat(),
+            'next_segment': self.current_segment,
+            'scores': [
+                {'student': student, 'lesson': lesson, 'action': action, 'week': week, 'points': from_units(units)}
+                for (student, lesson, action), (units, week) in self.scores.items()
+            ],
+        }
+        tmp_path = self.path(SNAPSHOT_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path(SNAPSHOT_FILE))
+
+        for number in self.segment_numbers():
+            if number < self.current_segment:
+                os.remove(self.path(segment_name(number)))
+        self.first_segment = self.current_segment
+
+    def student_points(self, student):
+        """Totale di uno studente in punti decimali"""
+        return from_units(self.student_totals.get(student, 0))
+
+    def standings(self):
+        """Classifica [(posizione, studente, punti)]: a parità di punti stessa posizione"""
+        ordered = sorted(self.student_totals.items(), key=lambda item: (-item[1], item[0]))
+        standings = []
+        previous_units = None
+        for idx, (student, units) in enumerate(ordered):
+            rank = standings[-1][0] if units == previous_units else idx + 1
+            standings.append((rank, student, from_units(units)))
+            previous_units = units
+        return standings
+
+
+def events_from_dataset(data):
+    """
+    Eventi 'assigned' da un'estrazione (qualsiasi formato supportato da dataset_index),
+    uno per chiave (studente, lezione, azione) con i punti sommati.
+    Per le estrazioni settimanali, senza lezioni, la lezione è la chiave della settimana ('week_4').
+    """
+    records, weeks, _ = flatten_dataset(data)
+    merged = {}
+    for record, week in zip(records, weeks):
+        lesson = record.get('lesson')
+        if lesson is None:
+            lesson = f"week_{week}"
+        key = (record['student'], lesson, record['action'])
+        units, _ = merged.get(key, (0, week))
+        merged[key] = (units + to_units(record['points']), week)
+
+    at = datetime.now().isoformat()
+    return [
+        {'type': ASSIGNED, 'student': student, 'lesson': lesson, 'action': action,
+         'week': week, 'points': from_units(units), 'at': at}
+        for (student, lesson, action), (units, week) in merged.items()
+    ]
+
+
+def lesson_arg(value):
+    """Lezione da riga di comando: numero oppure chiave di settimana ('week_4')"""
+    return int(value) if value.isdigit() else value
+
+
+def print_standings(ledger, top=None):
+    for rank, student, points in ledger.standings()[:top]:
+        print(f"{rank:2d}. {student:<25} {points:>8.1f} punti")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro append-only dei punteggi FantaKombat")
+    parser.add_argument('--ledger', default=DEFAULT_LEDGER_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="importa un'estrazione JSON")
+    import_parser.add_argument('data_file', nargs='?', default='fantakombat_data.json')
+
+    assign_parser = commands.add_parser('assign', help="assegna o corregge un punteggio")
+    assign_parser.add_argument('student')
+    assign_parser.add_argument('lesson', type=lesson_arg)
+    assign_parser.add_argument('action')
+    assign_parser.add_argument('points', type=float)
+    assign_parser.add_argument('--week', type=int)
+
+    revoke_parser = commands.add_parser('revoke', help="annulla un punteggio")
+    revoke_parser.add_argument('student')
+    revoke_parser.add_argument('lesson', type=lesson_arg)
+    revoke_parser.add_argument('action')
+
+    commands.add_parser('compact', help="compatta i segmenti in uno snapshot")
+    standings_parser = commands.add_parser('standings', help="stampa la classifica")
+    standings_parser.add_argument('--top', type=int)
+    args = parser.parse_args()
+
+    ledger = ScoreLedger(args.ledger)
+    try:
+        if args.command == 'import':
+            events = events_from_dataset(read_json(args.data_file))
+            ledger.append(events)
+            print(f"✅ Importati {len(events)} punteggi in {args.ledger}")
+        elif args.command == 'assign':
+            ledger.assign(args.student, args.lesson, args.action, args.points, args.week)
+            print(f"✅ {args.student}: {ledger.student_points(args.student):.1f} punti")
+        elif args.command == 'revoke':
+            ledger.revoke(args.student, args.lesson, args.action)
+            print(f"✅ {args.student}: {ledger.student_points(args.student):.1f} punti")
+        elif args.command == 'compact':
+            ledger.compact()
+            print(f"✅ Snapshot aggiornato in {args.ledger}")
+        else:
+            print_standings(ledger, args.top)
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Calcolo vettoriale dei punti delle celle azione.
+
+Le celle di un foglio contengono poche decine di valori distinti ('v', 'v+v',
+'1+1', '-0.5', ...): il blocco delle azioni viene fattorizzato in
+(codici, valori unici), ogni coppia (valore, punteggio base) viene valutata una
+sola volta e il risultato viene riportato sulle celle tramite i codici.
+Con quantum i punti vengono restituiti come unità intere (vedi fixed_point.py):
+un valore che non è multiplo del quanto (o non è un numero) viene arrotondato
+con un avviso che indica foglio, riga e colonna, senza scartare il resto del foglio.
+
+calculate_points è la regola di valutazione di una singola cella usata come scorer.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from fixed_point import from_units, round_to_units
+
+
+@functools.lru_cache(maxsize=None)
+def score_unique(scorer, value, key):
+    """Calcola (una volta sola) i punti di un valore distinto per una colonna"""
+    return float(scorer(value, key))
+
+
+def factorize_block(block):
+    """
+    Fattorizza un blocco di celle (DataFrame o array 2D).
+    Ritorna (codes, uniques): codes ha la forma del blocco e vale -1 per le celle vuote.
+    """
+    values = np.asarray(block, dtype=object)
+    codes, uniques = pd.factorize(values.ravel(), use_na_sentinel=True)
+    return codes.reshape(values.shape), uniques
+
+
+def build_lookup_table(uniques, column_keys, scorer, quantum=None):
+    """
+    Costruisce la tabella (valori unici + 1) x (chiavi distinte) dei punti.
+    L'ultima riga vale 0 ed è usata per le celle vuote (codice -1).
+    Con quantum la tabella contiene unità intere invece di float.
+    Ritorna (table, key_codes, rounded): key_codes associa ogni colonna alla sua chiave,
+    rounded mappa (valore, chiave) -> punti per le coppie arrotondate al quanto.
+    """
+    key_codes, distinct_keys = pd.factorize(pd.Series(list(column_keys), dtype=object))
+    dtype = float if quantum is None else np.int64
+    table = np.zeros((len(uniques) + 1, len(distinct_keys)), dtype=dtype)
+    rounded = {}
+    for u, value in enumerate(uniques):
+        value_str = str(value)
+        for k, key in enumerate(distinct_keys):
+            points = score_unique(scorer, value_str, key)
+            if quantum is None:
+                table[u, k] = points
+                continue
+            table[u, k], exact = round_to_units(points, quantum)
+            if not exact:
+                rounded[(u, k)] = points
+    return table, key_codes, rounded
+
+
+def warn_rounded(codes, key_codes, uniques, rounded, quantum, label=None, row_labels=None, column_labels=None):
+    """Un avviso per ogni cella il cui punteggio è stato arrotondato al quanto"""
+    for (u, k), points in rounded.items():
+        for row, col in np.argwhere((codes == u) & (key_codes[np.newaxis, :] == k)):
+            row_name = row_labels[row] if row_labels is not None else row + 1
+            col_name = column_labels[col] if column_labels is not None else col + 1
+            units, _ = round_to_units(points, quantum)
+            print(f"⚠️ {label or 'Foglio'}, riga {row_name}, colonna {col_name}: valore '{uniques[u]}' "
+                  f"= {points} punti non multiplo di {quantum}, arrotondato a {from_units(units, quantum)}")
+
+
+def score_block(block, column_keys, scorer, quantum=None, label=None, row_labels=None, column_labels=None):
+    """
+    Calcola i punti di tutte le celle di un blocco di azioni.
+
+    column_keys contiene, per ogni colonna, l'argomento passato a scorer insieme
+    al valore della cella (es. il punteggio base dell'azione o il nome della colonna).
+    scorer(value, key) viene chiamato una volta per ogni coppia distinta.
+    Ritorna un array (righe x colonne) di float, o di unità intere se è indicato quantum.
+    label, row_labels e column_labels (foglio, studenti, azioni) servono solo agli avvisi di arrotondamento.
+    """
+    codes, uniques = factorize_block(block)
+    if codes.size == 0:
+        return np.zeros(codes.shape, dtype=float if quantum is None else np.int64)
+    table, key_codes, rounded = build_lookup_table(uniques, column_keys, scorer, quantum)
+    if rounded:
+        warn_rounded(codes, key_codes, uniques, rounded, quantum, label, row_labels, column_labels)
+    # Il codice -1 delle celle vuote punta all'ultima riga (tutta a zero)
+    return table[codes, key_codes[np.newaxis, :]]
+
+
+def calculate_points(value, base_points):
+    """
+    Calcola i punti in base al valore nella cella ('v', 'v+v', '1+1', '-0.5', ...):
+    è lo scorer passato a score_block dagli estrattori e dal piano delle azioni
+    """
+    if pd.isna(value) or value == '':
+        return 0
+    
+    value_str = str(value).strip().lower()
+    
+    # Se è vuoto o 0, restituisci 0
+    if not value_str or value_str == '0' or value_str == 'nan':
+        return 0
+    
+    # Se contiene 'v', conta le occorrenze
+    if 'v' in value_str:
+        v_count = value_str.count('v')
+        return base_points * v_count
+    
+    # Se contiene '+', somma i numeri
+    if '+' in value_str:
+        try:
+            parts = value_str.split('+')
+            total = 0
+            for part in parts:
+                part = part.strip()
+                if part == 'v':
+                    total += base_points
+                elif part.replace('.', '').replace('-', '').isdigit():
+                    total += float(part)
+            return total
+        except:
+            pass
+    
+    # Se è un numero, restituiscilo
+    try:
+        return float(value_str)
+    except:
+        pass
+    
+    # Se tutto il resto fallisce, restituisci base_points se c'è qualcosa
+    return base_points if value_str else 0
@@ -0,0 +1,167 @@
+"""
+Matrice della stagione: punti calcolati per studente x settimana x azione.
+
+Ogni foglio settimanale viene valutato con il piano compilato dall'intestazione
+(vedi action_rules.py) e i risultati vengono raccolti in array numpy, base
+comune per riconciliazione, simulazioni e analisi.
+"""
+
+import numpy as np
+import pandas as pd
+
+from action_rules import is_plan_column, plan_for_dataframe, score_sheet
+from fixed_point import QUANTUM, from_units
+from sheet_filters import filter_student_rows, select_sheets
+
+SUMMARY_SHEET = 'totale FANTAKombat'
+
+
+def weekly_sheet_names(xls):
+    """Fogli settimanali nell'ordine del file (escluso il foglio totale)"""
+    return [name for name in xls.sheet_names if 'totale' not in name.lower()]
+
+
+def index_of(names):
+    """Mappa nome -> posizione"""
+    return {name: idx for idx, name in enumerate(names)}
+
+
+def read_weekly_sheet(xls, sheet_name, sheet_filter=None):
+    """
+    Legge un foglio settimanale con le sole colonne del piano (nome, azioni, 'Tot Settimana').
+
+    Le colonne 'Unnamed' e quelle in coda non vengono caricate; le righe dopo l'ultimo
+    partecipante vengono scartate dopo la lettura (xlrd decodifica comunque l'intero foglio
+    all'apertura del file, quindi nrows non fa risparmiare tempo). I tipi restano quelli
+    dedotti da pandas: le colonne azione sono quasi tutte numeriche e come float occupano
+    meno che come stringhe.
+    xls deve essere un pd.ExcelFile già aperto: pd.read_excel con il percorso riapre il file a ogni foglio.
+    Con un filtro sugli studenti (vedi sheet_filters.py) restano solo le loro righe.
+    """
+    df = pd.read_excel(xls, sheet_name=sheet_name, usecols=is_plan_column)
+    plan = plan_for_dataframe(df)
+    if plan['participant_col'] is None:
+        return df
+
+    last_row = df.iloc[:, plan['participant_col']].last_valid_index()
+    df = df.iloc[:0 if last_row is None else df.index.get_loc(last_row) + 1]
+    return filter_student_rows(df, plan['participant_col'], sheet_filter)
+
+
+def build_season(file_path, sheet_names=None, sheet_filter=None):
+    """
+    Legge i fogli settimanali e costruisce la matrice della stagione.
+    Con sheet_filter (vedi sheet_filters.py) i fogli esclusi non vengono letti
+    e le righe degli studenti esclusi non vengono valutate.
+
+    Ritorna un dizionario con:
+      - sheets: nomi dei fogli (una settimana ciascuno, in ordine)
+      - weeks: numero di settimana di ogni foglio (1 = primo foglio settimanale del file)
+      - students / actions: etichette degli assi
+      - action_points / action_units: punteggio base di ogni azione, in punti e in unità
+      - points: array intero (studenti x settimane x azioni) dei punti calcolati, in unità
+        di QUANTUM punti (vedi fixed_point.py)
+      - present: array booleano (studenti x settimane), True se lo studente compare nel foglio
+      - sheet_totals: array (studenti x settimane) della colonna 'Tot Settimana' (NaN se assente)
+    """
+    xls = pd.ExcelFile(file_path)
+    if sheet_names is None:
+        sheet_names = weekly_sheet_names(xls)
+
+    selected = select_sheets(list(enumerate(sheet_names, 1)), sheet_filter)
+    scored_sheets = [score_sheet(read_weekly_sheet(xls, name, sheet_filter), label=name) for _, name in selected]
+    return assemble_season([name for _, name in selected], scored_sheets, file_path=file_path,
+                           weeks=[week for week, _ in selected])
+
+
+def assemble_season(sheet_names, scored_sheets, file_path=None, weeks=None):
+    """Raccoglie i risultati di score_sheet (uno per settimana) negli array della stagione"""
+    students = sorted({name for sheet in scored_sheets for name in sheet['students']})
+
+    # Le azioni mantengono l'ordine della prima intestazione in cui compaiono
+    actions = []
+    action_units = {}
+    for sheet in scored_sheets:
+        for action, units in zip(sheet['plan']['actions'], sheet['plan']['units']):
+            if action not in action_units:
+                actions.append(action)
+                action_units[action] = int(units)
+
+    student_index = index_of(students)
+    action_index = index_of(actions)
+
+    n_students, n_weeks, n_actions = len(students), len(sheet_names), len(actions)
+    points = np.zeros((n_students, n_weeks, n_actions), dtype=np.int64)
+    present = np.zeros((n_students, n_weeks), dtype=bool)
+    sheet_totals = np.full((n_students, n_weeks), np.nan)
+
+    for week_idx, sheet in enumerate(scored_sheets):
+        rows = np.array([student_index[name] for name in sheet['students']], dtype=int)
+        cols = np.array([action_index[action] for action in sheet['plan']['actions']], dtype=int)
+        if rows.size == 0:
+            continue
+        # np.add.at somma anche eventuali righe duplicate dello stesso studente
+        np.add.at(points, (rows[:, np.newaxis], week_idx, cols[np.newaxis, :]), sheet['points'])
+        present[rows, week_idx] = True
+        sheet_totals[rows, week_idx] = np.where(
+            np.isnan(sheet_totals[rows, week_idx]), 0.0, sheet_totals[rows, week_idx]
+        ) + np.nan_to_num(sheet['totals'])
+
+    return {
+        'file_path': file_path,
+        'sheets': list(sheet_names),
+        'weeks': list(weeks) if weeks is not None else list(range(1, len(sheet_names) + 1)),
+        'students': students,
+        'actions': actions,
+        'quantum': QUANTUM,
+        'action_units': np.array([action_units[action] for action in actions], dtype=np.int64),
+        'action_points': from_units(np.array([action_units[action] for action in actions], dtype=np.int64)),
+        'points': points,
+        'present': present,
+        'sheet_totals': sheet_totals,
+    }
+
+
+def weekly_totals(season):
+    """Punti calcolati per studente x settimana, in unità intere"""
+    return season['points'].sum(axis=2)
+
+
+def action_counts(season):
+    """
+    Unità di ogni azione per studente x settimana x azione.
+    Per le colonne a soglie ('Punti extra settimana') le unità sono i punti della
+    soglia divisi per il punteggio base (uno scenario di whatif.py ne scala tutta la tabella).
+    """
+    base = season['action_units']
+    safe_base = np.where(base == 0, 1, base)
+    return np.where(base == 0, 0.0, season['points'] / safe_base)
+
+
+def read_summary_totals(file_path_or_xls):
+    """
+    Legge il foglio 'totale FANTAKombat'.
+    Ritorna un DataFrame indicizzato per studente con una colonna per settimana (1..N)
+    e la colonna 'Totale'.
+    """
+    df = pd.read_excel(file_path_or_xls, sheet_name=SUMMARY_SHEET, header=None)
+
+    names = df.iloc[2:, 0]
+    valid = names.notna()
+    body = df.iloc[2:, 1:][valid.to_numpy()]
+    body = body.apply(pd.to_numeric, errors='coerce')
+
+    n_weeks = body.shape[1] - 1  # L'ultima colonna è il totale
+    body.columns = list(range(1, n_weeks + 1)) + ['Totale']
+    body.index = [str(name).strip() for name in names[valid]]
+    body.index.name = 'student'
+    return body
+
+
+def rank_descending(totals):
+    """
+    Classifica di ogni colonna di una matrice (studenti x colonne), in un'unica operazione.
+    A parità di punti gli studenti condividono la posizione (1, 2, 2, 4, ...).
+    """
+    ranks = pd.DataFrame(totals).rank(axis=0, method='min', ascending=False)
+    return ranks.to_numpy(dtype=int)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Condivisione della matrice della stagione tra processi, senza copie.
+
+Il processo principale pubblica una volta gli array numerici (punti
+studenti x settimane x azioni, presenze, matrice impacchettata delle lezioni)
+in blocchi multiprocessing.shared_memory e ottiene un descrittore: un piccolo
+dizionario con nomi dei blocchi, forme, tipi ed etichette degli assi.
+I processi del pool ricevono solo il descrittore e si agganciano ai blocchi:
+gli array sono viste numpy sulla stessa memoria, quindi non c'è nulla da
+rileggere, deserializzare o copiare e la memoria non cresce con i processi.
+
+    with share_season(season, attendance) as shared:
+        results = run_shared(shared.descriptor, funzione, compiti, workers=8)
+
+Nei processi, funzione(compito) legge i dati con worker_season().
+Gli array agganciati vanno trattati in sola lettura.
+
+Esempio (confronto dei totali calcolati nei processi con quelli del processo principale):
+    python shared_season.py FantaKombat.xls --workers 4
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from attendance import build_attendance
+from season import build_season
+
+SEASON_ARRAYS = ['points', 'present', 'sheet_totals', 'action_units', 'action_points']
+SEASON_LABELS = ['file_path', 'sheets', 'students', 'actions', 'quantum']
+ATTENDANCE_ARRAYS = ['bits', 'lessons_per_week', 'week_start', 'lesson_week']
+ATTENDANCE_LABELS = ['students', 'sheets', 'n_lessons', 'lesson_dates']
+
+# Stato dei processi del pool (impostato da init_worker)
+_worker = {'season': None, 'attendance': None, 'blocks': []}
+
+
+def share_array(array):
+    """Copia un array in un nuovo blocco condiviso; ritorna (blocco, voce del descrittore)"""
+    array = np.ascontiguousarray(array)
+    # Un blocco non può essere vuoto: gli array di dimensione zero occupano comunque un byte
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, {'block': block.name, 'shape': list(array.shape), 'dtype': array.dtype.str}
+
+
+def attach_block(name):
+    """Si aggancia a un blocco esistente senza registrarlo come proprio (lo libera chi lo ha creato)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: nessun parametro track
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach_array(entry, blocks):
+    block = attach_block(entry['block'])
+    blocks.append(block)
+    array = np.ndarray(tuple(entry['shape']), dtype=np.dtype(entry['dtype']), buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+
+class SharedSeason:
+    """Blocchi condivisi di una stagione (e delle presenze); li rilascia alla chiusura"""
+
+    def __init__(self, season, attendance=None):
+        self.blocks = []
+        self.descriptor = {
+            'season': self.share_part(season, SEASON_ARRAYS, SEASON_LABELS),
+            'attendance': self.share_part(attendance, ATTENDANCE_ARRAYS, ATTENDANCE_LABELS)
+            if attendance is not None else None,
+        }
+
+    def share_part(self, data, array_keys, label_keys):
+        arrays = {}
+        for key in array_keys:
+            block, entry = share_array(data[key])
+            self.blocks.append(block)
+            arrays[key] = entry
+        return {'arrays': arrays, 'labels': {key: data[key] for key in label_keys}}
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def share_season(season, attendance=None):
+    """Pubblica la stagione in memoria condivisa (da usare con `with`)"""
+    return SharedSeason(season, attendance)
+
+
+def attach_part(part, blocks):
+    if part is None:
+        return None
+    data = dict(part['labels'])
+    for key, entry in part['arrays'].items():
+        data[key] = attach_array(entry, blocks)
+    return data
+
+
+def attach_season(descriptor):
+    """
+    Ricostruisce stagione e presenze come viste sui blocchi condivisi.
+    Ritorna (season, attendance, blocks): i blocchi vanno tenuti vivi finché si usano gli array.
+    """
+    blocks = []
+    season = attach_part(descriptor['season'], blocks)
+    attendance = attach_part(descriptor['attendance'], blocks)
+    return season, attendance, blocks
+
+
+def init_worker(descriptor):
+    """Initializer del pool: aggancia i blocchi una volta per processo"""
+    season, attendance, blocks = attach_season(descriptor)
+    _worker.update(season=season, attendance=attendance, blocks=blocks)
+
+
+def worker_season():
+    """Stagione agganciata nel processo corrente"""
+    return _worker['season']
+
+
+def worker_attendance():
+    """Presenze agganciate nel processo corrente (None se non pubblicate)"""
+    return _worker['attendance']
+
+
+def run_shared(descriptor, function, tasks, workers=None):
+    """
+    Esegue function(compito) per ogni compito in un pool di processi agganciati alla stagione.
+    Ritorna i risultati nell'ordine dei compiti.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(descriptor,)) as executor:
+        return list(executor.map(function, tasks))
+
+
+def student_range_totals(bounds):
+    """Compito di esempio: totali (unità) e lezioni frequentate per un intervallo di studenti"""
+    start, end = bounds
+    season = worker_season()
+    attendance = worker_attendance()
+    totals = season['points'][start:end].sum(axis=(1, 2))
+    attended = np.unpackbits(attendance['bits'][start:end], axis=1, count=attendance['n_lessons']).sum(axis=1)
+    return totals, attended
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stagione FantaKombat in memoria condivisa")
+    parser.add_argument('file_path', nargs='?', default='FantaKombat.xls')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers deve essere almeno 1")
+
+    season = build_season(args.file_path)
+    attendance = build_attendance(season)
+    n_students = len(season['students'])
+    step = max(1, -(-n_students // args.workers))
+    tasks = [(start, min(start + step, n_students)) for start in range(0, n_students, step)]
+
+    with share_season(season, attendance) as shared:
+        shared_bytes = sum(block.size for block in shared.blocks)
+        results = run_shared(shared.descriptor, student_range_totals, tasks, args.workers)
+
+    totals = np.concatenate([result[0] for result in results])
+    attended = np.concatenate([result[1] for result in results])
+    matches = np.array_equal(totals, season['points'].sum(axis=(1, 2)))
+    print(f"✅ {n_students} studenti elaborati in {len(tasks)} processi "
+          f"({shared_bytes} byte condivisi), "
+          f"totali {'coerenti' if matches else 'DIVERSI'}; lezioni frequentate: {int(attended.sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Calendario delle lezioni ricavato dai nomi dei fogli settimanali.
+
+Un'unica espressione regolare riconosce tutti i formati dei nomi dei fogli:
+    '13- 15 - 17 Gen 2025', '24- 26 - 28 Febb 2025 ', '23 Aprile 2025',
+    '18- 20 - 22 + OpenD Marzo 2025', '04-06-Giugno 2025',
+    'X-18-20-special Giugno 2025', '31- 2 - 4 Aprile 2025'
+I giorni precedono mese e anno; le annotazioni ('special', '+ OpenD') si ignorano.
+Quando i giorni scavalcano la fine del mese il mese del nome è quello dell'ultimo
+giorno ('31- 2 - 4 Aprile' = 31 marzo, 2 e 4 aprile), a meno che così la settimana
+finisca prima del foglio precedente: allora è quello del primo giorno
+('30-02-04 Giugno' dopo '23-25-26 Giugno' = 30 giugno, 2 e 4 luglio).
+Un giorno 'X' è una lezione senza data: si ricava dal giorno accanto con la
+cadenza del corso (una lezione ogni LESSON_SPACING_DAYS giorni).
+
+Il mese dei fogli a cavallo dipende dal foglio precedente, quindi le date si
+chiedono sempre al calendario (build_calendar / calendar_for), mai al singolo nome.
+I nomi risolti sono memorizzati; LessonCalendar ordina tutte le lezioni della
+stagione per data e risponde con ricerca binaria a "che lezione c'è il giorno X",
+"quali date ha la settimana N" e "quali lezioni/settimane cadono tra due date".
+
+Esempio:
+    python sheet_calendar.py FantaKombat.xls --from 2025-03-01 --to 2025-03-31
+"""
+
+import argparse
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+
+import pandas as pd
+
+TOTAL_SHEET = 'totale FANTAKombat'
+LESSON_SPACING_DAYS = 2
+
+# Prime tre lettere dei mesi italiani ('Febb', 'Marzo', 'Giu', ...)
+MONTHS = {
+    'gen': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'mag': 5, 'giu': 6,
+    'lug': 7, 'ago': 8, 'set': 9, 'ott': 10, 'nov': 11, 'dic': 12,
+}
+
+SHEET_NAME = re.compile(r"""
+    ^\s*
+    (?P<days>(?:(?:\d{1,2}|X)[\s\-+]*)+)   # giorni separati da trattini, spazi o '+'
+    (?P<note>.*?)                          # annotazioni ignorate ('special', 'OpenD')
+    \b(?P<month>[A-Za-z]+)\s+(?P<year>\d{4})\s*$
+""", re.VERBOSE)
+DAY = re.compile(r'\d{1,2}|X')
+
+
+def shift_month(year, month, step):
+    year, month = divmod(year * 12 + month - 1 + step, 12)
+    return year, month + 1
+
+
+def place_days(days, year, month, anchor):
+    """
+    Date dei giorni noti (None per 'X'): il giorno in posizione anchor cade nel
+    mese indicato, i precedenti e i successivi cambiano mese quando la sequenza scavalca.
+    """
+    months = [None] * len(days)
+    known = [idx for idx, day in enumerate(days) if day is not None]
+    months[known[anchor]] = (year, month)
+    for before, after in zip(known[anchor::-1][1:], known[anchor::-1]):
+        step = -1 if days[before] > days[after] else 0
+        months[before] = shift_month(*months[after], step)
+    for before, after in zip(known[anchor:], known[anchor:][1:]):
+        step = 1 if days[after] < days[before] else 0
+        months[after] = shift_month(*months[before], step)
+
+    placed = [None] * len(days)
+    for idx in known:
+        try:
+            placed[idx] = date(*months[idx], days[idx])
+        except ValueError:
+            return None
+    return placed
+
+
+def fill_placeholders(placed):
+    """Date dei giorni 'X' dal giorno noto più vicino, con la cadenza del corso"""
+    known = [idx for idx, day in enumerate(placed) if day is not None]
+    for idx, day in enumerate(placed):
+        if day is None:
+            nearest = min(known, key=lambda other: (abs(other - idx), other < idx))
+            placed[idx] = placed[nearest] + timedelta(days=(idx - nearest) * LESSON_SPACING_DAYS)
+    return placed
+
+
+@lru_cache(maxsize=None)
+def _resolve_sheet_dates(sheet_name, after=None):
+    """
+    Date ISO (tupla) delle lezioni di un foglio; tupla vuota se il nome non contiene date.
+    after: ultima data ISO del foglio precedente, per decidere il mese dei fogli a cavallo.
+    """
+    match = SHEET_NAME.match(sheet_name)
+    month = MONTHS.get(match.group('month')[:3].lower()) if match else None
+    days = [None if token == 'X' else int(token) for token in DAY.findall(match.group('days'))] if month else []
+    if not any(day is not None for day in days):
+        print(f"⚠️ Impossibile parsare le date dal foglio: {sheet_name}")
+        return ()
+
+    year = int(match.group('year'))
+    n_known = sum(day is not None for day in days)
+    placed = place_days(days, year, month, n_known - 1)
+    if after is not None and n_known > 1 and (placed is None or min(filter(None, placed)).isoformat() <= after):
+        # Il mese del nome è quello del primo giorno
+        placed = place_days(days, year, month, 0) or placed
+    if placed is None:
+        print(f"⚠️ Impossibile parsare le date dal foglio: {sheet_name}")
+        return ()
+    return tuple(day.isoformat() for day in fill_placeholders(placed))
+
+
+def as_iso(day):
+    """Data ISO da date o stringa"""
+    return day.isoformat() if isinstance(day, date) else str(day)
+
+
+class LessonCalendar:
+    """
+    Indice ordinato delle lezioni di una stagione.
+    numbered_sheets: lista di (settimana, nome foglio) nell'ordine del file.
+    """
+
+    def __init__(self, numbered_sheets):
+        self.sheets = {}
+        self.week_of_sheet = {}
+        self.dates = {}
+        lessons = []
+        previous = None
+        for week, sheet_name in numbered_sheets:
+            week_dates = list(_resolve_sheet_dates(sheet_name, previous))
+            self.sheets[week] = sheet_name
+            self.week_of_sheet[sheet_name] = week
+            self.dates[week] = week_dates
+            lessons.extend((lesson_date, week, number) for number, lesson_date in enumerate(week_dates, 1))
+            if week_dates:
+                previous = max(week_dates)
+        lessons.sort()
+        # Date ISO ordinate: il confronto tra stringhe coincide con quello tra date
+        self.lesson_dates = [lesson_date for lesson_date, _, _ in lessons]
+        self.lessons = [(week, number) for _, week, number in lessons]
+
+    def __len__(self):
+        return len(self.lesson_dates)
+
+    def week_dates(self, week):
+        """Date ISO delle lezioni della settimana (lista vuota se sconosciuta)"""
+        return self.dates.get(week, [])
+
+    def sheet_dates(self, sheet_name):
+        week = self.week_of_sheet.get(sheet_name)
+        return self.dates[week] if week is not None else []
+
+    def lesson_on(self, day):
+        """(settimana, numero lezione) della lezione del giorno; None se quel giorno non c'è lezione"""
+        day = as_iso(day)
+        idx = bisect_left(self.lesson_dates, day)
+        if idx < len(self.lesson_dates) and self.lesson_dates[idx] == day:
+            return self.lessons[idx]
+        return None
+
+    def week_on(self, day):
+        """Settimana della lezione più recente alla data (None se precede la prima lezione)"""
+        idx = bisect_right(self.lesson_dates, as_iso(day))
+        return self.lessons[idx - 1][0] if idx else None
+
+    def range_slice(self, start=None, end=None):
+        low = bisect_left(self.lesson_dates, as_iso(start)) if start is not None else 0
+        high = bisect_right(self.lesson_dates, as_iso(end)) if end is not None else len(self.lesson_dates)
+        return low, high
+
+    def lessons_between(self, start=None, end=None):
+        """Lezioni (data ISO, settimana, numero) con data tra start ed end inclusi, in ordine di data"""
+        low, high = self.range_slice(start, end)
+        return [(lesson_date, week, number)
+                for lesson_date, (week, number) in zip(self.lesson_dates[low:high], self.lessons[low:high])]
+
+    def weeks_between(self, start=None, end=None):
+        """Settimane con almeno una lezione tra start ed end inclusi"""
+        low, high = self.range_slice(start, end)
+        return {week for week, _ in self.lessons[low:high]}
+
+
+@lru_cache(maxsize=32)
+def calendar_for(numbered_sheets):
+    """Calendario memorizzato per una tupla di (settimana, nome foglio)"""
+    return LessonCalendar(numbered_sheets)
+
+
+def build_calendar(sheet_names):
+    """
+    Calendario dai nomi dei fogli del file, numerando le settimane come
+    extract_fantakombat_data_fixed: solo i fogli con date, escluso il totale.
+    """
+    dated_sheets = []
+    previous = None
+    for sheet_name in sheet_names:
+        if sheet_name == TOTAL_SHEET:
+            continue
+        sheet_dates = _resolve_sheet_dates(sheet_name, previous)
+        if sheet_dates:
+            dated_sheets.append((len(dated_sheets) + 1, sheet_name))
+            previous = max(sheet_dates)
+    return calendar_for(tuple(dated_sheets))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calendario delle lezioni FantaKombat dai nomi dei fogli")
+    parser.add_argument('file_path', nargs='?', default='FantaKombat.xls')
+    parser.add_argument('--from', dest='start', help="data iniziale (AAAA-MM-GG)")
+    parser.add_argument('--to', dest='end', help="data finale (AAAA-MM-GG)")
+    parser.add_argument('--date', help="mostra la lezione di un giorno (AAAA-MM-GG)")
+    args = parser.parse_args()
+
+    calendar = build_calendar(pd.ExcelFile(args.file_path).sheet_names)
+    if args.date:
+        lesson = calendar.lesson_on(args.date)
+        if lesson is None:
+            print(f"📅 Nessuna lezione il {args.date} (settimana in corso: {calendar.week_on(args.date)})")
+        else:
+            print(f"📅 {args.date}: lezione {lesson[1]} della settimana {lesson[0]} ({calendar.sheets[lesson[0]]})")
+        return
+
+    for lesson_date, week, number in calendar.lessons_between(args.start, args.end):
+        print(f"{lesson_date}  settimana {week:>2}  lezione {number}  {calendar.sheets[week].strip()}")
+
+
+if __name__ == "__main__":
+    main()
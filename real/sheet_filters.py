@@ -0,0 +1,120 @@
+"""
+Filtri di estrazione applicati prima della lettura dei fogli.
+
+Un filtro (dizionario creato da make_filter) restringe l'estrazione a:
+  - weeks: numeri di settimana (1 = primo foglio settimanale)
+  - start / end: intervallo di date ISO, confrontato con le date delle lezioni ricavate dai nomi dei fogli
+  - students: nomi dei partecipanti
+Settimane e date si risolvono sui soli nomi dei fogli: i fogli esclusi non
+vengono mai letti. Gli studenti si filtrano sulla colonna dei partecipanti
+prima del calcolo dei punti: le righe escluse non vengono mai valutate.
+
+Opzioni da riga di comando (vedi parse_filter_args e add_filter_arguments):
+    --weeks=1,3,10-12  --from=2025-03-01  --to=2025-03-31  --students=Raffa,Gaia
+"""
+
+import argparse
+from datetime import date
+
+from sheet_calendar import calendar_for
+
+
+def make_filter(weeks=None, start=None, end=None, students=None):
+    """Crea un filtro; None se non filtra nulla (estrazione completa)"""
+    if weeks is None and start is None and end is None and students is None:
+        return None
+    return {
+        'weeks': set(weeks) if weeks is not None else None,
+        'start': start,
+        'end': end,
+        'students': {name.strip() for name in students} if students is not None else None,
+    }
+
+
+def parse_weeks(text):
+    """Converte '1,3,10-12' in {1, 3, 10, 11, 12}"""
+    weeks = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                first, last = part.split('-', 1)
+                weeks.update(range(int(first), int(last) + 1))
+            else:
+                weeks.add(int(part))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"settimane non valide '{part}' (es. 1,3,10-12)") from None
+    if not weeks:
+        raise argparse.ArgumentTypeError(f"nessuna settimana in '{text}'")
+    return weeks
+
+
+def parse_date(text):
+    """Valida una data AAAA-MM-GG e la ritorna in forma ISO (le date si confrontano come stringhe)"""
+    try:
+        return date.fromisoformat(text.strip()).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data non valida '{text}': usare AAAA-MM-GG") from None
+
+
+def parse_students(text):
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+
+def parse_filter_args(argv):
+    """
+    Estrae il filtro dalle opzioni --weeks, --from, --to, --students (per gli script con sys.argv).
+    Le altre opzioni vengono ignorate; valori non validi terminano con un errore di argparse.
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    add_filter_arguments(parser)
+    args, _ = parser.parse_known_args(argv)
+    return filter_from_args(args, parser)
+
+
+def add_filter_arguments(parser):
+    """Aggiunge le opzioni di filtro a un parser argparse"""
+    parser.add_argument('--weeks', type=parse_weeks, help="settimane da estrarre, es. 1,3,10-12")
+    parser.add_argument('--from', dest='start', type=parse_date, help="data iniziale (AAAA-MM-GG)")
+    parser.add_argument('--to', dest='end', type=parse_date, help="data finale (AAAA-MM-GG)")
+    parser.add_argument('--students', type=parse_students, help="studenti separati da virgola")
+
+
+def filter_from_args(args, parser=None):
+    """Filtro dalle opzioni di add_filter_arguments (con parser, un intervallo vuoto è un errore)"""
+    if args.start is not None and args.end is not None and args.start > args.end:
+        message = f"--from {args.start} è successiva a --to {args.end}"
+        if parser is None:
+            raise ValueError(message)
+        parser.error(message)
+    return make_filter(args.weeks, args.start, args.end, args.students)
+
+
+def select_sheets(numbered_sheets, sheet_filter):
+    """
+    Restringe una lista di (settimana, nome foglio) ai fogli che rientrano nel filtro.
+    Per le date basta una lezione nell'intervallo (ricerca sul calendario di sheet_calendar.py).
+    """
+    if sheet_filter is None:
+        return list(numbered_sheets)
+    dated_weeks = None
+    if sheet_filter['start'] is not None or sheet_filter['end'] is not None:
+        dated_weeks = calendar_for(tuple(numbered_sheets)).weeks_between(sheet_filter['start'], sheet_filter['end'])
+    return [(week, name) for week, name in numbered_sheets
+            if (sheet_filter['weeks'] is None or week in sheet_filter['weeks'])
+            and (dated_weeks is None or week in dated_weeks)]
+
+
+def student_selected(sheet_filter, name):
+    return sheet_filter is None or sheet_filter['students'] is None or name in sheet_filter['students']
+
+
+def filter_student_rows(df, participant_col, sheet_filter):
+    """Tiene solo le righe degli studenti richiesti (colonna dei partecipanti in posizione participant_col)"""
+    if sheet_filter is None or sheet_filter['students'] is None:
+        return df
+    names = df.iloc[:, participant_col]
+    keep = names.map(lambda name: isinstance(name, str) and name.strip() in sheet_filter['students'])
+    return df[keep.to_numpy(dtype=bool)]
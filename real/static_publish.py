@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Pubblicazione statica della classifica (per CDN o cartella servita da un web server).
+
+Da un'estrazione JSON (qualsiasi formato supportato da dataset_index) scrive:
+    <out>/index.json                          elenco dei file correnti
+    <out>/leaderboard.<hash>.json             classifica generale
+    <out>/weeks/week-NN.<hash>.json           classifica di ogni settimana
+    <out>/students/<nome>.<hash>.json         scheda compatta per studente (storico settimanale)
+
+Il nome di ogni file contiene l'hash del contenuto: i file possono essere
+serviti con cache permanente (immutable) e solo index.json va rivalidato.
+Un file già presente con lo stesso hash non viene riscritto, quindi una nuova
+settimana riscrive la classifica, la settimana aggiunta e le sole schede degli
+studenti che hanno punti in quella settimana (la posizione nella classifica
+generale, che cambia anche per gli altri, sta solo in leaderboard). I file non
+più referenziati dall'indice vengono rimossi dopo aver aggiornato l'indice.
+
+Esempio:
+    python static_publish.py fantakombat_data.json --out public
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import unicodedata
+from datetime import datetime
+
+import numpy as np
+
+from dataset_index import flatten_dataset
+from fixed_point import from_units, to_units
+from output_io import encode_json, read_json
+from season import rank_descending
+
+DEFAULT_OUT = 'fantakombat_public'
+INDEX_FILE = 'index.json'
+HASH_LENGTH = 12
+
+
+def student_slug(name):
+    """Nome di file leggibile per uno studente (ASCII, minuscolo, senza spazi)"""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_name.lower()).strip('-') or 'studente'
+
+
+def unique_slugs(names, slugify=student_slug):
+    """
+    Slug distinti per una lista di nomi, nell'ordine dato: uno slug già assegnato
+    riceve il primo suffisso -2, -3, ... non ancora usato (anche da un altro nome).
+    """
+    issued = set()
+    slugs = []
+    for name in names:
+        base = slugify(name)
+        slug = base
+        suffix = 1
+        while slug in issued:
+            suffix += 1
+            slug = f"{base}-{suffix}"
+        issued.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def weekly_points_matrix(data):
+    """
+    Matrice studenti x settimane (unità intere) da un'estrazione.
+    Ritorna (students, weeks, points, present, extra): present indica le settimane
+    in cui lo studente ha almeno un punteggio; extra sono le unità senza settimana,
+    che contano solo nel totale.
+    """
+    records, record_weeks, _ = flatten_dataset(data)
+    students = sorted({record['student'] for record in records})
+    weeks = sorted({week for week in record_weeks if week is not None})
+    student_row = {student: row for row, student in enumerate(students)}
+    week_col = {week: col for col, week in enumerate(weeks)}
+
+    points = np.zeros((len(students), len(weeks)), dtype=np.int64)
+    present = np.zeros((len(students), len(weeks)), dtype=bool)
+    extra = np.zeros(len(students), dtype=np.int64)
+    for record, week in zip(records, record_weeks):
+        row = student_row[record['student']]
+        units = to_units(record['points'])
+        if week is None:
+            extra[row] += units
+            continue
+        points[row, week_col[week]] += units
+        present[row, week_col[week]] = True
+    return students, weeks, points, present, extra
+
+
+def build_artifacts(data):
+    """
+    Contenuto di tutti i file da pubblicare: {nome logico: dati}.
+    Nomi logici: 'leaderboard', 'weeks/week-NN', 'students/<nome>'.
+    """
+    students, weeks, points, present, extra = weekly_points_matrix(data)
+    totals = points.sum(axis=1) + extra
+    ranks = rank_descending(totals[:, np.newaxis])[:, 0] if len(students) else np.array([], dtype=int)
+
+    artifacts = {}
+    order = sorted(range(len(students)), key=lambda row: (ranks[row], students[row]))
+    artifacts['leaderboard'] = {
+        'weeks': weeks,
+        'leaderboard': [
+            {'ranking': int(ranks[row]), 'student': students[row], 'total_points': from_units(totals[row])}
+            for row in order
+        ],
+    }
+
+    week_ranks = np.zeros_like(points)
+    for col, week in enumerate(weeks):
+        rows = np.flatnonzero(present[:, col])
+        week_ranks[rows, col] = rank_descending(points[rows, col:col + 1])[:, 0]
+        week_order = sorted(rows, key=lambda row: (week_ranks[row, col], students[row]))
+        artifacts[f"weeks/week-{week:02d}"] = {
+            'week': week,
+            'leaderboard': [
+                {'ranking': int(week_ranks[row, col]), 'student': students[row],
+                 'points': from_units(points[row, col])}
+                for row in week_order
+            ],
+        }
+
+    for row, (student, slug) in enumerate(zip(students, unique_slugs(students))):
+        columns = np.flatnonzero(present[row])
+        artifacts[f"students/{slug}"] = {
+            'student': student,
+            'total_points': from_units(totals[row]),
+            # [settimana, punti, posizione nella settimana]
+            'weeks': [[weeks[col], from_units(points[row, col]), int(week_ranks[row, col])] for col in columns],
+        }
+    return artifacts
+
+
+def hashed_name(logical_name, payload):
+    digest = hashlib.sha256(payload).hexdigest()[:HASH_LENGTH]
+    return f"{logical_name}.{digest}.json"
+
+
+def write_atomic(path, payload):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def publish(data, out=DEFAULT_OUT):
+    """
+    Scrive gli artefatti che mancano, aggiorna l'indice e rimuove i file superati.
+    Ritorna (written, removed): i percorsi relativi scritti e rimossi.
+    """
+    index_path = os.path.join(out, INDEX_FILE)
+    previous = read_json(index_path)['files'] if os.path.exists(index_path) else {}
+
+    files = {}
+    written = []
+    for logical_name, content in build_artifacts(data).items():
+        payload = encode_json(content, compact=True)
+        relative_path = hashed_name(logical_name, payload)
+        files[logical_name] = relative_path
+        full_path = os.path.join(out, relative_path)
+        if not os.path.exists(full_path):
+            write_atomic(full_path, payload)
+            written.append(relative_path)
+
+    if files != previous:
+        index = {'generated_at': datetime.now().isoformat(), 'files': files}
+        write_atomic(index_path, encode_json(index))
+
+    # Solo dopo l'indice: chi legge il vecchio indice trova ancora i suoi file fino a qui
+    current = set(files.values())
+    removed = [path for path in previous.values() if path not in current]
+    for path in removed:
+        full_path = os.path.join(out, path)
+        if os.path.exists(full_path):
+            os.remove(full_path)
+    return written, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pubblica la classifica FantaKombat come file statici")
+    parser.add_argument('data_file', nargs='?', default='fantakombat_data.json')
+    parser.add_argument('--out', default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    written, removed = publish(read_json(args.data_file), args.out)
+    print(f"✅ {len(written)} file scritti, {len(removed)} rimossi in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
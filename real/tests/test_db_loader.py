@@ -0,0 +1,145 @@
+import sqlite3
+
+import pytest
+
+import db_loader
+from db_loader import (AUTOMATIC_ACTIONS, TEACHER, build_rows, connect, existing_user_ids, hash_password,
+                       load_checkpoint, load_rows, student_email)
+
+DATA = {
+    'students': ['Anna Rossi', 'Bruno', 'Carla  Bianchi'],
+    'actions': [{'name': 'Presenza', 'points': 1.0}, {'name': 'Flessioni', 'points': 0.5},
+                {'name': 'Ritardo', 'points': -1.0}],
+    'lessons': [
+        {'lesson_number': 1, 'week_number': 1, 'day_number': 1, 'title': 'Lezione 1', 'date': '2025-01-13'},
+        {'lesson_number': 2, 'week_number': 1, 'day_number': 2, 'title': 'Lezione 2', 'date': None},
+    ],
+    'student_scores': {
+        'Anna Rossi': {'1_Lezione 1': {'actions': [{'action': 'Flessioni', 'count': 3, 'points': 1.5}]},
+                       '2_Lezione 2': {'actions': [{'action': 'Presenza', 'count': 1, 'points': 1.0}]}},
+        'Bruno': {'1_Lezione 1': {'actions': [{'action': 'Ritardo', 'count': 2, 'points': -2.0}]}},
+        'Sconosciuto': {'1_Lezione 1': {'actions': [{'action': 'Presenza', 'count': 1, 'points': 1.0}]}},
+    },
+}
+NOW = '2025-06-01T10:00:00'
+PASSWORD_HASH = '$2b$12$hash-di-prova'
+
+
+def table_counts(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in db_loader.TABLES}
+    finally:
+        conn.close()
+
+
+def run_loader(db_path, checkpoint_path, batch_size=2, rows=None):
+    checkpoint = load_checkpoint(checkpoint_path, 'fingerprint', batch_size)
+    conn, placeholder, quote = connect(str(db_path))
+    try:
+        if rows is None:
+            rows = build_rows(DATA, NOW, PASSWORD_HASH, existing_user_ids(conn, quote))
+        return load_rows(conn, placeholder, quote, rows, checkpoint, checkpoint_path, batch_size)
+    finally:
+        conn.close()
+
+
+def test_build_rows_creates_teacher_and_automatic_actions():
+    rows = build_rows(DATA, NOW, PASSWORD_HASH)
+
+    teacher = [row for row in rows['users'] if row[1] == TEACHER['email']]
+    assert len(teacher) == 1 and teacher[0][2] == PASSWORD_HASH and teacher[0][4] == 'INSEGNANTE'
+
+    by_name = {row[1]: row for row in rows['actions']}
+    for name, points, action_type, category in AUTOMATIC_ACTIONS:
+        assert by_name[name][3:5] == (points, action_type)
+        assert by_name[name][7:9] == (True, category)
+    # 'Presenza' del file coincide con l'azione automatica e non viene duplicata
+    assert len(rows['actions']) == len(AUTOMATIC_ACTIONS) + 2
+    assert by_name['Flessioni'][7:9] == (False, None)
+
+    # Un punteggio per occorrenza, solo per studenti noti
+    assert len(rows['scores']) == 3 + 1 + 2
+    assert student_email('Carla  Bianchi') == 'carla.bianchi@fantakombat.com'
+
+
+def test_hash_password_is_bcrypt():
+    bcrypt = pytest.importorskip('bcrypt')
+    hashed = hash_password('password123')
+    assert hashed.startswith('$2b$12$')
+    assert bcrypt.checkpw(b'password123', hashed.encode('ascii'))
+
+
+def test_sqlite_round_trip_and_idempotent_rerun(tmp_path):
+    db_path = tmp_path / 'fantakombat.db'
+    rows = build_rows(DATA, NOW, PASSWORD_HASH)
+
+    stats = run_loader(db_path, str(tmp_path / 'first.json'))
+    expected = {table: len(table_rows) for table, table_rows in rows.items()}
+    assert {table: inserted for table, (inserted, _) in stats.items()} == expected
+    assert table_counts(db_path) == expected
+
+    conn = sqlite3.connect(db_path)
+    try:
+        loaded = conn.execute('SELECT * FROM scores ORDER BY id').fetchall()
+        password = conn.execute('SELECT password FROM users WHERE email = ?', (TEACHER['email'],)).fetchone()[0]
+    finally:
+        conn.close()
+    assert [tuple(row) for row in loaded] == rows['scores']
+    assert password == PASSWORD_HASH
+
+    # Un secondo caricamento completo (nuovo checkpoint) non duplica nulla
+    run_loader(db_path, str(tmp_path / 'second.json'))
+    assert table_counts(db_path) == expected
+
+
+def test_resume_after_interrupted_batch(tmp_path, monkeypatch):
+    db_path = tmp_path / 'fantakombat.db'
+    checkpoint_path = str(tmp_path / 'checkpoint.json')
+    expected = {table: len(table_rows) for table, table_rows in build_rows(DATA, NOW, PASSWORD_HASH).items()}
+
+    # Interruzione dopo il commit del terzo blocco ma prima del suo checkpoint
+    save_checkpoint = db_loader.save_checkpoint
+    calls = []
+
+    def crashing_save(path, checkpoint):
+        calls.append(path)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        save_checkpoint(path, checkpoint)
+
+    monkeypatch.setattr(db_loader, 'save_checkpoint', crashing_save)
+    with pytest.raises(KeyboardInterrupt):
+        run_loader(db_path, checkpoint_path)
+    monkeypatch.setattr(db_loader, 'save_checkpoint', save_checkpoint)
+
+    assert load_checkpoint(checkpoint_path, 'fingerprint', 2)['tables'] == {'users': 2}
+    assert 0 < sum(table_counts(db_path).values()) < sum(expected.values())
+
+    # La ripresa ripete il blocco già confermato senza errori e completa il caricamento
+    stats = run_loader(db_path, checkpoint_path)
+    assert stats['users'][0] == 0
+    assert table_counts(db_path) == expected
+
+
+def test_existing_users_keep_their_id(tmp_path):
+    db_path = tmp_path / 'fantakombat.db'
+    conn, _, _ = connect(str(db_path))
+    conn.execute('INSERT INTO users (id, email, password, name, role, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                 ('cuid-del-seed', student_email('Bruno'), None, 'Bruno', 'ISCRITTO', NOW, NOW))
+    conn.commit()
+    conn.close()
+
+    run_loader(db_path, str(tmp_path / 'checkpoint.json'))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        orphans = conn.execute('SELECT COUNT(*) FROM scores WHERE userId NOT IN (SELECT id FROM users)').fetchone()[0]
+        bruno_scores = conn.execute("SELECT COUNT(*) FROM scores WHERE userId = 'cuid-del-seed'").fetchone()[0]
+        enrolled = conn.execute("SELECT COUNT(*) FROM academic_year_enrollments "
+                                "WHERE userId = 'cuid-del-seed'").fetchone()[0]
+    finally:
+        conn.close()
+    assert orphans == 0
+    assert bruno_scores == 2
+    assert enrolled == 1
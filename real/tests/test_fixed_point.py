@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from fixed_point import QUANTUM, from_units, round_to_units, to_units
+
+
+def test_to_units_scalars():
+    assert to_units(0) == 0
+    assert to_units(1.5) == 3
+    assert to_units(-0.5) == -1
+    assert isinstance(to_units(2.0), int)
+
+
+def test_to_units_tolerates_float_noise():
+    # 0.1 + 0.2 + 0.2 = 0.5000000000000001
+    assert to_units(0.1 + 0.2 + 0.2) == 1
+    assert to_units(sum([0.1] * 15)) == 3
+
+
+@pytest.mark.parametrize('points', [0.25, 1.3, -0.1, float('nan'), float('inf')])
+def test_to_units_rejects_values_off_the_quantum(points):
+    with pytest.raises(ValueError):
+        to_units(points)
+
+
+def test_to_units_arrays():
+    units = to_units([0.5, -1.0, 3.0])
+    assert units.dtype == np.int64
+    assert units.tolist() == [1, -2, 6]
+    assert to_units(np.empty(0)).tolist() == []
+    with pytest.raises(ValueError):
+        to_units([0.5, 0.75])
+    with pytest.raises(ValueError):
+        to_units([0.5, float('inf')])
+
+
+def test_to_units_other_quantum():
+    assert to_units(0.75, quantum=0.25) == 3
+
+
+def test_round_to_units():
+    assert round_to_units(1.5) == (3, True)
+    assert round_to_units(1.3) == (3, False)
+    assert round_to_units(-0.2) == (0, False)
+    assert round_to_units(float('nan')) == (0, False)
+    assert round_to_units(float('-inf')) == (0, False)
+
+
+def test_from_units_round_trip():
+    assert from_units(3) == 1.5
+    assert isinstance(from_units(np.int64(3)), float)
+    assert from_units(np.array([1, -2])).tolist() == [0.5, -1.0]
+    values = np.arange(-20, 21) * QUANTUM
+    assert np.array_equal(from_units(to_units(values)), values)
@@ -0,0 +1,29 @@
+import pytest
+
+import output_io
+from output_io import parse_output_args, read_json, write_json
+
+
+def test_parse_output_args_defaults_and_forms():
+    assert parse_output_args(['--weeks', '1-3']) == (False, None)
+    assert parse_output_args(['--compact', '--compress']) == (True, 'gzip')
+    assert parse_output_args(['--compress=gzip', '--students', 'Anna']) == (False, 'gzip')
+
+
+def test_parse_output_args_rejects_unknown_codec():
+    with pytest.raises(SystemExit):
+        parse_output_args(['--compress=brotli'])
+
+
+def test_parse_output_args_requires_zstd_backend(monkeypatch):
+    monkeypatch.setattr(output_io, 'zstandard', None)
+    monkeypatch.setattr(output_io, 'stdlib_zstd', None)
+    with pytest.raises(SystemExit):
+        parse_output_args(['--compress=zstd'])
+
+
+@pytest.mark.parametrize('compact,compression', [(False, None), (True, None), (True, 'gzip')])
+def test_write_read_round_trip(tmp_path, compact, compression):
+    data = {'students': ['Anna'], 'weeks': {1: 0.5}}
+    path = write_json(data, str(tmp_path / 'data.json'), compact, compression)
+    assert read_json(path) == {'students': ['Anna'], 'weeks': {'1': 0.5}}
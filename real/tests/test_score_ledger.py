@@ -0,0 +1,80 @@
+import os
+
+from score_ledger import ASSIGNED, SNAPSHOT_FILE, ScoreLedger, segment_name
+
+
+def event(student, lesson, action, points, week=1):
+    return {'type': ASSIGNED, 'student': student, 'lesson': lesson, 'action': action, 'week': week,
+            'points': points, 'at': '2025-03-01T10:00:00'}
+
+
+def state(ledger):
+    return ledger.scores, ledger.student_totals, ledger.week_totals
+
+
+def test_totals_follow_corrections_and_revocations(tmp_path):
+    ledger = ScoreLedger(str(tmp_path))
+    ledger.assign('Anna', 1, 'Flessioni', 1.5, week=1)
+    ledger.assign('Anna', 2, 'Ritardo', -0.5, week=1)
+    ledger.assign('Bruno', 1, 'Flessioni', 1.0, week=1)
+    # Correzione che sposta anche la settimana
+    ledger.assign('Anna', 1, 'Flessioni', 2.0, week=2)
+    ledger.revoke('Bruno', 1, 'Flessioni')
+
+    assert ledger.student_points('Anna') == 1.5
+    assert ledger.student_points('Bruno') == 0.0
+    assert ledger.week_totals[('Anna', 1)] == -1
+    assert ledger.week_totals[('Anna', 2)] == 4
+    assert ledger.standings() == [(1, 'Anna', 1.5), (2, 'Bruno', 0.0)]
+
+
+def test_replay_rebuilds_the_same_state(tmp_path):
+    ledger = ScoreLedger(str(tmp_path), segment_events=2)
+    ledger.append([event('Anna', lesson, 'Flessioni', 0.5 * lesson) for lesson in range(1, 6)])
+    ledger.revoke('Anna', 3, 'Flessioni')
+    ledger.close()
+
+    reopened = ScoreLedger(str(tmp_path), segment_events=2)
+    assert state(reopened) == state(ledger)
+    assert reopened.student_points('Anna') == 0.5 * (1 + 2 + 4 + 5)
+
+
+def test_incomplete_last_line_is_truncated(tmp_path):
+    ledger = ScoreLedger(str(tmp_path))
+    ledger.append([event('Anna', 1, 'Flessioni', 1.0), event('Bruno', 1, 'Flessioni', 0.5)])
+    ledger.close()
+    path = os.path.join(str(tmp_path), segment_name(1))
+    complete_size = os.path.getsize(path)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type":"assigned","student":"Carla"')
+
+    reopened = ScoreLedger(str(tmp_path))
+    assert os.path.getsize(path) == complete_size
+    assert 'Carla' not in reopened.student_totals
+
+    # Gli eventi successivi ripartono dall'ultima riga completa
+    reopened.assign('Carla', 1, 'Flessioni', 2.0)
+    reopened.close()
+    assert ScoreLedger(str(tmp_path)).student_points('Carla') == 2.0
+
+
+def test_compaction_keeps_state_and_removes_segments(tmp_path):
+    ledger = ScoreLedger(str(tmp_path), segment_events=2, compact_segments=2)
+    events = [event(student, lesson, 'Flessioni', 0.5, week=lesson) for lesson in range(1, 4)
+              for student in ('Anna', 'Bruno')]
+    ledger.append(events)
+    ledger.assign('Anna', 1, 'Flessioni', -1.0, week=1)
+    ledger.close()
+
+    assert os.path.exists(os.path.join(str(tmp_path), SNAPSHOT_FILE))
+    assert min(ledger.segment_numbers()) >= ledger.first_segment
+
+    reopened = ScoreLedger(str(tmp_path), segment_events=2, compact_segments=2)
+    assert state(reopened) == state(ledger)
+    assert reopened.student_points('Anna') == 0.0
+    assert reopened.student_points('Bruno') == 1.5
+
+    reopened.compact()
+    reopened.close()
+    assert reopened.segment_numbers() == []
+    assert state(ScoreLedger(str(tmp_path))) == state(ledger)
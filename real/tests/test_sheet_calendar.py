@@ -0,0 +1,44 @@
+import pytest
+
+from sheet_calendar import LessonCalendar, build_calendar
+
+
+def dates(*sheet_names):
+    calendar = LessonCalendar(tuple(enumerate(sheet_names, 1)))
+    return [calendar.week_dates(week) for week in range(1, len(sheet_names) + 1)]
+
+
+@pytest.mark.parametrize('sheet_name,expected', [
+    ('13- 15 - 17 Gen 2025', ['2025-01-13', '2025-01-15', '2025-01-17']),
+    ('24- 26 - 28 Febb 2025 ', ['2025-02-24', '2025-02-26', '2025-02-28']),
+    ('23 Aprile 2025', ['2025-04-23']),
+    ('18- 20 - 22 + OpenD Marzo 2025', ['2025-03-18', '2025-03-20', '2025-03-22']),
+    ('04-06-Giugno 2025', ['2025-06-04', '2025-06-06']),
+    ('31- 2 - 4 Aprile 2025', ['2025-03-31', '2025-04-02', '2025-04-04']),
+    ('X-18-20-special Giugno 2025', ['2025-06-16', '2025-06-18', '2025-06-20']),
+])
+def test_sheet_name_formats(sheet_name, expected):
+    assert dates(sheet_name) == [expected]
+
+
+def test_month_of_first_day_when_the_week_would_go_backwards():
+    assert dates('23-25-26 Giugno 2025', '30-02-04 Giugno 2025') == [
+        ['2025-06-23', '2025-06-25', '2025-06-26'],
+        ['2025-06-30', '2025-07-02', '2025-07-04'],
+    ]
+
+
+def test_sheet_without_dates(capsys):
+    assert dates('Foglio1') == [[]]
+    assert 'Impossibile parsare' in capsys.readouterr().out
+
+
+def test_build_calendar_numbers_only_dated_sheets():
+    calendar = build_calendar(['13- 15 - 17 Gen 2025', 'Note', '20- 22 - 24 Gen 2025', 'totale FANTAKombat'])
+    assert calendar.sheets == {1: '13- 15 - 17 Gen 2025', 2: '20- 22 - 24 Gen 2025'}
+    assert calendar.lesson_on('2025-01-22') == (2, 2)
+    assert calendar.lesson_on('2025-01-21') is None
+    assert calendar.week_on('2025-01-19') == 1
+    assert calendar.week_on('2025-01-01') is None
+    assert calendar.weeks_between('2025-01-16', '2025-01-20') == {1, 2}
+    assert [lesson[0] for lesson in calendar.lessons_between('2025-01-17', '2025-01-20')] == ['2025-01-17', '2025-01-20']
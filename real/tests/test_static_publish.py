@@ -0,0 +1,30 @@
+from static_publish import publish, unique_slugs
+
+
+def season(weeks):
+    """Estrazione in formato 'scores' con una lezione per settimana"""
+    lessons = [{'week': week, 'lesson_number': week, 'title': f'Lezione {week}'} for week in range(1, len(weeks) + 1)]
+    scores = [{'student': student, 'lesson_id': week, 'action': 'Flessioni', 'points': points}
+              for week, week_points in enumerate(weeks, 1) for student, points in week_points.items()]
+    return {'lessons': lessons, 'scores': scores}
+
+
+def test_new_week_rewrites_only_students_with_points(tmp_path):
+    week_1 = {'Anna': 2.0, 'Bruno': 1.0, 'Carla': 0.5}
+    publish(season([week_1]), str(tmp_path))
+
+    # Carla supera tutti: la classifica generale cambia anche per Anna e Bruno
+    written, removed = publish(season([week_1, {'Carla': 3.0}]), str(tmp_path))
+
+    assert sorted(path.split('.')[0] for path in written) == ['leaderboard', 'students/carla', 'weeks/week-02']
+    assert [path.split('.')[0] for path in removed] == ['leaderboard', 'students/carla']
+
+
+def test_republishing_writes_nothing(tmp_path):
+    data = season([{'Anna': 1.0}, {'Anna': -0.5, 'Bruno': 1.5}])
+    publish(data, str(tmp_path))
+    assert publish(data, str(tmp_path)) == ([], [])
+
+
+def test_unique_slugs():
+    assert unique_slugs(['Anna Rossi', 'anna rossi', 'Anna-Rossi-2']) == ['anna-rossi', 'anna-rossi-2', 'anna-rossi-2-2']
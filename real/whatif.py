@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Simulatore "what-if": ricalcola la classifica con tabelle punti alternative.
+
+La stagione viene ridotta al numero di unità di ogni azione per studente
+(punti calcolati / punteggio base dell'azione). Ogni scenario è un vettore di
+punteggi base: tutti gli scenari vengono applicati insieme con un unico prodotto
+matriciale (studenti x azioni) @ (azioni x scenari).
+
+Con --workers N gli scenari vengono divisi tra N processi agganciati alla
+stagione in memoria condivisa (vedi shared_season.py).
+
+Esempio:
+    python whatif.py "Ritardo Inizio Lezione=-1" "Assenza=-1;Presenza=2"
+    python whatif.py --workers 8 "Assenza=-1" "Assenza=-2" "Presenza=2"
+"""
+
+import argparse
+
+import numpy as np
+
+from fixed_point import from_units, to_units
+from season import action_counts, build_season, rank_descending
+from shared_season import run_shared, share_season, worker_season
+
+
+def season_counts(season):
+    """Unità di ogni azione sommate su tutta la stagione (studenti x azioni)"""
+    return action_counts(season).sum(axis=1)
+
+
+def integral_counts(counts):
+    """
+    Unità per azione come interi: i punti di ogni cella sono multipli del punteggio base
+    dell'azione, quindi le unità devono essere intere. Solleva ValueError se non lo sono
+    (uno scenario non potrebbe scalarle in modo esatto).
+    """
+    units = np.rint(counts)
+    if not np.allclose(counts, units, rtol=0.0, atol=1e-6):
+        raise ValueError("Unità per azione non intere: i punti non sono multipli del punteggio base")
+    return units.astype(np.int64)
+
+
+def check_scenario(season, overrides):
+    """Solleva ValueError se lo scenario nomina un'azione sconosciuta o punti non multipli del quanto"""
+    for action, points in overrides.items():
+        if action not in season['actions']:
+            raise ValueError(f"azione sconosciuta '{action}' (azioni: {', '.join(season['actions'])})")
+        try:
+            to_units(points, season['quantum'])
+        except ValueError:
+            raise ValueError(f"punti non validi per '{action}': {points} non è multiplo di "
+                             f"{season['quantum']}") from None
+
+
+def scenario_matrix(season, scenarios):
+    """
+    Costruisce la matrice (scenari x azioni) dei punteggi base, in unità intere.
+    Ogni scenario è un dizionario {azione: punti} che sovrascrive i punteggi del file.
+    """
+    action_index = {action: idx for idx, action in enumerate(season['actions'])}
+    matrix = np.tile(season['action_units'], (len(scenarios), 1))
+
+    for row, overrides in enumerate(scenarios):
+        for action, points in overrides.items():
+            if action not in action_index:
+                raise ValueError(f"Azione sconosciuta: {action}")
+            matrix[row, action_index[action]] = to_units(points, season['quantum'])
+
+    return matrix
+
+
+def simulate(season, scenarios, counts=None):
+    """
+    Applica tutti gli scenari alla stagione.
+    Ritorna (totals, ranks): due array studenti x scenari, totals in unità intere.
+    """
+    if counts is None:
+        counts = season_counts(season)
+    # Unità per azione e punteggi base sono interi: il prodotto è esatto
+    totals = integral_counts(counts) @ scenario_matrix(season, scenarios).T
+    return totals, rank_descending(totals)
+
+
+def simulate_chunk(scenarios):
+    """Totali (unità) di un blocco di scenari; eseguita nei processi agganciati alla stagione condivisa"""
+    season = worker_season()
+    # Somma sulle settimane prima di dividere: il processo non crea copie studenti x settimane x azioni
+    base = season['action_units']
+    safe_base = np.where(base == 0, 1, base)
+    counts = np.where(base == 0, 0.0, season['points'].sum(axis=1) / safe_base)
+    return integral_counts(counts) @ scenario_matrix(season, scenarios).T
+
+
+def simulate_shared(season, scenarios, workers):
+    """Come simulate, con gli scenari divisi tra `workers` processi che condividono la stagione"""
+    step = max(1, -(-len(scenarios) // workers))
+    chunks = [scenarios[start:start + step] for start in range(0, len(scenarios), step)]
+    with share_season(season) as shared:
+        totals = np.hstack(run_shared(shared.descriptor, simulate_chunk, chunks, workers))
+    return totals, rank_descending(totals)
+
+
+def leaderboards(season, scenarios, counts=None, workers=1):
+    """
+    Classifica completa per ogni scenario.
+    Ritorna una lista (una per scenario) di liste ordinate di
+    {'student', 'total_points', 'ranking'}.
+    """
+    if workers > 1:
+        totals, ranks = simulate_shared(season, scenarios, workers)
+    else:
+        totals, ranks = simulate(season, scenarios, counts)
+    students = season['students']
+
+    results = []
+    for col in range(len(scenarios)):
+        order = np.lexsort((np.arange(len(students)), ranks[:, col]))
+        results.append([
+            {
+                'student': students[idx],
+                'total_points': from_units(totals[idx, col], season['quantum']),
+                'ranking': int(ranks[idx, col])
+            }
+            for idx in order
+        ])
+    return results
+
+
+def parse_scenario(text):
+    """Converte 'Azione=punti;Azione=punti' in un dizionario"""
+    overrides = {}
+    for item in text.split(';'):
+        if not item.strip():
+            continue
+        if '=' not in item:
+            raise ValueError(f"scenario non valido '{item}': atteso 'Azione=punti'")
+        action, points = item.rsplit('=', 1)
+        try:
+            overrides[action.strip()] = float(points.replace(',', '.'))
+        except ValueError:
+            raise ValueError(f"punti non validi in '{item}'") from None
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classifiche FantaKombat con punteggi alternativi")
+    parser.add_argument('scenarios', nargs='*', help="scenari 'Azione=punti;Azione=punti'")
+    parser.add_argument('--file', dest='file_path', default='FantaKombat.xls')
+    parser.add_argument('--workers', type=int, default=1, help="processi per gli scenari (memoria condivisa)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers deve essere almeno 1")
+    try:
+        # Lo scenario 0 è sempre quello con i punteggi del file
+        scenarios = [{}] + [parse_scenario(text) for text in args.scenarios]
+    except ValueError as e:
+        parser.error(str(e))
+    names = ['Punteggi attuali'] + args.scenarios
+
+    season = build_season(args.file_path)
+    # Azioni e punti si controllano sulla stagione, prima di simulare
+    for text, overrides in zip(args.scenarios, scenarios[1:]):
+        try:
+            check_scenario(season, overrides)
+        except ValueError as e:
+            parser.error(f"scenario '{text}': {e}")
+    for name, board in zip(names, leaderboards(season, scenarios, workers=args.workers)):
+        print(f"\n🏆 {name}")
+        print("-" * 40)
+        for entry in board[:10]:
+            print(f"{entry['ranking']:2d}. {entry['student']:25s} {entry['total_points']:+7.1f} punti")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Esportazione in Excel (.xlsx) di classifica, punti settimanali e dettaglio per azione.
+
+Il file viene scritto in streaming, riga per riga, senza costruire DataFrame:
+  - con xlsxwriter in modalità constant_memory (consigliato)
+  - altrimenti con openpyxl in modalità write_only
+La memoria resta costante al crescere delle righe. I fogli settimanali
+mantengono il nome dei fogli originali (es. '13- 15 - 17 Gen 2025').
+
+Esempi:
+    python xlsx_export.py FantaKombat.xls
+    python xlsx_export.py FantaKombat_2024.xls FantaKombat.xls -o archivio.xlsx
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+
+from fixed_point import from_units
+from ranking_history import compute_history
+from season import build_season, weekly_totals
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+DEFAULT_OUTPUT = 'fantakombat_export.xlsx'
+MAX_SHEET_NAME = 31
+INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+
+def sheet_title(name, used):
+    """Nome di foglio valido per Excel (max 31 caratteri, senza []:*?/\\) e non ripetuto"""
+    base = INVALID_SHEET_CHARS.sub('-', name.strip())[:MAX_SHEET_NAME] or 'Foglio'
+    title = base
+    counter = 2
+    while title.lower() in used:
+        suffix = f" ({counter})"
+        title = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+        counter += 1
+    used.add(title.lower())
+    return title
+
+
+class XlsxWriterBook:
+    """Backend xlsxwriter: ogni riga va su disco appena scritta (constant_memory)"""
+
+    def __init__(self, path):
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        self.bold = self.workbook.add_format({'bold': True})
+
+    def write_sheet(self, title, header, rows):
+        worksheet = self.workbook.add_worksheet(title)
+        worksheet.write_row(0, 0, header, self.bold)
+        worksheet.freeze_panes(1, 0)
+        count = 0
+        for count, row in enumerate(rows, 1):
+            worksheet.write_row(count, 0, row)
+        return count
+
+    def close(self):
+        self.workbook.close()
+
+
+class OpenpyxlBook:
+    """Backend openpyxl in modalità write_only (fogli in streaming)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.workbook = openpyxl.Workbook(write_only=True)
+
+    def write_sheet(self, title, header, rows):
+        worksheet = self.workbook.create_sheet(title)
+        worksheet.freeze_panes = 'A2'
+        worksheet.append(list(header))
+        count = 0
+        for count, row in enumerate(rows, 1):
+            worksheet.append(list(row))
+        return count
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+def open_workbook(path):
+    """Apre il writer disponibile (xlsxwriter, altrimenti openpyxl)"""
+    if xlsxwriter is not None:
+        return XlsxWriterBook(path)
+    if openpyxl is not None:
+        return OpenpyxlBook(path)
+    raise RuntimeError("Esportazione xlsx non disponibile: installa 'xlsxwriter' oppure 'openpyxl'")
+
+
+def standings_rows(season, totals, history):
+    """Righe della classifica in ordine di posizione"""
+    final_totals = history['cumulative'][:, -1] if totals.shape[1] else np.zeros(len(season['students']), dtype=np.int64)
+    final_ranks = history['ranks'][:, -1] if totals.shape[1] else np.ones(len(season['students']), dtype=int)
+    weeks_present = season['present'].sum(axis=1)
+    for row in np.lexsort((np.arange(len(final_ranks)), final_ranks)):
+        yield [int(final_ranks[row]), season['students'][row], from_units(final_totals[row]), int(weeks_present[row])]
+
+
+def weekly_matrix_rows(season, totals):
+    """Una riga per studente con i punti di ogni settimana (vuoto se assente) e il totale"""
+    for row, student in enumerate(season['students']):
+        points = from_units(totals[row])
+        cells = [float(value) if present else None for value, present in zip(points, season['present'][row])]
+        yield [student] + cells + [float(points.sum())]
+
+
+def action_rows(season):
+    """Punti per azione sull'intera stagione, per studente"""
+    action_totals = from_units(season['points'].sum(axis=1))
+    for row, student in enumerate(season['students']):
+        yield [student] + action_totals[row].tolist() + [float(action_totals[row].sum())]
+
+
+def week_rows(season, week_idx):
+    """
+    Dettaglio per azione di una settimana (solo gli studenti presenti nel foglio).
+    Le azioni a zero restano celle vuote, come nei fogli originali.
+    """
+    week_points = from_units(season['points'][:, week_idx, :])
+    for row in np.flatnonzero(season['present'][:, week_idx]):
+        cells = [value if value else None for value in week_points[row].tolist()]
+        yield [season['students'][row]] + cells + [float(week_points[row].sum())]
+
+
+def export_season(book, season, used, label=None):
+    """Scrive i fogli di una stagione; ritorna {titolo: righe scritte}"""
+    totals = weekly_totals(season)
+    history = compute_history(totals)
+    sheets = [sheet.strip() for sheet in season['sheets']]
+    prefix = f"{label} " if label else ''
+    written = {}
+
+    title = sheet_title(f"{prefix}Classifica", used)
+    written[title] = book.write_sheet(title, ['Posizione', 'Studente', 'Punti', 'Settimane'],
+                                      standings_rows(season, totals, history))
+
+    title = sheet_title(f"{prefix}Punti settimanali", used)
+    written[title] = book.write_sheet(title, ['Studente'] + sheets + ['Totale'],
+                                      weekly_matrix_rows(season, totals))
+
+    title = sheet_title(f"{prefix}Azioni", used)
+    written[title] = book.write_sheet(title, ['Studente'] + season['actions'] + ['Totale'],
+                                      action_rows(season))
+
+    for week_idx, sheet in enumerate(sheets):
+        title = sheet_title(sheet, used)
+        written[title] = book.write_sheet(title, ['Studente'] + season['actions'] + ['Tot Settimana'],
+                                          week_rows(season, week_idx))
+    return written
+
+
+def export_xlsx(seasons, output=DEFAULT_OUTPUT):
+    """
+    Esporta una o più stagioni in un unico file.
+    seasons è una lista di (etichetta, stagione); con una sola stagione l'etichetta non compare nei nomi.
+    """
+    book = open_workbook(output)
+    used = set()
+    written = {}
+    try:
+        for label, season in seasons:
+            written.update(export_season(book, season, used, label if len(seasons) > 1 else None))
+    finally:
+        book.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Esporta classifica e punti FantaKombat in xlsx")
+    parser.add_argument('file_paths', nargs='*', default=['FantaKombat.xls'])
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    seasons = [(os.path.splitext(os.path.basename(path))[0], build_season(path)) for path in args.file_paths]
+    written = export_xlsx(seasons, args.output)
+    print(f"✅ Esportati {len(written)} fogli ({sum(written.values())} righe) in {args.output}")
+
+
+if __name__ == "__main__":
+    main()